@@ -13,14 +13,95 @@ class Settings(BaseSettings):
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
     notion_token: str = os.getenv("NOTION_API_KEY", "")
     notion_database_id: str = os.getenv("NOTION_DATABASE_ID", "")
+    notion_base_url: str = os.getenv("NOTION_BASE_URL", "https://api.notion.com")
+    #Send Gemini requests over REST to this host instead (e.g. a local stand-in)
+    gemini_api_endpoint: str = os.getenv("GEMINI_API_ENDPOINT", "")
     
     #ollama settings
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.1")
+    ollama_pool_size: int = int(os.getenv("OLLAMA_POOL_SIZE", "10"))
+    ollama_http_retries: int = int(os.getenv("OLLAMA_HTTP_RETRIES", "2"))
+    #How long Ollama keeps the model loaded after a request ("30m", or seconds; -1 = forever)
+    ollama_keep_alive: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    #Re-warm the model after this many idle seconds (0 disables); keep it below keep_alive
+    ollama_rewarm_idle_seconds: float = float(os.getenv("OLLAMA_REWARM_IDLE_SECONDS", "1500"))
+    #Stop re-warming once no generation has used the model for this many seconds (0 never stops)
+    ollama_rewarm_max_idle_seconds: float = float(os.getenv("OLLAMA_REWARM_MAX_IDLE_SECONDS", "14400"))
+    ollama_warmup_timeout_seconds: float = float(os.getenv("OLLAMA_WARMUP_TIMEOUT_SECONDS", "120"))
     
     #Content Generation Settings
     max_content_length: int = 2000
     default_content_type: str = "blog"
+    #Cap output tokens (and Ollama's context size) from the requested word-count range
+    llm_length_caps_enabled: bool = os.getenv("LLM_LENGTH_CAPS_ENABLED", "true").lower() == "true"
+    #Output token cap = max words x tokens per word x this headroom
+    llm_output_token_headroom: float = float(os.getenv("LLM_OUTPUT_TOKEN_HEADROOM", "1.25"))
+    llm_min_context_tokens: int = int(os.getenv("LLM_MIN_CONTEXT_TOKENS", "4096"))
+    #Stop streams at a paragraph break once they pass this multiple of the word range's upper bound (0 disables)
+    llm_word_budget_multiple: float = float(os.getenv("LLM_WORD_BUDGET_MULTIPLE", "1.5"))
+    
+    #Startup probes run in the background and give up after this many seconds
+    provider_probe_timeout_seconds: float = float(os.getenv("PROVIDER_PROBE_TIMEOUT_SECONDS", "3"))
+    notion_timeout_seconds: float = float(os.getenv("NOTION_TIMEOUT_SECONDS", "30"))
+    #Preload models (e.g. the Ollama model) once their probe succeeds
+    llm_warmup_on_start: bool = os.getenv("LLM_WARMUP_ON_START", "true").lower() == "true"
+    
+    #Per-provider limits (0 disables the limit)
+    gemini_requests_per_minute: float = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15"))
+    gemini_min_requests_per_minute: float = float(os.getenv("GEMINI_MIN_REQUESTS_PER_MINUTE", "1"))
+    gemini_rate_limit_retries: int = int(os.getenv("GEMINI_RATE_LIMIT_RETRIES", "3"))
+    ollama_parallel_requests: int = int(os.getenv("OLLAMA_PARALLEL_REQUESTS", "2"))
+    
+    #Provider racing: seconds to wait for the primary before starting the secondary
+    llm_hedge_delay_seconds: float = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "0"))
+    
+    #Provider routing for the "auto" provider: fastest, cheapest, or e.g. "cheapest under 5s"
+    llm_routing_policy: str = os.getenv("LLM_ROUTING_POLICY", "cheapest under 5s")
+    #Comma-separated modules that register extra LLM providers when imported
+    llm_provider_modules: str = os.getenv("LLM_PROVIDER_MODULES", "")
+    
+    #Provider circuit breakers
+    circuit_breaker_window_size: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "20"))
+    circuit_breaker_min_requests: int = int(os.getenv("CIRCUIT_BREAKER_MIN_REQUESTS", "5"))
+    circuit_breaker_error_threshold: float = float(os.getenv("CIRCUIT_BREAKER_ERROR_THRESHOLD", "0.5"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    
+    #Tracing: one span per request stage, appended to a JSON lines file (empty path disables the file)
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    tracing_jsonl_path: str = os.getenv("TRACING_JSONL_PATH", ".cache/traces.jsonl")
+    #Start a new trace file once it reaches this size, keeping this many old ones (0 MB never rolls over)
+    tracing_jsonl_max_mb: float = float(os.getenv("TRACING_JSONL_MAX_MB", "10"))
+    tracing_jsonl_backups: int = int(os.getenv("TRACING_JSONL_BACKUPS", "3"))
+    #Also export spans with OpenTelemetry: "otlp" (configured by the OTEL_EXPORTER_OTLP_* variables) or "console"
+    tracing_otel_exporter: str = os.getenv("TRACING_OTEL_EXPORTER", "")
+    
+    #Prometheus-style /metrics endpoint served beside the Streamlit app
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    metrics_port: int = int(os.getenv("METRICS_PORT", "9464"))
+    
+    #Debug: profile each generation with cProfile and keep the .prof files (also a toggle on the Settings page)
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    profiling_output_dir: str = os.getenv("PROFILING_OUTPUT_DIR", ".cache/profiles")
+    profiling_top_functions: int = int(os.getenv("PROFILING_TOP_FUNCTIONS", "25"))
+    
+    #LLM response cache
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+    
+    #In-memory cache of rendered prompts (0 disables)
+    prompt_cache_max_entries: int = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "1024"))
+    #Prompt layout: "classic", or "prefix_stable" to put each content type's static instructions first and
+    #the request's own fields last, so Ollama can reuse the cached prefix between requests
+    prompt_layout: str = os.getenv("PROMPT_LAYOUT", "classic")
+    #Prompt token budget (0 disables) and the tokenizer that counts it: chars, words, tiktoken:<encoding> or hf:<tokenizer.json>
+    prompt_token_budget: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "0"))
+    prompt_tokenizer: str = os.getenv("PROMPT_TOKENIZER", "chars")
+    #Compact prompts (guideline bullets the template already covers left out): never, over_budget or always
+    prompt_compact: str = os.getenv("PROMPT_COMPACT", "over_budget")
     
     def update_from_dict(self, settings_dict: dict):
         """Update settings from a dictionary"""
@@ -12,6 +12,10 @@ from src.pages.pages import (
     show_system_status,
     show_settings
 )
+from src.utils.metrics import start_metrics_server
+
+#Metrics endpoint for Prometheus; started once per process
+start_metrics_server()
 
 #Page Configuration
 st.set_page_config(
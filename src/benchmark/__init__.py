@@ -0,0 +1 @@
+"""Benchmarks for the content generation pipeline. Run modules with ``python -m``."""
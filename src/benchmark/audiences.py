@@ -0,0 +1,112 @@
+"""Benchmark for audience categorization on synthetic audience strings.
+
+Compares the previous classifier (up to four ``any(word in ...)`` scans
+per audience) with AudienceClassifier, one audience at a time and in a
+single ``categorize_audiences`` batch. All three must agree.
+
+Run with: python -m src.benchmark.audiences
+"""
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.prompt.audience import AUDIENCE_KEYWORDS, audience_classifier, categorize_audiences
+
+console = Console()
+app = typer.Typer()
+
+FILLER = ("small business owners", "marketing teams", "students", "parents", "busy", "startup founders",
+          "retail buyers", "hobbyists", "healthcare", "nurses", "data analysts", "senior", "junior",
+          "mid-level", "young adults", "in the UK", "remote workers", "nonprofits", "teachers")
+
+def legacy_categorize(audience: str) -> str:
+    """The previous PromptEngine._categorize_audience."""
+    audience_lower = audience.lower()
+
+    if any(word in audience_lower for word in ['beginner', 'new', 'starter', 'novice']):
+        return 'beginners'
+    elif any(word in audience_lower for word in ['professional', 'expert', 'specialist', 'practitioner']):
+        return 'professionals'
+    elif any(word in audience_lower for word in ['executive', 'manager', 'leader', 'director', 'ceo']):
+        return 'executives'
+    elif any(word in audience_lower for word in ['developer', 'engineer', 'technical', 'programmer']):
+        return 'technical'
+    else:
+        return 'general'
+
+def synthetic_audiences(count: int, seed: int = 0) -> List[str]:
+    """Audience phrases of two to six parts; about 60% mention one or two category words."""
+    rng = random.Random(seed)
+    keywords = [word for words in AUDIENCE_KEYWORDS.values() for word in words]
+    audiences = []
+    for _ in range(count):
+        parts = rng.sample(FILLER, rng.randint(2, 6))
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(keywords) + rng.choice(("", "s")))
+        audience = " ".join(parts)
+        audiences.append(audience.title() if rng.random() < 0.3 else audience)
+    return audiences
+
+def _time(run: Callable[[], List[str]], repeat: int) -> Dict:
+    """Best-of-``repeat`` seconds for one run, with the labels it returned."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        labels = run()
+        best = min(best, time.perf_counter() - started_at)
+    return {"seconds": best, "labels": labels}
+
+@app.command()
+def main(count: int = typer.Option(100_000, help="Synthetic audience strings"),
+         seed: int = typer.Option(0, help="Seed for the synthetic audiences"),
+         repeat: int = typer.Option(3, help="Runs per classifier; the best one counts"),
+         output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file")):
+    """Benchmark the legacy audience classifier against AudienceClassifier."""
+    audiences = synthetic_audiences(count, seed)
+    runs = {
+        "legacy any() chain": _time(lambda: [legacy_categorize(audience) for audience in audiences], repeat),
+        "categorize, one at a time": _time(
+            lambda: [audience_classifier.categorize(audience) for audience in audiences], repeat),
+        "categorize_audiences batch": _time(lambda: categorize_audiences(audiences), repeat)
+    }
+    expected = runs["legacy any() chain"]["labels"]
+    for name, run in runs.items():
+        if run["labels"] != expected:
+            raise RuntimeError(f"{name} disagrees with the legacy classifier")
+
+    baseline = runs["legacy any() chain"]["seconds"]
+    table = Table(title=f"Categorizing {count:,} audiences")
+    table.add_column("Classifier")
+    for column in ("Total (ms)", "Per audience (µs)", "Speedup"):
+        table.add_column(column, justify="right")
+    for name, run in runs.items():
+        table.add_row(name, f"{run['seconds'] * 1000:.1f}", f"{run['seconds'] / count * 1e6:.2f}",
+                      f"{baseline / run['seconds']:.2f}x")
+    console.print(table)
+
+    if output:
+        output.write_text(json.dumps({
+            "benchmark": "audiences",
+            "python": platform.python_version(),
+            "count": count,
+            "seed": seed,
+            "repeat": repeat,
+            "categories": {label: expected.count(label) for label in sorted(set(expected))},
+            "runs": {name: {"seconds": run["seconds"]} for name, run in runs.items()}
+        }, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
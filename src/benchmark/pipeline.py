@@ -0,0 +1,323 @@
+"""End-to-end pipeline benchmark for ContentAgent against local stand-ins.
+
+Drives every request through the same steps as generate_and_save_content
+(prompt building, generation, post-processing and the Notion save) and
+times each stage separately, at several concurrency levels. Gemini, Ollama
+and Notion are replaced by the servers in ``src.standins``, so results only
+depend on this code and the chosen latency profile.
+
+Peak RSS is process-wide and never goes down, so it is reported once per
+level. Memory per stage comes from a separate sequential pass under
+tracemalloc (which would slow down the timed levels): the peak Python heap
+growth of each stage above what was allocated when it started. The
+stand-ins run in this process, so their allocations count towards the
+generate and save stages.
+
+Run with: python -m src.benchmark.pipeline --output results.json
+"""
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import typer
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+from config.config import settings
+from src.core.content_agent import ContentAgent
+from src.prompt.prompt_engine import ContentType, LengthType
+from src.standins import GeminiStandIn, NotionStandIn, OllamaStandIn, PROFILES, get_profile
+from src.utils.circuit_breaker import get_all_circuit_breakers, percentile
+
+console = Console()
+app = typer.Typer()
+
+STAGES = ["prompt", "generate", "process", "save", "total"]
+TOPICS = [
+    "Remote onboarding for engineering teams",
+    "Reducing cloud costs without slowing delivery",
+    "What small retailers can learn from loyalty apps",
+    "A beginner's guide to sourdough",
+    "Why accessibility audits pay for themselves",
+]
+KEYWORDS = [["onboarding", "remote work"], ["finops"], ["retail", "loyalty"], [], ["a11y", "wcag"]]
+CONTENT_TYPES = [ContentType.BLOG, ContentType.SOCIAL, ContentType.NEWSLETTER, ContentType.ARTICLE]
+LENGTHS = [LengthType.SHORT, LengthType.MEDIUM, LengthType.LONG]
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class StageRecorder:
+    """Durations and failures per stage, shared by worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.failures: Dict[str, int] = {stage: 0 for stage in STAGES}
+
+    def start(self, stage: str):
+        pass
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.durations[stage].append(seconds)
+
+    def fail(self, stage: str):
+        with self._lock:
+            self.failures[stage] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        summary = {}
+        for stage in STAGES:
+            values = self.durations[stage]
+            summary[stage] = {
+                "count": len(values),
+                "failures": self.failures[stage],
+                "mean_ms": sum(values) / len(values) * 1000 if values else None,
+                "p50_ms": _ms(percentile(values, 50)),
+                "p95_ms": _ms(percentile(values, 95)),
+                "p99_ms": _ms(percentile(values, 99))
+            }
+        return summary
+
+class MemoryRecorder(StageRecorder):
+    """Also records each stage's peak traced allocations, for requests run one at a time.
+
+    tracemalloc's peak is process-wide, so stages must not overlap.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.peak_kib: Dict[str, Optional[float]] = {stage: None for stage in STAGES}
+        self._stage_baseline = 0
+        self._request_baseline = 0
+        self._request_peak = 0
+
+    def start(self, stage: str):
+        current, _ = tracemalloc.get_traced_memory()
+        if stage == "total":
+            self._request_baseline, self._request_peak = current, 0
+            return
+        tracemalloc.reset_peak()
+        self._stage_baseline = current
+
+    def add(self, stage: str, seconds: float):
+        super().add(stage, seconds)
+        if stage == "total":
+            growth = self._request_peak
+        else:
+            _, peak = tracemalloc.get_traced_memory()
+            growth = peak - self._stage_baseline
+            self._request_peak = max(self._request_peak, peak - self._request_baseline)
+        self.peak_kib[stage] = max(self.peak_kib[stage] or 0.0, growth / 1024)
+
+def measure_stage_memory(agent: ContentAgent, requests: int, provider: str, offset: int) -> Dict[str, Optional[float]]:
+    """Peak Python heap growth per stage in KiB, over ``requests`` sequential requests."""
+    recorder = MemoryRecorder()
+    tracemalloc.start()
+    try:
+        for index in range(offset, offset + requests):
+            run_request(agent, index, provider, recorder)
+    finally:
+        tracemalloc.stop()
+    return recorder.peak_kib
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+def run_request(agent: ContentAgent, index: int, provider: str, recorder: StageRecorder) -> bool:
+    """Run one request through the pipeline stage by stage; returns whether it succeeded."""
+    stage = "prompt"
+    recorder.start("total")
+    started_at = time.perf_counter()
+    try:
+        recorder.start(stage)
+        stage_started = time.perf_counter()
+        content_request = agent.build_content_request(
+            topic=f"{TOPICS[index % len(TOPICS)]} (#{index})",
+            content_type=CONTENT_TYPES[index % len(CONTENT_TYPES)].value,
+            length=LENGTHS[index % len(LENGTHS)].value,
+            keywords=KEYWORDS[index % len(KEYWORDS)],
+            seo_focused=index % 2 == 0
+        )
+        prompt = agent.prompt_engine.create_enhanced_prompt(content_request)
+        recorder.add(stage, time.perf_counter() - stage_started)
+
+        stage = "generate"
+        recorder.start(stage)
+        stage_started = time.perf_counter()
+        caps = agent.generation_caps(content_request, prompt)
+        # The cache would turn every run after the first into a lookup
+        generation = agent.llm_handler.generate(prompt, provider, use_cache=False, caps=caps)
+        if not generation or not generation.content:
+            raise RuntimeError("generation failed")
+        recorder.add(stage, time.perf_counter() - stage_started)
+
+        stage = "process"
+        recorder.start(stage)
+        stage_started = time.perf_counter()
+        result = agent.process_content(generation.content, content_request, generation.provider)
+        recorder.add(stage, time.perf_counter() - stage_started)
+
+        stage = "save"
+        recorder.start(stage)
+        stage_started = time.perf_counter()
+        if agent.save_content(result)["notion_page_id"] is None:
+            raise RuntimeError("Notion save failed")
+        recorder.add(stage, time.perf_counter() - stage_started)
+    except Exception as e:
+        logger.warning(f"Request {index} failed in {stage}: {e}")
+        recorder.fail(stage)
+        recorder.fail("total")
+        return False
+
+    recorder.add("total", time.perf_counter() - started_at)
+    return True
+
+def run_level(agent: ContentAgent, concurrency: int, requests: int, provider: str, offset: int) -> Dict:
+    """Run ``requests`` pipeline requests with ``concurrency`` worker threads."""
+    for breaker in get_all_circuit_breakers().values():
+        breaker.reset()
+
+    recorder = StageRecorder()
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pipeline-bench") as pool:
+        outcomes = list(pool.map(lambda index: run_request(agent, index, provider, recorder),
+                                 range(offset, offset + requests)))
+    wall_seconds = time.perf_counter() - started_at
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": sum(outcomes),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": sum(outcomes) / wall_seconds if wall_seconds else None,
+        # Process-wide and monotonic: the peak of the whole run so far
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": recorder.summary()
+    }
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+@app.command()
+def main(requests: int = typer.Option(40, help="Requests per concurrency level"),
+         concurrency: List[int] = typer.Option([1, 4, 16], help="Concurrency levels (repeat the option)"),
+         provider: str = typer.Option("ollama", help="Provider to generate with (gemini, ollama, race, auto)"),
+         profile: str = typer.Option("instant", help=f"Stand-in latency profile: {', '.join(PROFILES)}"),
+         seed: int = typer.Option(0, help="Seed for stand-in latencies and failures"),
+         response_words: int = typer.Option(300, help="Words per stand-in response"),
+         warmup: int = typer.Option(3, help="Untimed requests before the first level"),
+         memory_requests: int = typer.Option(5, help="Sequential requests traced for memory per stage (0: skip)"),
+         output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file")):
+    """Benchmark the content pipeline stage by stage at several concurrency levels."""
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    latency = get_profile(profile).model_copy(update={"seed": seed})
+    ollama = OllamaStandIn(latency, models=[settings.ollama_model], response_words=response_words).start()
+    gemini = GeminiStandIn(latency, response_words=response_words).start()
+    notion = NotionStandIn(latency).start()
+    settings.ollama_base_url = ollama.url
+    settings.gemini_api_endpoint = gemini.url
+    settings.gemini_api_key = settings.gemini_api_key or "standin"
+    settings.notion_base_url = notion.url
+    settings.notion_token = settings.notion_token or "secret_benchmark"
+    settings.notion_database_id = settings.notion_database_id or "0" * 32
+
+    try:
+        agent = ContentAgent()
+        agent.warm_up()
+        agent.llm_handler.wait_for_probes()
+        warmup_recorder = StageRecorder()
+        for index in range(warmup):
+            run_request(agent, index, provider, warmup_recorder)
+
+        levels = []
+        offset = warmup
+        for level in concurrency:
+            levels.append(run_level(agent, level, requests, provider, offset))
+            offset += requests
+        stage_memory = measure_stage_memory(agent, memory_requests, provider, offset) if memory_requests else {}
+    finally:
+        for server in (ollama, gemini, notion):
+            server.stop()
+
+    results = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "provider": provider,
+            "profile": profile,
+            "latency_profile": latency.model_dump(),
+            "requests_per_level": requests,
+            "response_words": response_words,
+            "warmup_requests": warmup,
+            "memory_requests": memory_requests,
+            "ollama_parallel_requests": settings.ollama_parallel_requests,
+            "gemini_requests_per_minute": settings.gemini_requests_per_minute,
+            "llm_length_caps_enabled": settings.llm_length_caps_enabled
+        },
+        "levels": levels,
+        "stage_memory_peak_kib": stage_memory,
+        "standin_stats": {"ollama": ollama.stats(), "gemini": gemini.stats(), "notion": notion.stats()}
+    }
+
+    for level in levels:
+        table = Table(title=f"Concurrency {level['concurrency']}: {level['succeeded']}/{level['requests']} ok, "
+                            f"{_fmt(level['throughput_rps'])} req/s, peak RSS so far {_fmt(level['peak_rss_mb'])} MiB")
+        table.add_column("Stage")
+        for column in ("p50 (ms)", "p95 (ms)", "p99 (ms)", "Failures"):
+            table.add_column(column, justify="right")
+        for stage, summary in level["stages"].items():
+            table.add_row(stage, _fmt(summary["p50_ms"]), _fmt(summary["p95_ms"]), _fmt(summary["p99_ms"]),
+                          str(summary["failures"]))
+        console.print(table)
+
+    if stage_memory:
+        table = Table(title=f"Peak Python allocations per stage, {memory_requests} sequential requests")
+        table.add_column("Stage")
+        table.add_column("Peak (KiB)", justify="right")
+        for stage, peak in stage_memory.items():
+            table.add_row(stage, _fmt(peak))
+        console.print(table)
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
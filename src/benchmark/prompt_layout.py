@@ -0,0 +1,163 @@
+"""Benchmark Ollama prompt evaluation time for the classic and prefix-stable prompt layouts.
+
+Sends the same mix of requests, one content type after another at random,
+to Ollama in each layout and reads back how many prompt tokens it had to
+evaluate and how long that took. Only one token is generated per request,
+so prompt evaluation dominates. Without ``--base-url`` the Ollama stand-in
+is used, with a simulated prefix cache and ``--prompt-eval-ms`` per token.
+
+Ollama keeps one cached prompt per parallel slot (OLLAMA_NUM_PARALLEL), so
+reuse depends on how many content types are interleaved; ``--grouped``
+sends requests of the same type back to back, as a batch job can.
+
+Run with: python -m src.benchmark.prompt_layout --base-url http://localhost:11434
+"""
+import json
+import platform
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from config.config import settings
+from src.prompt.prompt_engine import (CLASSIC_LAYOUT, PREFIX_STABLE_LAYOUT, PROMPT_LAYOUTS, ContentRequest,
+                                      ContentType, LengthType, PromptEngine, ToneType)
+from src.standins import OllamaStandIn
+from src.utils.circuit_breaker import percentile
+
+console = Console()
+app = typer.Typer()
+
+CONTENT_TYPES = [ContentType.BLOG, ContentType.SOCIAL, ContentType.EMAIL, ContentType.ARTICLE,
+                 ContentType.MARKETING, ContentType.TUTORIAL]
+TOPICS = ["Remote onboarding", "Cutting cloud costs", "Loyalty apps for small retailers", "Sourdough basics",
+          "Accessibility audits", "Quarterly planning", "Home energy savings", "Open source licensing"]
+AUDIENCES = [None, "engineering managers", "new gardeners", "CFOs", "frontend developers"]
+
+def synthetic_requests(count: int, seed: int = 0) -> List[ContentRequest]:
+    """Requests with random content types, topics, tones and audiences."""
+    rng = random.Random(seed)
+    return [
+        ContentRequest(
+            topic=f"{rng.choice(TOPICS)} #{index}",
+            content_type=rng.choice(CONTENT_TYPES),
+            tone=rng.choice(list(ToneType)),
+            length=rng.choice(list(LengthType)),
+            target_audience=rng.choice(AUDIENCES),
+            keywords=rng.sample(["pricing", "automation", "growth", "security", "habits"], rng.randint(0, 2)) or None,
+            seo_focused=rng.random() < 0.5
+        )
+        for index in range(count)
+    ]
+
+def _unload(client: httpx.Client, model: str):
+    """Unload the model, which empties its prompt cache, so each layout starts cold."""
+    client.post("/api/generate", json={"model": model, "keep_alive": 0})
+
+def run_layout(client: httpx.Client, model: str, layout: str, requests: List[ContentRequest]) -> List[Dict]:
+    """Send each request's prompt in ``layout``; one row of Ollama's prompt evaluation figures per request."""
+    engine = PromptEngine(layout)
+    _unload(client, model)
+    rows = []
+    for request in requests:
+        response = client.post("/api/generate", json={
+            "model": model,
+            "prompt": engine.create_enhanced_prompt(request),
+            "stream": False,
+            "keep_alive": "5m",
+            # A fixed context size, or Ollama would reload the model (and drop its cache)
+            "options": {"num_predict": 1, "num_ctx": settings.llm_min_context_tokens}
+        })
+        response.raise_for_status()
+        data = response.json()
+        rows.append({
+            "content_type": request.content_type.value,
+            "prompt_eval_tokens": data.get("prompt_eval_count", 0),
+            "prompt_eval_ms": data.get("prompt_eval_duration", 0) / 1e6
+        })
+    return rows
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+def summarize(rows: List[Dict]) -> Dict:
+    milliseconds = [row["prompt_eval_ms"] for row in rows]
+    return {
+        "requests": len(rows),
+        "mean_prompt_eval_tokens": _mean([row["prompt_eval_tokens"] for row in rows]),
+        "mean_prompt_eval_ms": _mean(milliseconds),
+        "p50_prompt_eval_ms": percentile(milliseconds, 50),
+        "p95_prompt_eval_ms": percentile(milliseconds, 95)
+    }
+
+@app.command()
+def main(count: int = typer.Option(120, help="Requests per layout"),
+         seed: int = typer.Option(0, help="Seed for the request mix"),
+         base_url: Optional[str] = typer.Option(None, help="Ollama to measure [default: the stand-in]"),
+         model: Optional[str] = typer.Option(None, help="Model to use [default: OLLAMA_MODEL]"),
+         grouped: bool = typer.Option(False, help="Send requests of the same content type back to back"),
+         prompt_eval_ms: float = typer.Option(2.0, help="Stand-in prompt evaluation time per uncached token"),
+         cache_slots: int = typer.Option(4, help="Stand-in cached prompts per model, like OLLAMA_NUM_PARALLEL"),
+         output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file")):
+    """Compare Ollama prompt evaluation time per request across prompt layouts."""
+    model = model or settings.ollama_model
+    requests = synthetic_requests(count, seed)
+    if grouped:
+        requests.sort(key=lambda request: CONTENT_TYPES.index(request.content_type))
+    standin = None
+    if base_url is None:
+        standin = OllamaStandIn(models=[model], response_words=1, cache_slots=cache_slots,
+                                prompt_eval_seconds_per_token=prompt_eval_ms / 1000).start()
+        base_url = standin.url
+
+    try:
+        with httpx.Client(base_url=base_url, timeout=600) as client:
+            rows = {layout: run_layout(client, model, layout, requests) for layout in PROMPT_LAYOUTS}
+    finally:
+        if standin:
+            standin.stop()
+
+    groups = ["all"] + [content_type.value for content_type in CONTENT_TYPES]
+    results = {
+        group: {layout: summarize([row for row in rows[layout] if group in ("all", row["content_type"])])
+                for layout in PROMPT_LAYOUTS}
+        for group in groups
+    }
+
+    table = Table(title=f"Ollama prompt evaluation, {count} requests per layout ({'stand-in' if standin else base_url})")
+    table.add_column("Content type")
+    for column in ("Requests", "Classic tokens", "Prefix-stable tokens", "Classic ms", "Prefix-stable ms",
+                   "Saved ms/request"):
+        table.add_column(column, justify="right")
+    for group, layouts in results.items():
+        classic, stable = layouts[CLASSIC_LAYOUT], layouts[PREFIX_STABLE_LAYOUT]
+        table.add_row(group, str(classic["requests"]),
+                      f"{classic['mean_prompt_eval_tokens']:.0f}", f"{stable['mean_prompt_eval_tokens']:.0f}",
+                      f"{classic['mean_prompt_eval_ms']:.1f}", f"{stable['mean_prompt_eval_ms']:.1f}",
+                      f"{classic['mean_prompt_eval_ms'] - stable['mean_prompt_eval_ms']:.1f}")
+    console.print(table)
+
+    if output:
+        output.write_text(json.dumps({
+            "benchmark": "prompt_layout",
+            "python": platform.python_version(),
+            "ollama": "stand-in" if standin else base_url,
+            "model": model,
+            "count": count,
+            "seed": seed,
+            "grouped": grouped,
+            "results": results
+        }, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
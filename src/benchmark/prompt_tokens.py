@@ -0,0 +1,77 @@
+"""Prompt size per ContentType, in tokens, for full and compact prompts.
+
+Renders the same request for every content type with an offline
+tokenizer and reports the total, the largest sections and what compact
+rendering (guideline bullets the template already covers left out)
+saves. With ``--budget``, shows which content types go over it.
+
+Run with: python -m src.benchmark.prompt_tokens --tokenizer words --budget 300
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.prompt.prompt_engine import (COMPACT_ALWAYS, COMPACT_NEVER, PROMPT_LAYOUTS, ContentRequest, ContentType,
+                                      LengthType, PromptEngine, ToneType)
+from src.prompt.tokens import get_tokenizer
+
+console = Console()
+app = typer.Typer()
+
+def sample_request(content_type: ContentType) -> ContentRequest:
+    return ContentRequest(topic="Reducing cloud costs without slowing delivery", content_type=content_type,
+                          tone=ToneType.PROFESSIONAL, length=LengthType.MEDIUM,
+                          target_audience="engineering managers", keywords=["cloud costs", "finops"],
+                          industry="software", include_examples=True, seo_focused=True)
+
+@app.command()
+def main(tokenizer: str = typer.Option("chars", help="chars, words, tiktoken:<encoding> or hf:<tokenizer.json>"),
+         layout: str = typer.Option("classic", help=f"Prompt layout: {', '.join(PROMPT_LAYOUTS)}"),
+         budget: int = typer.Option(0, help="Prompt token budget to check against (0: none)"),
+         top_sections: int = typer.Option(3, help="Largest sections to list per content type"),
+         output: Optional[Path] = typer.Option(None, help="Write the budget reports as JSON to this file")):
+    """Report prompt tokens per content type, full and compact."""
+    counter = get_tokenizer(tokenizer)
+    full = PromptEngine(layout, compact=COMPACT_NEVER, token_budget=budget, tokenizer=counter)
+    compact = PromptEngine(layout, compact=COMPACT_ALWAYS, token_budget=budget, tokenizer=counter)
+
+    table = Table(title=f"Prompt tokens per content type ({counter.name}, {layout} layout)")
+    table.add_column("Content type")
+    for column in ("Full", "Compact", "Saved"):
+        table.add_column(column, justify="right")
+    table.add_column("Largest sections (full)")
+    if budget:
+        table.add_column(f"Over {budget}?")
+
+    reports = {}
+    for content_type in ContentType:
+        request = sample_request(content_type)
+        full_report, compact_report = full.budget_report(request), compact.budget_report(request)
+        reports[content_type.value] = {"full": full_report.model_dump(), "compact": compact_report.model_dump()}
+
+        largest = sorted(full_report.sections, key=lambda section: section.tokens, reverse=True)[:top_sections]
+        row = [content_type.value, str(full_report.tokens), str(compact_report.tokens),
+               f"{compact_report.tokens_saved} ({compact_report.tokens_saved / full_report.tokens:.0%})",
+               ", ".join(f"{section.name} {section.tokens}" for section in largest)]
+        if budget:
+            row.append("compact fits" if full_report.over_budget and not compact_report.over_budget
+                       else "yes" if full_report.over_budget else "no")
+        table.add_row(*row)
+    console.print(table)
+
+    if output:
+        output.write_text(json.dumps({"benchmark": "prompt_tokens", "tokenizer": counter.name, "layout": layout,
+                                      "budget": budget or None, "reports": reports}, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,119 @@
+"""Micro-benchmark for PromptEngine.create_enhanced_prompt.
+
+Compares rendering with the precompiled templates against the previous
+approach, which computed every placeholder value (including the ones a
+template never uses) and ran ``str.format`` with all of them, for each
+ContentType. Both must produce the same prompt. The last column is a
+repeated request served from the prompt cache.
+
+Run with: python -m src.benchmark.prompts
+"""
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.prompt.prompt_engine import (
+    BASE_PROMPTS,
+    TEMPLATE_FIELD_DEFAULTS,
+    ContentRequest,
+    ContentType,
+    LengthType,
+    PromptEngine,
+    ToneType,
+)
+
+console = Console()
+app = typer.Typer()
+
+ALL_FIELDS = frozenset({"topic", "tone", "length_description", "word_count_range", "target_audience",
+                        "seo_requirements", "call_to_action", "additional_instructions"} | set(TEMPLATE_FIELD_DEFAULTS))
+
+def legacy_render(engine: PromptEngine, request: ContentRequest) -> str:
+    """The previous create_enhanced_prompt: every value computed, then str.format."""
+    base_prompt = BASE_PROMPTS.get(request.content_type.value, "")
+    # Computed by the old code although no template used them
+    engine.prompt_modifiers["tone_modifiers"].get(request.tone.value, "")
+    if request.target_audience:
+        engine.prompt_modifiers["audience_modifiers"].get(engine._categorize_audience(request.target_audience), "")
+    prompt = base_prompt.format(**engine._template_values(request, ALL_FIELDS))
+    if request.keywords:
+        prompt += f"\nKEYWORDS TO INCLUDE: {', '.join(request.keywords)}\nIntegrate these keywords naturally throughout the content."
+    return prompt + engine._add_quality_guidelines()
+
+def _request(content_type: ContentType) -> ContentRequest:
+    return ContentRequest(topic="Reducing cloud costs without slowing delivery", content_type=content_type,
+                          tone=ToneType.PROFESSIONAL, length=LengthType.MEDIUM,
+                          target_audience="engineering managers", keywords=["cloud costs", "finops"],
+                          industry="software", include_examples=True, seo_focused=True)
+
+def time_per_call(render: Callable[[], str], iterations: int, repeat: int) -> float:
+    """Best-of-``repeat`` seconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        best = min(best, (time.perf_counter() - started_at) / iterations)
+    return best
+
+@app.command()
+def main(iterations: int = typer.Option(20000, help="Renders per timing run"),
+         repeat: int = typer.Option(5, help="Timing runs per content type; the best one counts"),
+         output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file")):
+    """Benchmark per-prompt render time before and after template precompilation."""
+    started_at = time.perf_counter()
+    engine = PromptEngine()
+    construction_us = (time.perf_counter() - started_at) * 1e6
+
+    rows: List[Dict] = []
+    for content_type in ContentType:
+        request = _request(content_type)
+        if legacy_render(engine, request) != engine._render_prompt(request):
+            raise RuntimeError(f"Precompiled and legacy prompts differ for {content_type.value}")
+        before = time_per_call(lambda: legacy_render(engine, request), iterations, repeat)
+        after = time_per_call(lambda: engine._render_prompt(request), iterations, repeat)
+        cached = time_per_call(lambda: engine.create_enhanced_prompt(request), iterations, repeat)
+        rows.append({
+            "content_type": content_type.value,
+            "has_template": content_type.value in BASE_PROMPTS,
+            "before_us": before * 1e6,
+            "after_us": after * 1e6,
+            "speedup": before / after if after else None,
+            "cached_us": cached * 1e6
+        })
+
+    table = Table(title=f"create_enhanced_prompt, best of {repeat} x {iterations} renders")
+    table.add_column("Content type")
+    for column in ("Before (µs)", "After (µs)", "Speedup", "Cached (µs)"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        name = row["content_type"] + ("" if row["has_template"] else " (no template)")
+        table.add_row(name, f"{row['before_us']:.2f}", f"{row['after_us']:.2f}", f"{row['speedup']:.2f}x",
+                      f"{row['cached_us']:.2f}")
+    console.print(table)
+    console.print(f"PromptEngine() construction: {construction_us:.1f} µs")
+
+    if output:
+        output.write_text(json.dumps({
+            "benchmark": "prompts",
+            "python": platform.python_version(),
+            "iterations": iterations,
+            "repeat": repeat,
+            "construction_us": construction_us,
+            "content_types": rows
+        }, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
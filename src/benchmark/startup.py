@@ -0,0 +1,153 @@
+"""Startup-time benchmark for ContentAgent.
+
+Measures how long constructing and warming up a ContentAgent blocks the
+caller (what a fresh Streamlit session pays on first page load) and how long
+the background probes take to settle, once with reachable providers and once
+with providers whose hosts accept connections but never answer.
+
+Run with: python -m src.benchmark.startup
+"""
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+from config.config import settings
+from src.core.content_agent import ContentAgent
+from src.utils.circuit_breaker import get_all_circuit_breakers
+
+console = Console()
+app = typer.Typer()
+
+class _ReachableHandler(BaseHTTPRequestHandler):
+    """Answers Ollama /api/tags, model warm-ups and Notion database lookups immediately."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            body = {"models": [{"name": settings.ollama_model}]}
+        else:
+            body = {"object": "database", "id": "benchmark", "title": [{"plain_text": "Benchmark"}]}
+        self._send_json(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._send_json({"model": settings.ollama_model, "response": "", "done": True, "done_reason": "load"})
+
+    def _send_json(self, body: Dict):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def _start_reachable_server() -> Tuple[str, Callable[[], None]]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ReachableHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server.shutdown
+
+def _start_blackhole_server() -> Tuple[str, Callable[[], None]]:
+    # The kernel completes the TCP handshake but nothing ever reads or replies,
+    # which behaves like a host that swallows traffic.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(128)
+    return f"http://127.0.0.1:{sock.getsockname()[1]}", sock.close
+
+def probe_timeouts() -> Dict[str, float]:
+    """The timeout each background probe gives up after, in seconds."""
+    return {
+        "ollama": settings.provider_probe_timeout_seconds,
+        "notion": settings.provider_probe_timeout_seconds
+    }
+
+def measure_startup(base_url: str, runs: int) -> Dict:
+    """Time ContentAgent construction + warm_up and background probe completion."""
+    settings.ollama_base_url = base_url
+    settings.notion_base_url = base_url
+    settings.notion_token = settings.notion_token or "secret_benchmark"
+    settings.notion_database_id = settings.notion_database_id or "0" * 32
+
+    blocking: List[float] = []
+    settled: List[float] = []
+    ollama_up: List[bool] = []
+
+    for _ in range(runs):
+        for breaker in get_all_circuit_breakers().values():
+            breaker.reset()
+
+        started_at = time.perf_counter()
+        agent = ContentAgent()
+        agent.warm_up()
+        blocking.append(time.perf_counter() - started_at)
+
+        agent.llm_handler.wait_for_probes()
+        agent.notion_handler.connection_probe.join()
+        settled.append(time.perf_counter() - started_at)
+        ollama_up.append(agent.llm_handler.ollama_available)
+
+    return {
+        "runs": runs,
+        "blocking_mean_ms": statistics.mean(blocking) * 1000,
+        "blocking_max_ms": max(blocking) * 1000,
+        "probes_settled_mean_ms": statistics.mean(settled) * 1000,
+        "ollama_available": all(ollama_up)
+    }
+
+@app.command()
+def main(runs: int = typer.Option(5, help="Agent constructions per scenario"),
+         output: Optional[Path] = typer.Option(None, help="Write results as JSON to this file")):
+    """Benchmark ContentAgent startup with reachable and blackholed providers."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = {}
+    for scenario, start_server in (("reachable", _start_reachable_server),
+                                   ("blackholed", _start_blackhole_server)):
+        base_url, stop = start_server()
+        try:
+            results[scenario] = measure_startup(base_url, runs)
+        finally:
+            stop()
+
+    timeouts = probe_timeouts()
+    table = Table(title="ContentAgent startup (probe timeouts: "
+                        + ", ".join(f"{name} {seconds:g}s" for name, seconds in timeouts.items()) + ")")
+    table.add_column("Scenario")
+    table.add_column("Blocking mean (ms)", justify="right")
+    table.add_column("Blocking max (ms)", justify="right")
+    table.add_column("Probes settled (ms)", justify="right")
+    table.add_column("Ollama available")
+    for scenario, result in results.items():
+        table.add_row(
+            scenario,
+            f"{result['blocking_mean_ms']:.1f}",
+            f"{result['blocking_max_ms']:.1f}",
+            f"{result['probes_settled_mean_ms']:.1f}",
+            "yes" if result["ollama_available"] else "no"
+        )
+    console.print(table)
+
+    if output:
+        output.write_text(json.dumps({"probe_timeouts_seconds": timeouts, **results}, indent=2))
+        console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
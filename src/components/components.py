@@ -3,6 +3,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from typing import Dict, List, Optional
 import pandas as pd
+import os
 
 def render_metric_card(title: str, value: str, delta: str = None, help_text: str = None):
     """
@@ -41,6 +42,57 @@ def render_system_health(llm_status: Dict):
     #     st.markdown(f"**Notion API:** {notion_status_text}"
     # )
 
+def render_provider_health(provider_health: Dict):
+    """
+    Renders circuit breaker state and rolling metrics per provider.
+    """
+    
+    state_labels = {
+        "closed": "🟢 Closed",
+        "half_open": "🟡 Half-open",
+        "open": "🔴 Open"
+    }
+    
+    rows = []
+    for provider, health in provider_health.items():
+        rows.append({
+            "Provider": provider.title(),
+            "Circuit": state_labels.get(health['state'], health['state']),
+            "Requests": health['requests'],
+            "Error Rate": f"{health['error_rate']:.0%}",
+            "p50 Latency (s)": round(health['p50_latency'], 2) if health['p50_latency'] is not None else None,
+            "p95 Latency (s)": round(health['p95_latency'], 2) if health['p95_latency'] is not None else None,
+            "Skipped": health['rejected'],
+            "Retry In (s)": round(health['retry_in_seconds'], 1) if health['retry_in_seconds'] is not None else None
+        })
+    
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    for provider, health in provider_health.items():
+        if health['state'] != "closed" and health['last_error']:
+            st.caption(f"{provider.title()} last error: {health['last_error']}")
+
+def render_routing_report(routing_report: List[Dict], policy: str):
+    """
+    Renders the router's per-provider estimates for the active routing policy.
+    """
+    
+    st.caption(f"Auto routing policy: **{policy}**")
+    
+    rows = []
+    for estimate in routing_report:
+        rows.append({
+            "Provider": estimate['provider'].title(),
+            "p50 Latency (s)": round(estimate['p50_latency'], 2),
+            "p95 Latency (s)": round(estimate['p95_latency'], 2),
+            "Source": "observed" if estimate['observed'] else "declared",
+            "Error Rate": f"{estimate['error_rate']:.0%}",
+            "Est. Cost ($/1k-token reply)": round(estimate['cost'], 5),
+            "Available": "✅" if estimate['available'] else "❌"
+        })
+    
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
 def render_content_preview(content: str, max_length: int = 300):
     """
     Renders a preview of the content.
@@ -128,8 +180,8 @@ def render_content_form():
         with col2:
                 ai_provider = st.selectbox(
                     "AI Provider",
-                    options=["Gemini", "Ollama"],
-                    help="Select the AI provider for content generation."
+                    options=["Gemini", "Ollama", "Race", "Auto"],
+                    help="Select the AI provider for content generation. Race runs both and keeps the first response. Auto picks a provider per request using the configured routing policy."
                 )
                 
                 tone = st.selectbox(
@@ -203,6 +255,38 @@ def show_success_message(title: str, content_preview: str, stats: Dict):
               disabled=True,
           )
 
+def render_generation_latency(result: Dict):
+    """Show time-to-first-token and total generation latency"""
+    col1, col2 = st.columns(2)
+    with col1:
+        first_token = result.get('first_token_seconds')
+        st.metric("Time to First Token", f"{first_token:.2f}s" if first_token is not None else "N/A")
+    with col2:
+        total = result.get('total_seconds')
+        st.metric("Total Latency", f"{total:.2f}s" if total is not None else "N/A")
+
+def render_profile_report(report):
+    """Show the hottest functions of a profiled block and offer its .prof file"""
+    with st.expander(f"🐞 Profile: {report.label} ({report.total_seconds:.2f}s)", expanded=True):
+        df = pd.DataFrame([row.model_dump() for row in report.functions])
+        st.dataframe(
+            df,
+            column_config={
+                "function": st.column_config.TextColumn("Function"),
+                "location": st.column_config.TextColumn("Location", width="large"),
+                "calls": st.column_config.NumberColumn("Calls"),
+                "own_ms": st.column_config.NumberColumn("Own (ms)", format="%.1f"),
+                "cumulative_ms": st.column_config.NumberColumn("Cumulative (ms)", format="%.1f")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        if report.path:
+            with open(report.path, "rb") as f:
+                st.download_button("⬇️ Download .prof", f.read(), file_name=os.path.basename(report.path),
+                                   key=f"profile-{report.path}")
+            st.caption(f"Saved to `{report.path}`; open it with `python -m pstats` or snakeviz.")
+
 def show_error_message(error: str):
     """Show error message"""
     st.markdown('<div class="error-message">', unsafe_allow_html=True)
@@ -1,9 +1,14 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 import re
+import threading
+import time
+from src.prompt.prompt_cache import request_fingerprint
 from src.prompt.prompt_engine import ContentType, LengthType, PromptEngine, ContentRequest, ToneType
-from src.utils.llm_handler import LLMHandler
+from src.utils.generation_caps import GenerationCaps
+from src.utils.llm_handler import GenerationStream, LLMHandler
 from src.utils.notion_handler import NotionHandler
+from src.utils import profiling, tracing
 from config.config import settings
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -11,14 +16,112 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from src.template.template_manager import TemplateManager
 console = Console()
 
+# Content type labels used by the generator form that don't match a ContentType value
+CONTENT_TYPE_ALIASES = {
+    "blog post": ContentType.BLOG.value,
+    "social media post": ContentType.SOCIAL.value,
+    "email newsletter": ContentType.NEWSLETTER.value,
+}
+
 class ContentAgent:
     def __init__(self):
-        self.llm_handler = LLMHandler()
-        self.notion_handler = NotionHandler()
-        self.prompt_engine = PromptEngine()
-        self.template_manager = TemplateManager()
+        # Handlers are created on first use so that an unreachable provider or
+        # a missing Notion token never blocks the first page load.
+        self._llm_handler: Optional[LLMHandler] = None
+        self._notion_handler: Optional[NotionHandler] = None
+        self._prompt_engine: Optional[PromptEngine] = None
+        self._template_manager: Optional[TemplateManager] = None
+        self._init_lock = threading.RLock()
         logger.info("Content Agent initialized")
 
+    @property
+    def llm_handler(self) -> LLMHandler:
+        with self._init_lock:
+            if self._llm_handler is None:
+                self._llm_handler = LLMHandler()
+            return self._llm_handler
+
+    @property
+    def notion_handler(self) -> NotionHandler:
+        with self._init_lock:
+            if self._notion_handler is None:
+                self._notion_handler = NotionHandler()
+                self._notion_handler.start_connection_probe()
+            return self._notion_handler
+
+    @property
+    def prompt_engine(self) -> PromptEngine:
+        with self._init_lock:
+            if self._prompt_engine is None:
+                self._prompt_engine = PromptEngine()
+            return self._prompt_engine
+
+    @property
+    def template_manager(self) -> TemplateManager:
+        with self._init_lock:
+            if self._template_manager is None:
+                self._template_manager = TemplateManager()
+            return self._template_manager
+
+    def warm_up(self):
+        """Start background provider and Notion probes without waiting for them"""
+        # Accessing the properties creates the handlers, which start their own probes
+        self.llm_handler
+        if settings.notion_token:
+            self.notion_handler
+
+    def _normalize_content_type(self, content_type: str) -> ContentType:
+        """Map a content type label from the UI to a ContentType"""
+        label = content_type.strip().lower()
+        value = CONTENT_TYPE_ALIASES.get(label, label.replace(" ", "_"))
+        try:
+            return ContentType(value)
+        except ValueError:
+            logger.warning(f"Unknown content type '{content_type}', using {settings.default_content_type}")
+            return ContentType(settings.default_content_type)
+
+    def build_content_request(self,
+                              topic: str,
+                              content_type: str = "blog",
+                              tone: str = "professional",
+                              length: str = "medium",
+                              target_audience: str = None,
+                              keywords: List[str] = None,
+                              industry: str = None,
+                              custom_instructions: str = None,
+                              include_examples: bool = False,
+                              seo_focused: bool = False,
+                              call_to_action: str = None,
+                              brand_voice: str = None) -> ContentRequest:
+        """Build a validated ContentRequest from form values"""
+        return ContentRequest(
+            topic=topic,
+            content_type=self._normalize_content_type(content_type),
+            tone=ToneType(tone.lower()),
+            length=LengthType(length.lower().replace(" ", "_")),
+            target_audience=target_audience,
+            keywords=keywords or [],
+            industry=industry,
+            custom_instructions=custom_instructions,
+            include_examples=include_examples,
+            seo_focused=seo_focused,
+            call_to_action=call_to_action,
+            brand_voice=brand_voice
+        )
+
+    def generation_caps(self, content_request: ContentRequest, prompt: str) -> Optional[GenerationCaps]:
+        """Output caps derived from the word count range the prompt asks for"""
+        if not settings.llm_length_caps_enabled:
+            return None
+        _, max_words = self.prompt_engine.get_word_count_range(content_request)
+        return GenerationCaps.for_word_count(
+            max_words,
+            prompt,
+            headroom=settings.llm_output_token_headroom,
+            min_context_tokens=settings.llm_min_context_tokens,
+            label=f"{content_request.content_type.value}/{content_request.length.value}"
+        )
+
     def generate_content_with_advanced_prompts(self,
                                              topic: str,
                                              content_type: str = "blog",
@@ -32,34 +135,193 @@ class ContentAgent:
                                              include_examples: bool = False,
                                              seo_focused: bool = False,
                                              call_to_action: str = None,
-                                             brand_voice: str = None) -> Optional[Dict]:
+                                             brand_voice: str = None,
+                                             use_cache: bool = True) -> Optional[Dict]:
         """Generate content using advanced prompt engineering"""
-        
-        with Progress(
+
+        with tracing.span("content.generate", requested_provider=ai_provider,
+                          content_type=content_type, length=length) as trace, profiling.profile(
+            "content.generate", request_id=trace.request_id
+        ) as profile, Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console
         ) as progress:
-            
+
             # Step 1: Create enhanced content request
             task1 = progress.add_task("Preparing advanced prompt...", total=None)
-            
+
             try:
-                content_request = ContentRequest(
-                    topic=topic,
-                    content_type=ContentType(content_type.lower()),
-                    tone=ToneType(tone.lower()),
-                    length=LengthType(length.lower()),
-                    target_audience=target_audience,
-                    keywords=keywords or [],
-                    industry=industry,
-                    custom_instructions=custom_instructions,
-                    include_examples=include_examples,
-                    seo_focused=seo_focused,
-                    call_to_action=call_to_action,
-                    brand_voice=brand_voice
-                )
+                with tracing.span("prompt.render") as span:
+                    content_request = self.build_content_request(
+                        topic=topic,
+                        content_type=content_type,
+                        tone=tone,
+                        length=length,
+                        target_audience=target_audience,
+                        keywords=keywords,
+                        industry=industry,
+                        custom_instructions=custom_instructions,
+                        include_examples=include_examples,
+                        seo_focused=seo_focused,
+                        call_to_action=call_to_action,
+                        brand_voice=brand_voice
+                    )
+                    prompt = self.prompt_engine.create_enhanced_prompt(content_request)
+                    prompt_tokens = self.prompt_engine.count_tokens(prompt)
+                    span.set(prompt_chars=len(prompt), prompt_tokens=prompt_tokens)
                 progress.update(task1, description="Prompt prepared")
             except Exception as e:
                 logger.error(f"Error preparing prompt: {e}")
+                trace.fail(e)
+                return None
+
+            # Step 2: Generate content
+            task2 = progress.add_task(f"Generating content with {ai_provider}...", total=None)
+            started_at = time.perf_counter()
+            caps = self.generation_caps(content_request, prompt)
+            generation = self.llm_handler.generate(prompt, ai_provider, use_cache=use_cache, caps=caps)
+            total_seconds = time.perf_counter() - started_at
+
+            if not generation or not generation.content:
+                logger.error("Content generation failed")
+                trace.fail("content generation failed")
+                return None
+            progress.update(task2, description=f"Content generated with {generation.provider}")
+
+            # Step 3: Post-process
+            with tracing.span("content.process", input_chars=len(generation.content)):
+                result = self.process_content(generation.content, content_request, generation.provider)
+            result['total_seconds'] = total_seconds
+            result['prompt_tokens'] = prompt_tokens
+            result['request_id'] = trace.request_id
+            trace.set(provider=generation.provider, word_count=result['word_count'])
+            if profile:
+                result['profile'] = profile.stop()
+                trace.set(profile_path=result['profile'].path)
+            return result
+
+    def stream_content(self,
+                       topic: str,
+                       content_type: str = "blog",
+                       ai_provider: str = "gemini",
+                       tone: str = "professional",
+                       length: str = "medium",
+                       use_cache: bool = True,
+                       **options) -> Optional[Tuple[ContentRequest, GenerationStream]]:
+        """Start a streaming generation and return the request with its chunk stream"""
+        # The stream runs after this returns; its llm.stream span joins this request's trace
+        with tracing.span("content.stream", requested_provider=ai_provider,
+                          content_type=content_type, length=length) as trace:
+            try:
+                with tracing.span("prompt.render") as span:
+                    content_request = self.build_content_request(
+                        topic=topic,
+                        content_type=content_type,
+                        tone=tone,
+                        length=length,
+                        **options
+                    )
+                    prompt = self.prompt_engine.create_enhanced_prompt(content_request)
+                    span.set(prompt_chars=len(prompt), prompt_tokens=self.prompt_engine.count_tokens(prompt))
+            except Exception as e:
+                logger.error(f"Error preparing prompt: {e}")
+                trace.fail(e)
+                return None
+
+            caps = self.generation_caps(content_request, prompt)
+            return content_request, self.llm_handler.stream_content(prompt, ai_provider, use_cache=use_cache, caps=caps)
+
+    def save_streamed_content(self,
+                              content_request: ContentRequest,
+                              stream: GenerationStream,
+                              tags: List[str] = None) -> Optional[Dict]:
+        """Post-process a finished stream and save it to Notion"""
+        if not stream.text.strip():
+            logger.error("Content generation failed")
+            return None
+
+        with tracing.span("content.process", request_id=stream.request_id, input_chars=len(stream.text)):
+            result = self.process_content(stream.text, content_request, stream.provider, tags)
+        result['request_id'] = stream.request_id
+        result['first_token_seconds'] = stream.first_token_seconds
+        result['total_seconds'] = stream.total_seconds
+        return self.save_content(result)
+
+    def process_content(self,
+                        content: str,
+                        content_request: ContentRequest,
+                        ai_provider: str,
+                        tags: List[str] = None) -> Dict:
+        """Turn raw model output into a content record"""
+        content = content.strip()
+        fallback_title = content_request.topic.splitlines()[0].strip()
+        title = self._extract_title(content, fallback_title)
+
+        if not tags:
+            tags = [content_request.content_type.value.replace("_", " ").title()]
+            tags.extend(content_request.keywords or [])
+
+        return {
+            'title': title,
+            'content': content,
+            'content_preview': content[:500] + ("..." if len(content) > 500 else ""),
+            'word_count': len(content.split()),
+            'content_type': content_request.content_type.value,
+            'tags': tags,
+            'ai_provider': ai_provider,
+            # Same for every request asking for the same content, whatever its keyword order
+            'request_fingerprint': request_fingerprint(content_request),
+            'notion_page_id': None
+        }
+
+    def _extract_title(self, content: str, fallback: str) -> str:
+        """Use the first heading or line of the generated content as title"""
+        for line in content.splitlines():
+            line = re.sub(r'^#+\s*', '', line.strip()).strip('*_" ')
+            if not line:
+                continue
+            if line.lower().startswith("title:"):
+                line = line[len("title:"):].strip('*_" ')
+            return line[:100] or fallback
+        return fallback
+
+    def save_content(self, result: Dict) -> Dict:
+        """Save a processed content record to Notion"""
+        with tracing.span("content.save", request_id=result.get('request_id')) as span:
+            result['notion_page_id'] = self.notion_handler.create_content_page(
+                title=result['title'],
+                content=result['content'],
+                content_type=result['content_type'].replace("_", " ").title(),
+                ai_provider=result['ai_provider'].title(),
+                tags=result['tags']
+            )
+            if result['notion_page_id'] is None:
+                span.fail("Notion page was not created")
+        return result
+
+    def generate_and_save_content(self,
+                                  topic: str,
+                                  content_type: str = "blog",
+                                  ai_provider: str = "gemini",
+                                  tone: str = "professional",
+                                  length: str = "medium",
+                                  tags: List[str] = None,
+                                  **options) -> Optional[Dict]:
+        """Generate content and save it to Notion"""
+        with tracing.span("content.pipeline", requested_provider=ai_provider) as trace:
+            result = self.generate_content_with_advanced_prompts(
+                topic=topic,
+                content_type=content_type,
+                ai_provider=ai_provider,
+                tone=tone,
+                length=length,
+                **options
+            )
+            if result is None:
+                trace.fail("content generation failed")
                 return None
+
+            if tags:
+                result['tags'] = tags
+            return self.save_content(result)
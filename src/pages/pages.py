@@ -9,16 +9,26 @@ import pandas as pd
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(project_root))
 
+from config.config import settings
 from src.core.content_agent import ContentAgent
+from src.utils import profiling
 from src.components.components import (
     render_content_form,
     show_success_message,
     show_error_message,
     render_system_health,
     render_content_stats,
-    render_content_table
+    render_content_table,
+    render_generation_latency,
+    render_profile_report,
+    render_provider_health,
+    render_routing_report
 )
 
+def _profiling_enabled() -> bool:
+    """The Settings page toggle for this session, defaulting to PROFILING_ENABLED"""
+    return st.session_state.get('profiling_enabled', settings.profiling_enabled)
+
 def show_content_generator():
     """Content Generation Page"""
     st.header("📝 Content Generator")
@@ -27,6 +37,7 @@ def show_content_generator():
         with st.spinner("Initializing AI Content Agent..."):
             try:
                 st.session_state.agent = ContentAgent()
+                st.session_state.agent.warm_up()
                 st.success("✅ AI Content Agent initialized successfully!")
             except Exception as e:
                 st.error(f"❌ Failed to initialize agent: {str(e)}")
@@ -40,15 +51,16 @@ def show_content_generator():
             return
         
         try:
-            with st.spinner("🤖 Generating content..."):
-                # Create enhanced prompt if custom instructions provided
-                topic = form_data['topic']
-                if form_data['custom_prompt']:
-                    topic += f"\n\nAdditional instructions: {form_data['custom_prompt']}"
-                if form_data['target_audience']:
-                    topic += f"\n\nTarget audience: {form_data['target_audience']}"
-
-                result = st.session_state.agent.generate_and_save_content(
+            # Create enhanced prompt if custom instructions provided
+            topic = form_data['topic']
+            if form_data['custom_prompt']:
+                topic += f"\n\nAdditional instructions: {form_data['custom_prompt']}"
+            if form_data['target_audience']:
+                topic += f"\n\nTarget audience: {form_data['target_audience']}"
+
+            result = None
+            with profiling.profile("content.stream", enabled=_profiling_enabled()) as profile:
+                generation = st.session_state.agent.stream_content(
                     topic=topic,
                     content_type=form_data['content_type'],
                     ai_provider=form_data['ai_provider'],
@@ -56,6 +68,23 @@ def show_content_generator():
                     length=form_data['length']
                 )
 
+                if generation:
+                    content_request, stream = generation
+                    if profile:
+                        profile.request_id = stream.request_id
+
+                    # Render tokens as they arrive
+                    st.subheader("✍️ Live Output")
+                    with st.container(border=True):
+                        st.write_stream(stream)
+
+                    with st.spinner("💾 Saving content..."):
+                        result = st.session_state.agent.save_streamed_content(
+                            content_request,
+                            stream,
+                            tags=form_data['tags']
+                        )
+
             if result:
                 # Store in session state for later reference
                 if 'generated_content' not in st.session_state:
@@ -75,8 +104,16 @@ def show_content_generator():
                     }
                 )
 
+                # Show latency
+                render_generation_latency(result)
+                if profile:
+                    render_profile_report(profile.report)
+
                 # Show Notion link
-                st.info(f"💾 Content saved to Notion. Page ID: `{result['notion_page_id']}`")
+                if result['notion_page_id']:
+                    st.info(f"💾 Content saved to Notion. Page ID: `{result['notion_page_id']}`")
+                else:
+                    st.warning("⚠️ Content generated but could not be saved to Notion.")
 
             else:
                 show_error_message("Failed to generate or save content. Please check system status.")
@@ -97,13 +134,21 @@ def show_content_generator():
                 with col1:
                     st.write(f"**Word Count:** {content['word_count']}")
                     st.write(f"**AI Provider:** {content['ai_provider'].title()}")
+                    if content.get('total_seconds') is not None:
+                        st.write(f"**Total Latency:** {content['total_seconds']:.2f}s")
                 with col2:
                     st.write(f"**Tags:** {', '.join(content['tags'])}")
                     st.write(f"**Notion ID:** `{content['notion_page_id']}`")
 
 def show_content_library():
     """Content Library Page"""
-    
+    # Covers the Notion query, the pandas processing and the chart rendering
+    with profiling.profile("content_library", enabled=_profiling_enabled()) as profile:
+        _render_content_library()
+    if profile:
+        render_profile_report(profile.report)
+
+def _render_content_library():
     st.header("📚 Content Library")
 
     if 'agent' not in st.session_state:
@@ -225,6 +270,7 @@ def show_system_status():
         with st.spinner("Initializing AI Content Agent..."):
             try:
                 st.session_state.agent = ContentAgent()
+                st.session_state.agent.warm_up()
                 st.success("✅ AI Content Agent initialized for status check!")
             except Exception as e:
                 st.error(f"❌ Failed to initialize agent: {str(e)}")
@@ -234,13 +280,13 @@ def show_system_status():
         try:
             # Test LLM providers with proper error handling
             try:
-                gemini_test = st.session_state.agent.llm_handler.generate_content("Test", "gemini") is not None
+                gemini_test = st.session_state.agent.llm_handler.generate_content("Test", "gemini", use_cache=False) is not None
             except Exception as e:
                 st.warning(f"Gemini test failed: {e}")
                 gemini_test = False
                 
             try:
-                ollama_test = st.session_state.agent.llm_handler.generate_content("Test", "ollama") is not None
+                ollama_test = st.session_state.agent.llm_handler.generate_content("Test", "ollama", use_cache=False) is not None
             except Exception as e:
                 st.warning(f"Ollama test failed: {e}")
                 ollama_test = False
@@ -260,6 +306,12 @@ def show_system_status():
 
             render_system_health(llm_status)
 
+            # Circuit breaker state
+            st.markdown("---")
+            st.subheader("⚡ Provider Circuit Breakers")
+            render_provider_health(st.session_state.agent.llm_handler.get_provider_health())
+            render_routing_report(st.session_state.agent.llm_handler.get_routing_report(), settings.llm_routing_policy)
+
             # Detailed status
             st.markdown("---")
             st.subheader("🔍 Detailed Status")
@@ -279,6 +331,60 @@ def show_system_status():
                 else:
                     st.error("❌ Ollama: Failed to connect or not running")
 
+                for provider, provider_stats in st.session_state.agent.llm_handler.get_provider_stats().items():
+                    if 'warm_requests' not in provider_stats:
+                        continue
+                    st.markdown(f"### 🔥 {provider.title()} Model Warmth")
+                    cold_p50 = provider_stats['cold_p50_latency']
+                    warm_p50 = provider_stats['warm_p50_latency']
+                    st.write(f"**Cold Loads:** {provider_stats['cold_requests']} · "
+                             f"p50 {f'{cold_p50:.2f}s' if cold_p50 is not None else 'n/a'}")
+                    st.write(f"**Warm Requests:** {provider_stats['warm_requests']} · "
+                             f"p50 {f'{warm_p50:.2f}s' if warm_p50 is not None else 'n/a'}")
+                    st.write(f"**Warm-ups:** {provider_stats['warmups']} · **Keep-alive:** {provider_stats['keep_alive']} · "
+                             f"**Keeper:** {'running' if provider_stats['keeper_running'] else 'stopped'}")
+
+            with col2:
+                st.markdown("### 💾 Response Cache")
+
+                cache_stats = st.session_state.agent.llm_handler.get_cache_stats()
+                if cache_stats:
+                    st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+                    st.write(f"**Hits:** {cache_stats['hits']} · **Misses:** {cache_stats['misses']}")
+                    st.write(f"**Entries:** {cache_stats['entries']} / {cache_stats['max_entries']}")
+                else:
+                    st.info("Response caching is disabled.")
+
+                st.markdown("### 🧩 Prompt Cache")
+
+                prompt_cache_stats = st.session_state.agent.prompt_engine.get_cache_stats()
+                if prompt_cache_stats:
+                    st.metric("Prompt Hit Rate", f"{prompt_cache_stats['hit_rate']:.0%}")
+                    st.write(f"**Hits:** {prompt_cache_stats['hits']} · **Misses:** {prompt_cache_stats['misses']} · "
+                             f"**Entries:** {prompt_cache_stats['entries']} / {prompt_cache_stats['max_entries']}")
+                else:
+                    st.info("Prompt caching is disabled.")
+
+                st.markdown("### 🔗 Request Coalescing")
+
+                coalescing_stats = st.session_state.agent.llm_handler.get_coalescing_stats()
+                st.metric("Provider Calls Saved", coalescing_stats["coalesced"])
+                st.write(f"**Provider Calls:** {coalescing_stats['calls']} · **In Flight:** {coalescing_stats['in_flight']}")
+
+                st.markdown("### ✂️ Length Caps")
+
+                truncation_stats = st.session_state.agent.llm_handler.get_truncation_stats()
+                if truncation_stats:
+                    st.dataframe(pd.DataFrame([{
+                        "Provider": row['provider'].title(),
+                        "Request": row['label'],
+                        "Generations": row['requests'],
+                        "Truncated": f"{row['truncated']} ({row['truncation_rate']:.0%})",
+                        "Stopped Early": f"{row['budget_stops']} ({row['budget_stop_rate']:.0%})"
+                    } for row in truncation_stats]), use_container_width=True, hide_index=True)
+                else:
+                    st.info("No capped generations yet.")
+
             # with col2:
             #     st.markdown("### 💾 Storage")
 
@@ -544,6 +650,17 @@ def show_settings():
                     st.warning("⚠️ Settings updated for current session, but couldn't save to .env file. Changes may not persist after restart.")
                 st.balloons()
 
+    # Debugging Section
+    st.markdown("---")
+    st.markdown("### 🐞 Debugging")
+    # Per session, so one user's choice doesn't profile everyone's generations
+    st.session_state.profiling_enabled = st.toggle(
+        "Profile generations",
+        value=_profiling_enabled(),
+        help=(f"Run each generation and Content Library load under cProfile, show the hottest functions "
+              f"and save the .prof file to {settings.profiling_output_dir} (PROFILING_ENABLED)")
+    )
+
     # Connection Status Section
     st.markdown("---")
     st.markdown("### 🔍 Connection Status")
@@ -0,0 +1,80 @@
+import bisect
+import re
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Sequence, Tuple
+
+# Audience categories in order of precedence, with the words that identify them.
+# A word matches anywhere in the lowercased audience ("new" matches "newcomers").
+AUDIENCE_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "beginners": ("beginner", "new", "starter", "novice"),
+    "professionals": ("professional", "expert", "specialist", "practitioner"),
+    "executives": ("executive", "manager", "leader", "director", "ceo"),
+    "technical": ("developer", "engineer", "technical", "programmer")
+})
+DEFAULT_AUDIENCE = "general"
+
+class AudienceClassifier:
+    """Maps free-text audiences to categories, in order of precedence.
+
+    A keyword matches anywhere in the lowercased audience, as a substring.
+    Single audiences are checked with one compiled alternation per
+    category, highest precedence first. Batches are searched keyword by
+    keyword over all the audiences joined together, so the search runs in
+    C and the only per-audience work is bookkeeping for actual matches.
+    """
+
+    def __init__(self, keywords: Mapping[str, Sequence[str]] = AUDIENCE_KEYWORDS, default: str = DEFAULT_AUDIENCE):
+        self.keywords: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (category, tuple(word.lower() for word in words)) for category, words in keywords.items()
+        )
+        self.default = default
+        self._searches = [
+            (category, re.compile("|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))).search)
+            for category, words in self.keywords if words
+        ]
+
+    def categories(self, audience: str) -> List[str]:
+        """Every category the audience matches, highest precedence first."""
+        audience_lower = audience.lower()
+        return [category for category, search in self._searches if search(audience_lower)]
+
+    def categorize(self, audience: str) -> str:
+        """The highest-precedence category the audience matches, or the default."""
+        audience_lower = audience.lower()
+        for category, search in self._searches:
+            if search(audience_lower):
+                return category
+        return self.default
+
+    def categorize_many(self, audiences: Iterable[str]) -> List[str]:
+        """``categorize`` for many audiences at once."""
+        # Lowercased one by one: lowercasing can change a string's length
+        audiences = [audience.lower() for audience in audiences]
+        starts, offset = [], 0
+        for audience in audiences:
+            starts.append(offset)
+            offset += len(audience) + 1
+        # Joined with a newline, which no keyword contains; matches are mapped
+        # back to their audience by offset
+        text = "\n".join(audiences)
+
+        unmatched = len(self.keywords)
+        best = [unmatched] * len(audiences)
+        for rank, (_, words) in enumerate(self.keywords):
+            for word in words:
+                position = text.find(word)
+                while position != -1:
+                    index = bisect.bisect_right(starts, position) - 1
+                    if rank < best[index]:
+                        best[index] = rank
+                    position = text.find(word, position + 1)
+
+        names = [category for category, _ in self.keywords] + [self.default]
+        return [names[rank] for rank in best]
+
+# Shared by every PromptEngine
+audience_classifier = AudienceClassifier()
+
+def categorize_audiences(audiences: Iterable[str]) -> List[str]:
+    """Categorize many audiences at once, e.g. a campaign file's target audiences."""
+    return audience_classifier.categorize_many(audiences)
@@ -0,0 +1,172 @@
+"""Render prompts for a whole file of content requests.
+
+Rows are read, validated into ContentRequest, rendered and written one at
+a time, so memory use doesn't grow with the input. Rows that can't be
+parsed or validated go to a side file with their line number and the
+reason, and the run carries on.
+
+Run with: python -m src.prompt.batch campaign.csv --output prompts.jsonl
+"""
+import csv
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, TextIO, Union
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from pydantic import BaseModel, ValidationError
+from rich.console import Console
+
+from src.prompt.prompt_cache import request_fingerprint
+from src.prompt.prompt_engine import ContentRequest, PromptEngine
+
+console = Console()
+app = typer.Typer()
+
+# Accepted as "blog", "Blog" or "BLOG"; "extra long" means "extra_long"
+ENUM_FIELDS = ("content_type", "tone", "length")
+
+class SourceRow(NamedTuple):
+    """A row read from a file: its line number, and the parsed data or the parse error."""
+    line: int
+    data: Any
+
+
+class RenderedPrompt(BaseModel):
+    line: int
+    id: Optional[str] = None
+    fingerprint: str
+    content_type: str
+    prompt_chars: int
+    prompt_tokens: int
+    prompt: str
+
+
+class RowError(BaseModel):
+    line: int
+    error: str
+    row: Any = None
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+                         for detail in error.errors())
+    return str(error)
+
+def _to_request(data: Any) -> ContentRequest:
+    if isinstance(data, ContentRequest):
+        return data
+    if not isinstance(data, Mapping):
+        raise ValueError(f"Expected an object, got {type(data).__name__}")
+    fields = dict(data)
+    for name in ENUM_FIELDS:
+        if isinstance(fields.get(name), str):
+            fields[name] = fields[name].strip().lower().replace(" ", "_")
+    return ContentRequest.model_validate(fields)
+
+def render_many(rows: Iterable[Union[ContentRequest, Mapping, SourceRow]],
+                engine: Optional[PromptEngine] = None) -> Iterator[Union[RenderedPrompt, RowError]]:
+    """Render a prompt for each row, lazily.
+
+    Rows are ContentRequests, dicts of ContentRequest fields, or SourceRows
+    from ``read_rows``. Each row yields a RenderedPrompt or, when it can't
+    be parsed, validated or rendered, a RowError; later rows still render.
+    Rows without a line number are numbered from 1.
+    """
+    engine = engine or PromptEngine()
+    for position, row in enumerate(rows, start=1):
+        line, data = (row.line, row.data) if isinstance(row, SourceRow) else (position, row)
+        if isinstance(data, Exception):
+            yield RowError(line=line, error=_describe(data))
+            continue
+        try:
+            request = _to_request(data)
+            prompt = engine.create_enhanced_prompt(request)
+        except (ValidationError, ValueError, TypeError) as e:
+            yield RowError(line=line, error=_describe(e),
+                           row=data.model_dump(mode="json") if isinstance(data, BaseModel) else data)
+            continue
+        row_id = data.get("id") if isinstance(data, Mapping) else None
+        yield RenderedPrompt(line=line, id=None if row_id is None else str(row_id),
+                             fingerprint=request_fingerprint(request), content_type=request.content_type.value,
+                             prompt_chars=len(prompt), prompt_tokens=engine.count_tokens(prompt), prompt=prompt)
+
+def read_jsonl(file: TextIO) -> Iterator[SourceRow]:
+    """One SourceRow per non-blank line; lines that aren't valid JSON carry the error."""
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield SourceRow(line_number, json.loads(line))
+        except json.JSONDecodeError as e:
+            yield SourceRow(line_number, ValueError(f"Invalid JSON: {e.msg} at column {e.colno}"))
+
+def read_csv(file: TextIO) -> Iterator[SourceRow]:
+    """One SourceRow per data row; empty cells are left out and keywords split on ';' or ','."""
+    reader = csv.DictReader(file)
+    for row in reader:
+        if None in row:
+            yield SourceRow(reader.line_num, ValueError("Row has more cells than the header"))
+            continue
+        data: Dict[str, Any] = {key.strip(): value.strip() for key, value in row.items()
+                                if key and isinstance(value, str) and value.strip()}
+        if "keywords" in data:
+            data["keywords"] = [keyword.strip() for keyword in re.split(r"[;,]", data["keywords"]) if keyword.strip()]
+        yield SourceRow(reader.line_num, data)
+
+def read_rows(file: TextIO, format: str) -> Iterator[SourceRow]:
+    if format == "jsonl":
+        return read_jsonl(file)
+    if format == "csv":
+        return read_csv(file)
+    raise ValueError(f"Unknown format '{format}'. Use 'jsonl' or 'csv'.")
+
+def _format_for(path: Path) -> str:
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+@app.command()
+def main(input: Path = typer.Argument(..., help="JSONL or CSV file of ContentRequest fields, one request per row"),
+         output: Optional[Path] = typer.Option(None, help="Rendered prompts as JSONL [default: <input>.prompts.jsonl]"),
+         errors: Optional[Path] = typer.Option(None, help="Rows that failed, as JSONL [default: <input>.errors.jsonl]"),
+         format: Optional[str] = typer.Option(None, help="jsonl or csv [default: from the file extension]")):
+    """Render a prompt for every request in a JSONL or CSV file."""
+    output = output or input.with_name(f"{input.stem}.prompts.jsonl")
+    errors = errors or input.with_name(f"{input.stem}.errors.jsonl")
+    format = (format or _format_for(input)).lower()
+    if format not in ("jsonl", "csv"):
+        raise typer.BadParameter(f"Unknown format '{format}'. Use 'jsonl' or 'csv'.", param_hint="--format")
+
+    rendered = failed = 0
+    error_file: Optional[TextIO] = None
+    started_at = time.perf_counter()
+    try:
+        with open(input, newline="" if format == "csv" else None, encoding="utf-8") as source, \
+                open(output, "w", encoding="utf-8") as sink:
+            for result in render_many(read_rows(source, format)):
+                if isinstance(result, RowError):
+                    # Only created when a row fails
+                    error_file = error_file or open(errors, "w", encoding="utf-8")
+                    error_file.write(result.model_dump_json() + "\n")
+                    failed += 1
+                else:
+                    sink.write(result.model_dump_json() + "\n")
+                    rendered += 1
+    finally:
+        if error_file:
+            error_file.close()
+    seconds = time.perf_counter() - started_at
+
+    console.print(f"Rendered {rendered} prompts to {output} in {seconds:.2f}s "
+                  f"({(rendered + failed) / seconds if seconds else 0:.0f} rows/s)")
+    if failed:
+        console.print(f"[yellow]{failed} rows failed; see {errors}[/yellow]")
+
+if __name__ == "__main__":
+    app()
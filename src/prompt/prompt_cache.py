@@ -0,0 +1,119 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from enum import Enum
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from config.config import settings
+
+def normalize_keywords(keywords: Optional[List[str]]) -> Optional[List[str]]:
+    """Keywords without blanks or duplicates, sorted, so their order doesn't matter."""
+    if not keywords:
+        return None
+    normalized = {keyword.strip() for keyword in keywords if keyword}
+    normalized.discard("")
+    return sorted(normalized) or None
+
+# Sorted field names per request model
+_field_names: Dict[type, Tuple[str, ...]] = {}
+
+def canonical_request(request, normalize: bool = False) -> Tuple[Tuple[str, Hashable], ...]:
+    """Hashable (field, value) pairs describing everything that shapes a request's prompt.
+
+    Keywords are kept in their order, as the prompt lists them. With
+    ``normalize``, they are normalized, so two requests that only differ in
+    keyword order give the same result.
+    """
+    names = _field_names.get(type(request))
+    if names is None:
+        names = _field_names[type(request)] = tuple(sorted(type(request).model_fields))
+    values = request.__dict__
+    items = [(name, values[name]) for name in names]
+    if values.get("keywords") is not None:
+        keywords = normalize_keywords(values["keywords"]) if normalize else values["keywords"]
+        items[names.index("keywords")] = ("keywords", tuple(keywords) if keywords else None)
+    return tuple(items)
+
+def request_fingerprint(request) -> str:
+    """Stable hex digest of a request, the same in every process.
+
+    Requests with the same fingerprint ask for the same content and differ
+    at most in keyword order, so it can group or deduplicate generated
+    records. It does not identify a prompt: the prompt lists keywords in the
+    order given, so prompts are cached on ``canonical_request`` and model
+    responses on the prompt text.
+    """
+    payload = json.dumps(canonical_request(request, normalize=True), separators=(",", ":"), ensure_ascii=False,
+                         default=lambda value: value.value if isinstance(value, Enum) else str(value))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """Bounded in-memory LRU of rendered prompts, keyed on ``canonical_request``.
+
+    Batch jobs and retries send the same request again and again; a hit
+    skips rendering entirely. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        """Return the prompt cached under ``key``, rendering and storing it on a miss."""
+        with self._lock:
+            prompt = self._entries.get(key)
+            if prompt is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return prompt
+            self.misses += 1
+
+        # Rendered outside the lock; a concurrent miss for the same key just renders twice
+        prompt = render()
+        with self._lock:
+            self._entries[key] = prompt
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prompt
+
+    def clear(self):
+        """Remove all cached prompts and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+_cache: Optional[PromptCache] = None
+_cache_lock = threading.Lock()
+
+def get_prompt_cache() -> Optional[PromptCache]:
+    """Return the process-wide prompt cache, or None when it is disabled."""
+    global _cache
+
+    if settings.prompt_cache_max_entries <= 0:
+        return None
+    if _cache is not None:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptCache(settings.prompt_cache_max_entries)
+        return _cache
@@ -1,8 +1,16 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, List, Mapping, Optional, Any, Tuple
 from datetime import datetime
+from string import Formatter
+from types import MappingProxyType
 import json
+import re
+from loguru import logger
 from pydantic import BaseModel
 from enum import Enum
+from config.config import settings
+from src.prompt.audience import audience_classifier
+from src.prompt.prompt_cache import canonical_request, get_prompt_cache
+from src.prompt.tokens import PromptBudgetReport, PromptSection, Tokenizer, get_tokenizer, prompt_sections
 
 class ContentType(Enum):
     BLOG = "blog"
@@ -46,16 +54,12 @@ class ContentRequest(BaseModel):
     seo_focused: bool = False
     industry: Optional[str] = None
 
-class PromptEngine:
-    def __init__(self):
-        self.base_prompts = self._load_base_prompts()
-        self.prompt_modifiers = self._load_prompt_modifiers()
-        self.content_structures = self._load_content_structures()
-        
-    def _load_base_prompts(self) -> Dict[str, str]:
-        """Load base prompt templates for each content type"""
-        return {
-            ContentType.BLOG.value: """
+# Prompt templates and modifiers are built once per process and shared by
+# every PromptEngine; treat them as read-only.
+
+# Base prompt templates for each content type
+BASE_PROMPTS: Mapping[str, str] = MappingProxyType({
+    ContentType.BLOG.value: """
 You are an expert content writer specializing in creating engaging blog posts. 
 
 Write a {length_description} blog post about "{topic}".
@@ -85,7 +89,7 @@ WRITING GUIDELINES:
 {additional_instructions}
 """,
 
-            ContentType.SOCIAL.value: """
+    ContentType.SOCIAL.value: """
 You are a social media expert creating engaging content for {platform}.
 
 Create a {tone} social media post about "{topic}".
@@ -113,7 +117,7 @@ WRITING GUIDELINES:
 {additional_instructions}
 """,
 
-            ContentType.MARKETING.value: """
+    ContentType.MARKETING.value: """
 You are a conversion copywriter creating persuasive marketing content.
 
 Write {length_description} marketing copy for "{topic}".
@@ -144,7 +148,7 @@ COPYWRITING TECHNIQUES:
 {additional_instructions}
 """,
 
-            ContentType.EMAIL.value: """
+    ContentType.EMAIL.value: """
 You are an email marketing specialist creating high-converting email campaigns.
 
 Write a {length_description} email about "{topic}".
@@ -174,7 +178,7 @@ EMAIL BEST PRACTICES:
 {additional_instructions}
 """,
 
-            ContentType.ARTICLE.value: """
+    ContentType.ARTICLE.value: """
 You are a professional journalist and subject matter expert.
 
 Write a comprehensive {length_description} article about "{topic}".
@@ -205,7 +209,7 @@ WRITING STANDARDS:
 {additional_instructions}
 """,
 
-            ContentType.TUTORIAL.value: """
+    ContentType.TUTORIAL.value: """
 You are an instructional designer creating step-by-step educational content.
 
 Create a comprehensive tutorial on "{topic}".
@@ -235,202 +239,102 @@ INSTRUCTIONAL DESIGN:
 
 {additional_instructions}
 """
-        }
+})
+
+# Prompt modifiers for different aspects
+PROMPT_MODIFIERS: Mapping[str, Dict] = MappingProxyType({
+    "tone_modifiers": {
+        ToneType.PROFESSIONAL.value: "Maintain a professional, authoritative voice with industry-appropriate language.",
+        ToneType.CASUAL.value: "Use a relaxed, conversational tone that feels like talking to a friend.",
+        ToneType.FRIENDLY.value: "Be warm, approachable, and encouraging in your communication style.",
+        ToneType.FORMAL.value: "Use formal language structure with proper grammar and academic tone.",
+        ToneType.CREATIVE.value: "Be imaginative, use creative metaphors, and think outside the box.",
+        ToneType.HUMOROUS.value: "Include appropriate humor, wit, and light-hearted elements.",
+        ToneType.AUTHORITATIVE.value: "Demonstrate expertise, confidence, and thought leadership.",
+        ToneType.CONVERSATIONAL.value: "Write as if having a natural conversation with the reader."
+    },
     
-    def _load_prompt_modifiers(self) -> Dict[str, Dict[str, str]]:
-        """Load prompt modifiers for different aspects"""
-        return {
-            "tone_modifiers": {
-                ToneType.PROFESSIONAL.value: "Maintain a professional, authoritative voice with industry-appropriate language.",
-                ToneType.CASUAL.value: "Use a relaxed, conversational tone that feels like talking to a friend.",
-                ToneType.FRIENDLY.value: "Be warm, approachable, and encouraging in your communication style.",
-                ToneType.FORMAL.value: "Use formal language structure with proper grammar and academic tone.",
-                ToneType.CREATIVE.value: "Be imaginative, use creative metaphors, and think outside the box.",
-                ToneType.HUMOROUS.value: "Include appropriate humor, wit, and light-hearted elements.",
-                ToneType.AUTHORITATIVE.value: "Demonstrate expertise, confidence, and thought leadership.",
-                ToneType.CONVERSATIONAL.value: "Write as if having a natural conversation with the reader."
-            },
-            
-            "length_modifiers": {
-                LengthType.SHORT.value: {
-                    "description": "concise and focused",
-                    "blog": "300-500 words",
-                    "social": "50-100 words",
-                    "marketing": "150-300 words",
-                    "email": "100-200 words",
-                    "article": "400-600 words"
-                },
-                LengthType.MEDIUM.value: {
-                    "description": "well-developed",
-                    "blog": "800-1200 words",
-                    "social": "100-200 words", 
-                    "marketing": "300-500 words",
-                    "email": "200-400 words",
-                    "article": "800-1200 words"
-                },
-                LengthType.LONG.value: {
-                    "description": "comprehensive and detailed",
-                    "blog": "1500-2500 words",
-                    "social": "200-300 words",
-                    "marketing": "500-1000 words",
-                    "email": "400-800 words",
-                    "article": "1500-3000 words"
-                }
-            },
-            
-            "audience_modifiers": {
-                "beginners": "Explain concepts clearly, avoid jargon, include definitions for technical terms.",
-                "professionals": "Use industry terminology, assume baseline knowledge, focus on advanced insights.",
-                "executives": "Be concise, focus on strategic implications, include ROI and business impact.",
-                "technical": "Include technical details, code examples, and implementation specifics.",
-                "general": "Use accessible language for a broad audience, explain technical concepts simply."
-            },
-            
-            "seo_modifiers": {
-                "high": "Optimize heavily for SEO with keyword density 1-2%, include meta descriptions, use semantic keywords.",
-                "medium": "Include target keywords naturally, use related terms, optimize headings for search.",
-                "low": "Focus on readability first, include keywords naturally without forcing them.",
-                "none": "Write purely for human readers without SEO considerations."
-            }
+    "length_modifiers": {
+        LengthType.SHORT.value: {
+            "description": "concise and focused",
+            "blog": "300-500 words",
+            "social": "50-100 words",
+            "marketing": "150-300 words",
+            "email": "100-200 words",
+            "article": "400-600 words"
+        },
+        LengthType.MEDIUM.value: {
+            "description": "well-developed",
+            "blog": "800-1200 words",
+            "social": "100-200 words", 
+            "marketing": "300-500 words",
+            "email": "200-400 words",
+            "article": "800-1200 words"
+        },
+        LengthType.LONG.value: {
+            "description": "comprehensive and detailed",
+            "blog": "1500-2500 words",
+            "social": "200-300 words",
+            "marketing": "500-1000 words",
+            "email": "400-800 words",
+            "article": "1500-3000 words"
         }
+    },
     
-    def _load_content_structures(self) -> Dict[str, List[str]]:
-        """Load content structure templates"""
-        return {
-            "blog_structures": {
-                "listicle": [
-                    "Compelling headline with number",
-                    "Brief introduction explaining the value",
-                    "Numbered list items with detailed explanations",
-                    "Conclusion summarizing key points",
-                    "Call-to-action"
-                ],
-                "how_to": [
-                    "Problem statement",
-                    "Overview of solution",
-                    "Step-by-step instructions",
-                    "Tips and best practices",
-                    "Common mistakes to avoid",
-                    "Conclusion with next steps"
-                ],
-                "comparison": [
-                    "Introduction to options being compared",
-                    "Criteria for comparison",
-                    "Detailed comparison sections",
-                    "Pros and cons analysis",
-                    "Recommendation",
-                    "Call-to-action"
-                ]
-            },
-            
-            "marketing_frameworks": {
-                "aida": ["Attention", "Interest", "Desire", "Action"],
-                "pas": ["Problem", "Agitation", "Solution"],
-                "before_after_bridge": ["Before (current state)", "After (desired state)", "Bridge (solution)"],
-                "features_advantages_benefits": ["Features", "Advantages", "Benefits", "Proof"]
-            }
-        }
+    "audience_modifiers": {
+        "beginners": "Explain concepts clearly, avoid jargon, include definitions for technical terms.",
+        "professionals": "Use industry terminology, assume baseline knowledge, focus on advanced insights.",
+        "executives": "Be concise, focus on strategic implications, include ROI and business impact.",
+        "technical": "Include technical details, code examples, and implementation specifics.",
+        "general": "Use accessible language for a broad audience, explain technical concepts simply."
+    },
     
-    def create_enhanced_prompt(self, request: ContentRequest) -> str:
-        """Create an enhanced prompt based on the request"""
-        
-        # Get base prompt template
-        base_prompt = self.base_prompts.get(request.content_type.value, "")
-        
-        # Get modifiers
-        tone_modifier = self.prompt_modifiers["tone_modifiers"].get(request.tone.value, "")
-        length_info = self.prompt_modifiers["length_modifiers"].get(request.length.value, {})
-        
-        # Build word count range
-        word_count_range = length_info.get(request.content_type.value, "500-800 words")
-        length_description = length_info.get("description", "well-developed")
-        
-        # Build audience targeting
-        audience_guidance = ""
-        if request.target_audience:
-            audience_key = self._categorize_audience(request.target_audience)
-            audience_guidance = self.prompt_modifiers["audience_modifiers"].get(audience_key, "")
-        
-        # Build SEO requirements
-        seo_level = "medium" if request.seo_focused else "low"
-        seo_requirements = self.prompt_modifiers["seo_modifiers"].get(seo_level, "")
-        
-        # Build keyword integration
-        keyword_guidance = ""
-        if request.keywords:
-            keyword_guidance = f"\nKEYWORDS TO INCLUDE: {', '.join(request.keywords)}\nIntegrate these keywords naturally throughout the content."
-        
-        # Build additional instructions
-        additional_instructions = []
-        
-        if request.brand_voice:
-            additional_instructions.append(f"BRAND VOICE: {request.brand_voice}")
-        
-        if request.industry:
-            additional_instructions.append(f"INDUSTRY CONTEXT: Tailor content for the {request.industry} industry.")
-        
-        if request.include_examples:
-            additional_instructions.append("Include relevant real-world examples and case studies.")
-        
-        if request.custom_instructions:
-            additional_instructions.append(f"CUSTOM REQUIREMENTS: {request.custom_instructions}")
-        
-        # Format the prompt
-        formatted_prompt = base_prompt.format(
-            topic=request.topic,
-            tone=request.tone.value,
-            length_description=length_description,
-            word_count_range=word_count_range,
-            target_audience=request.target_audience or "general audience",
-            seo_requirements=seo_requirements,
-            call_to_action=request.call_to_action or "Engage with this content",
-            additional_instructions="\n".join(additional_instructions) if additional_instructions else "",
-            # Platform-specific
-            platform=getattr(request, 'platform', 'general social media'),
-            character_limit=getattr(request, 'character_limit', '280 characters'),
-            hashtag_requirements=getattr(request, 'hashtag_requirements', 'Include 3-5 relevant hashtags'),
-            # Marketing-specific
-            marketing_goal=getattr(request, 'marketing_goal', 'generate leads'),
-            # Email-specific
-            email_type=getattr(request, 'email_type', 'newsletter'),
-            email_goal=getattr(request, 'email_goal', 'inform and engage'),
-            # Article-specific
-            article_type=getattr(request, 'article_type', 'informational'),
-            research_requirements=getattr(request, 'research_requirements', 'well-researched'),
-            # Tutorial-specific
-            skill_level=getattr(request, 'skill_level', 'beginner'),
-            learning_objectives=getattr(request, 'learning_objectives', 'understand the topic'),
-            estimated_time=getattr(request, 'estimated_time', '15 minutes'),
-            required_tools=getattr(request, 'required_tools', 'none')
-        )
-        
-        # Add keyword guidance
-        if keyword_guidance:
-            formatted_prompt += keyword_guidance
-        
-        # Add final enhancement
-        formatted_prompt += self._add_quality_guidelines()
-        
-        return formatted_prompt
-    
-    def _categorize_audience(self, audience: str) -> str:
-        """Categorize audience for appropriate modifier"""
-        audience_lower = audience.lower()
-        
-        if any(word in audience_lower for word in ['beginner', 'new', 'starter', 'novice']):
-            return 'beginners'
-        elif any(word in audience_lower for word in ['professional', 'expert', 'specialist', 'practitioner']):
-            return 'professionals'
-        elif any(word in audience_lower for word in ['executive', 'manager', 'leader', 'director', 'ceo']):
-            return 'executives'
-        elif any(word in audience_lower for word in ['developer', 'engineer', 'technical', 'programmer']):
-            return 'technical'
-        else:
-            return 'general'
+    "seo_modifiers": {
+        "high": "Optimize heavily for SEO with keyword density 1-2%, include meta descriptions, use semantic keywords.",
+        "medium": "Include target keywords naturally, use related terms, optimize headings for search.",
+        "low": "Focus on readability first, include keywords naturally without forcing them.",
+        "none": "Write purely for human readers without SEO considerations."
+    }
+})
+
+# Content structure templates
+CONTENT_STRUCTURES: Mapping[str, Dict[str, List[str]]] = MappingProxyType({
+    "blog_structures": {
+        "listicle": [
+            "Compelling headline with number",
+            "Brief introduction explaining the value",
+            "Numbered list items with detailed explanations",
+            "Conclusion summarizing key points",
+            "Call-to-action"
+        ],
+        "how_to": [
+            "Problem statement",
+            "Overview of solution",
+            "Step-by-step instructions",
+            "Tips and best practices",
+            "Common mistakes to avoid",
+            "Conclusion with next steps"
+        ],
+        "comparison": [
+            "Introduction to options being compared",
+            "Criteria for comparison",
+            "Detailed comparison sections",
+            "Pros and cons analysis",
+            "Recommendation",
+            "Call-to-action"
+        ]
+    },
     
-    def _add_quality_guidelines(self) -> str:
-        """Add general quality guidelines to all prompts"""
-        return """
+    "marketing_frameworks": {
+        "aida": ["Attention", "Interest", "Desire", "Action"],
+        "pas": ["Problem", "Agitation", "Solution"],
+        "before_after_bridge": ["Before (current state)", "After (desired state)", "Bridge (solution)"],
+        "features_advantages_benefits": ["Features", "Advantages", "Benefits", "Proof"]
+    }
+})
+
+# General quality guidelines appended to all prompts
+QUALITY_GUIDELINES = """
 
 QUALITY STANDARDS:
 - Ensure accuracy and fact-check claims
@@ -448,6 +352,322 @@ OUTPUT FORMAT:
 - Separate meta information (suggested tags, SEO title, etc.)
 """
 
+# Quality guideline bullets, and phrases that mean a template already asks
+# for the same thing; compact prompts leave the bullet out
+GUIDELINE_COVERAGE: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Ensure accuracy and fact-check claims": ("fact accuracy", "authoritative sources"),
+    "Use clear, concise language": ("clear, actionable language",),
+    "Include transitions between sections": ("transitional phrases",),
+    "End with clear next steps": ("next steps", "key takeaways", "call-to-action"),
+    "Make content valuable and actionable": ("actionable", "with value"),
+    "Include suggested title options": ("headline", "title", "subject line"),
+    "Use markdown for structure where appropriate": ("headings",),
+})
+
+# Type-specific template fields. A request attribute of the same name wins;
+# ContentRequest has none of them today, so the defaults apply.
+TEMPLATE_FIELD_DEFAULTS: Mapping[str, str] = MappingProxyType({
+    # Platform-specific
+    "platform": "general social media",
+    "character_limit": "280 characters",
+    "hashtag_requirements": "Include 3-5 relevant hashtags",
+    # Marketing-specific
+    "marketing_goal": "generate leads",
+    # Email-specific
+    "email_type": "newsletter",
+    "email_goal": "inform and engage",
+    # Article-specific
+    "article_type": "informational",
+    "research_requirements": "well-researched",
+    # Tutorial-specific
+    "skill_level": "beginner",
+    "learning_objectives": "understand the topic",
+    "estimated_time": "15 minutes",
+    "required_tools": "none"
+})
+
+class CompiledTemplate:
+    """A prompt template split once into literal text and placeholders.
+
+    Rendering joins the pieces with the values of ``fields`` and gives the
+    same text as ``str.format`` for templates that only use plain
+    ``{name}`` placeholders, which is all the prompt templates need.
+    """
+    __slots__ = ("source", "segments", "fields")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if field is not None and (not field.isidentifier() or spec or conversion):
+                raise ValueError(f"Unsupported placeholder {{{field}}} in prompt template.")
+            segments.append((literal, field))
+        self.segments: Tuple[Tuple[str, Optional[str]], ...] = tuple(segments)
+        self.fields: FrozenSet[str] = frozenset(field for _, field in segments if field is not None)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(values[field])
+        return "".join(parts)
+
+def compact_guidelines(template: str) -> str:
+    """QUALITY_GUIDELINES without the bullets that ``template`` already covers"""
+    template_lower = template.lower()
+    lines = [
+        line for line in QUALITY_GUIDELINES.split("\n")
+        if not any(phrase in template_lower for phrase in GUIDELINE_COVERAGE.get(line[2:], ()))
+    ]
+    return "\n".join(lines)
+
+def compact_template(template: str) -> str:
+    """A template without leading blank lines and trailing spaces"""
+    return "\n".join(line.rstrip() for line in template.lstrip("\n").split("\n"))
+
+# Content types without a base prompt get only the shared guidelines
+EMPTY_TEMPLATE = CompiledTemplate("")
+
+TEMPLATES: Mapping[str, CompiledTemplate] = MappingProxyType(
+    {content_type: CompiledTemplate(template) for content_type, template in BASE_PROMPTS.items()}
+)
+
+COMPACT_TEMPLATES: Mapping[str, CompiledTemplate] = MappingProxyType(
+    {content_type: CompiledTemplate(compact_template(template)) for content_type, template in BASE_PROMPTS.items()}
+)
+COMPACT_GUIDELINES: Mapping[str, str] = MappingProxyType(
+    {content_type: compact_guidelines(template) for content_type, template in BASE_PROMPTS.items()}
+)
+
+CLASSIC_LAYOUT = "classic"
+PREFIX_STABLE_LAYOUT = "prefix_stable"
+PROMPT_LAYOUTS = (CLASSIC_LAYOUT, PREFIX_STABLE_LAYOUT)
+
+# Template fields that don't depend on the request: the type-specific
+# defaults that ContentRequest has no attribute for
+STATIC_FIELDS: FrozenSet[str] = frozenset(TEMPLATE_FIELD_DEFAULTS) - frozenset(ContentRequest.model_fields)
+
+def _collapse_blank_lines(text: str) -> str:
+    """Runs of blank lines, e.g. from empty additional instructions, as a single one"""
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+class PrefixStableTemplate:
+    """A prompt template reordered so every prompt of a content type starts the same way.
+
+    The template's blocks (paragraphs separated by a blank line) that don't
+    depend on the request, followed by the quality guidelines, make up
+    ``prefix``. The remaining blocks, in their original order, are rendered
+    after it. A model server that caches the prompt's key/value state, like
+    Ollama, then only evaluates the request part of each prompt.
+    """
+    __slots__ = ("prefix", "request")
+
+    def __init__(self, source: str, guidelines: str = QUALITY_GUIDELINES):
+        static_blocks, request_blocks = [], []
+        for block in source.strip("\n").split("\n\n"):
+            compiled = CompiledTemplate(block)
+            if compiled.fields <= STATIC_FIELDS:
+                static_blocks.append(compiled.render(TEMPLATE_FIELD_DEFAULTS))
+            else:
+                request_blocks.append(block)
+        static = "\n" + "\n\n".join(static_blocks) if static_blocks else ""
+        self.prefix = _collapse_blank_lines(static + guidelines + "\n")
+        self.request = CompiledTemplate("\n\n".join(request_blocks) + "\n" if request_blocks else "")
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return self.request.fields
+
+EMPTY_PREFIX_STABLE_TEMPLATE = PrefixStableTemplate("")
+
+PREFIX_STABLE_TEMPLATES: Mapping[str, PrefixStableTemplate] = MappingProxyType(
+    {content_type: PrefixStableTemplate(template) for content_type, template in BASE_PROMPTS.items()}
+)
+COMPACT_PREFIX_STABLE_TEMPLATES: Mapping[str, PrefixStableTemplate] = MappingProxyType(
+    {content_type: PrefixStableTemplate(compact_template(template), COMPACT_GUIDELINES[content_type])
+     for content_type, template in BASE_PROMPTS.items()}
+)
+
+# When to render compact prompts
+COMPACT_NEVER = "never"
+COMPACT_OVER_BUDGET = "over_budget"
+COMPACT_ALWAYS = "always"
+COMPACT_MODES = (COMPACT_NEVER, COMPACT_OVER_BUDGET, COMPACT_ALWAYS)
+
+class PromptEngine:
+    def __init__(self,
+                 layout: Optional[str] = None,
+                 compact: Optional[str] = None,
+                 token_budget: Optional[int] = None,
+                 tokenizer: Optional[Tokenizer] = None):
+        self.base_prompts = BASE_PROMPTS
+        self.prompt_modifiers = PROMPT_MODIFIERS
+        self.content_structures = CONTENT_STRUCTURES
+        self.templates = TEMPLATES
+        self.layout = layout or settings.prompt_layout
+        if self.layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unknown prompt layout '{self.layout}'. Choose from: {', '.join(PROMPT_LAYOUTS)}")
+        self.compact = compact or settings.prompt_compact
+        if self.compact not in COMPACT_MODES:
+            raise ValueError(f"Unknown compact mode '{self.compact}'. Choose from: {', '.join(COMPACT_MODES)}")
+        self.token_budget = settings.prompt_token_budget if token_budget is None else token_budget
+        self.tokenizer = tokenizer or self._configured_tokenizer()
+        # Everything besides the request that changes the rendered prompt
+        self._cache_scope = (self.layout, self.compact, self.token_budget, self.tokenizer.name)
+
+    def create_enhanced_prompt(self, request: ContentRequest) -> str:
+        """Create an enhanced prompt based on the request"""
+        cache = get_prompt_cache()
+        if cache is None:
+            return self._render_prompt(request)
+        return cache.get_or_render((self._cache_scope, canonical_request(request)), lambda: self._render_prompt(request))
+
+    @staticmethod
+    def _configured_tokenizer() -> Tokenizer:
+        try:
+            return get_tokenizer(settings.prompt_tokenizer)
+        except Exception as e:
+            # e.g. an optional tokenizer package that isn't installed
+            logger.error(f"Failed to load tokenizer {settings.prompt_tokenizer}, counting characters instead: {e}")
+            return get_tokenizer("chars")
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens in ``text`` according to the engine's tokenizer"""
+        return self.tokenizer.count(text)
+
+    def budget_report(self, request: ContentRequest) -> PromptBudgetReport:
+        """Tokens in the request's prompt, per section, against the token budget"""
+        prompt = self.create_enhanced_prompt(request)
+        full_prompt = self._render_layout(request, compact=False)
+        tokens = self.count_tokens(prompt)
+        full_tokens = tokens if prompt == full_prompt else self.count_tokens(full_prompt)
+        return PromptBudgetReport(
+            content_type=request.content_type.value,
+            layout=self.layout,
+            tokenizer=self.tokenizer.name,
+            tokens=tokens,
+            budget=self.token_budget or None,
+            over_budget=bool(self.token_budget) and tokens > self.token_budget,
+            compacted=prompt != full_prompt,
+            tokens_saved=full_tokens - tokens,
+            sections=[PromptSection(name=name, chars=len(text), tokens=self.count_tokens(text))
+                      for name, text in prompt_sections(prompt)]
+        )
+
+    def static_prefix(self, content_type: ContentType) -> str:
+        """Text that every prompt of this content type starts with in the prefix-stable layout"""
+        templates = COMPACT_PREFIX_STABLE_TEMPLATES if self.compact == COMPACT_ALWAYS else PREFIX_STABLE_TEMPLATES
+        return templates.get(content_type.value, EMPTY_PREFIX_STABLE_TEMPLATE).prefix
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return prompt cache counters, or an empty dict when the cache is disabled"""
+        cache = get_prompt_cache()
+        return cache.stats() if cache else {}
+
+    def _render_prompt(self, request: ContentRequest) -> str:
+        if self.compact == COMPACT_ALWAYS:
+            return self._render_layout(request, compact=True)
+        prompt = self._render_layout(request, compact=False)
+        if self.compact == COMPACT_OVER_BUDGET and self.token_budget and self.count_tokens(prompt) > self.token_budget:
+            prompt = self._render_layout(request, compact=True)
+        return prompt
+
+    def _render_layout(self, request: ContentRequest, compact: bool) -> str:
+        content_type = request.content_type.value
+        if self.layout == PREFIX_STABLE_LAYOUT:
+            # Static instructions and guidelines first, everything from the request last
+            templates = COMPACT_PREFIX_STABLE_TEMPLATES if compact else PREFIX_STABLE_TEMPLATES
+            template = templates.get(content_type, EMPTY_PREFIX_STABLE_TEMPLATE)
+            request_part = template.request.render(self._template_values(request, template.fields))
+            # One blank line between sections even when some are empty; the prefix has no runs to collapse
+            return _collapse_blank_lines(template.prefix + request_part + self._keyword_guidance(request))
+
+        template = (COMPACT_TEMPLATES if compact else self.templates).get(content_type, EMPTY_TEMPLATE)
+        formatted_prompt = template.render(self._template_values(request, template.fields))
+        formatted_prompt += self._keyword_guidance(request)
+
+        # Add final enhancement
+        if compact:
+            formatted_prompt = _collapse_blank_lines(formatted_prompt)
+            formatted_prompt += COMPACT_GUIDELINES.get(content_type, QUALITY_GUIDELINES)
+        else:
+            formatted_prompt += self._add_quality_guidelines()
+
+        return formatted_prompt
+
+    def _keyword_guidance(self, request: ContentRequest) -> str:
+        """Keyword lines, in the order the request gives them"""
+        if not request.keywords:
+            return ""
+        return f"\nKEYWORDS TO INCLUDE: {', '.join(request.keywords)}\nIntegrate these keywords naturally throughout the content."
+
+    def _template_values(self, request: ContentRequest, fields: FrozenSet[str]) -> Dict[str, str]:
+        """Values for the placeholders in ``fields``; nothing else is computed"""
+        values = {}
+        for field in fields:
+            if field == "topic":
+                values[field] = request.topic
+            elif field == "tone":
+                values[field] = request.tone.value
+            elif field == "length_description":
+                length_info = self.prompt_modifiers["length_modifiers"].get(request.length.value, {})
+                values[field] = length_info.get("description", "well-developed")
+            elif field == "word_count_range":
+                values[field] = self._word_count_range_text(request)
+            elif field == "target_audience":
+                values[field] = request.target_audience or "general audience"
+            elif field == "seo_requirements":
+                seo_level = "medium" if request.seo_focused else "low"
+                values[field] = self.prompt_modifiers["seo_modifiers"].get(seo_level, "")
+            elif field == "call_to_action":
+                values[field] = request.call_to_action or "Engage with this content"
+            elif field == "additional_instructions":
+                values[field] = self._additional_instructions(request)
+            else:
+                values[field] = getattr(request, field, TEMPLATE_FIELD_DEFAULTS[field])
+        return values
+
+    def _additional_instructions(self, request: ContentRequest) -> str:
+        """Optional brand, industry, example and custom instruction lines"""
+        additional_instructions = []
+
+        if request.brand_voice:
+            additional_instructions.append(f"BRAND VOICE: {request.brand_voice}")
+
+        if request.industry:
+            additional_instructions.append(f"INDUSTRY CONTEXT: Tailor content for the {request.industry} industry.")
+
+        if request.include_examples:
+            additional_instructions.append("Include relevant real-world examples and case studies.")
+
+        if request.custom_instructions:
+            additional_instructions.append(f"CUSTOM REQUIREMENTS: {request.custom_instructions}")
+
+        return "\n".join(additional_instructions)
+
+    def _word_count_range_text(self, request: ContentRequest) -> str:
+        """Word count range the prompt asks for, e.g. 300-500 words"""
+        length_info = self.prompt_modifiers["length_modifiers"].get(request.length.value, {})
+        return length_info.get(request.content_type.value, "500-800 words")
+    
+    def get_word_count_range(self, request: ContentRequest) -> Tuple[int, int]:
+        """Minimum and maximum word count the prompt asks for"""
+        low, high = re.findall(r"\d+", self._word_count_range_text(request))[:2]
+        return int(low), int(high)
+    
+    def _categorize_audience(self, audience: str) -> str:
+        """Categorize audience for appropriate modifier"""
+        return audience_classifier.categorize(audience)
+    
+    def categorize_audiences(self, audiences: List[str]) -> List[str]:
+        """Categorize many audiences at once, in one pass over their text"""
+        return audience_classifier.categorize_many(audiences)
+    
+    def _add_quality_guidelines(self) -> str:
+        """Add general quality guidelines to all prompts"""
+        return QUALITY_GUIDELINES
+
     def get_content_suggestions(self, topic: str, content_type: ContentType) -> Dict[str, List[str]]:
         """Get content suggestions based on topic and type"""
         suggestions = {
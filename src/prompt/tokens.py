@@ -0,0 +1,155 @@
+import abc
+import math
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from src.utils.generation_caps import estimate_tokens
+
+
+class Tokenizer(abc.ABC):
+    """Counts the tokens in a piece of text, offline.
+
+    Subclasses set ``name`` and implement ``count``. Register a factory with
+    ``register_tokenizer`` to make a tokenizer available by name, e.g. to
+    the PROMPT_TOKENIZER setting.
+    """
+    name: str = ""
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """The number of tokens in ``text``."""
+
+
+class CharTokenizer(Tokenizer):
+    """About four characters per token, the same estimate the generation caps use."""
+    name = "chars"
+
+    def count(self, text: str) -> int:
+        return estimate_tokens(text) if text else 0
+
+
+class WordTokenizer(Tokenizer):
+    """Approximates BPE tokenizers by splitting text the way they do before merging.
+
+    Words, runs of up to three digits and runs of punctuation count as one
+    token each; words longer than ``max_word_chars`` count one token per
+    ``max_word_chars`` characters, as BPE splits rare long words.
+    """
+    name = "words"
+    _pieces = re.compile(r"'(?:s|t|re|ve|m|ll|d)|[^\W\d_]+|\d{1,3}|[^\s\w]+|\n+")
+
+    def __init__(self, max_word_chars: int = 8):
+        self.max_word_chars = max_word_chars
+
+    def count(self, text: str) -> int:
+        return sum(math.ceil(len(piece) / self.max_word_chars) if piece[0].isalpha() else 1
+                   for piece in self._pieces.findall(text))
+
+
+class TiktokenTokenizer(Tokenizer):
+    """An exact count with a tiktoken encoding, e.g. "tiktoken:cl100k_base".
+
+    Needs the ``tiktoken`` package, which downloads the encoding on first
+    use unless it is already in its cache (TIKTOKEN_CACHE_DIR).
+    """
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        # Imported here because tiktoken is an optional dependency
+        import tiktoken
+        self.name = f"tiktoken:{encoding}"
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """An exact count with a model's own ``tokenizer.json``, e.g. "hf:models/llama3/tokenizer.json".
+
+    Needs the ``tokenizers`` package; the file is read locally.
+    """
+
+    def __init__(self, path: str):
+        # Imported here because tokenizers is an optional dependency
+        from tokenizers import Tokenizer as _Tokenizer
+        self.name = f"hf:{path}"
+        self._tokenizer = _Tokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+# Tokenizer factories by name; "name:argument" passes the argument to the factory
+_factories: Dict[str, Callable[..., Tokenizer]] = {
+    "chars": lambda: CharTokenizer(),
+    "words": lambda max_word_chars="8": WordTokenizer(int(max_word_chars)),
+    "tiktoken": lambda encoding="cl100k_base": TiktokenTokenizer(encoding),
+    "hf": lambda path: HuggingFaceTokenizer(path),
+}
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+def register_tokenizer(name: str, factory: Callable[..., Tokenizer], replace: bool = False):
+    """Make a tokenizer available to ``get_tokenizer`` as ``name`` or ``name:argument``."""
+    with _tokenizers_lock:
+        if name in _factories and not replace:
+            raise ValueError(f"Tokenizer {name} is already registered.")
+        _factories[name] = factory
+        for spec in [spec for spec in _tokenizers if spec.split(":", 1)[0] == name]:
+            del _tokenizers[spec]
+
+def get_tokenizer(spec: str = "chars") -> Tokenizer:
+    """Return the shared tokenizer for a spec such as "chars", "words" or "tiktoken:cl100k_base"."""
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(spec)
+        if tokenizer is None:
+            name, _, argument = spec.partition(":")
+            factory = _factories.get(name)
+            if factory is None:
+                raise ValueError(f"Unknown tokenizer '{name}'. Choose from: {', '.join(_factories)}")
+            tokenizer = _tokenizers[spec] = factory(argument) if argument else factory()
+        return tokenizer
+
+
+class PromptSection(BaseModel):
+    name: str
+    chars: int
+    tokens: int
+
+
+class PromptBudgetReport(BaseModel):
+    """Token count of a rendered prompt, by section, against the prompt token budget."""
+    content_type: str
+    layout: str
+    tokenizer: str
+    tokens: int
+    budget: Optional[int] = None
+    over_budget: bool = False
+    compacted: bool = False
+    # Tokens the compact rendering saved over the full one
+    tokens_saved: int = 0
+    sections: List[PromptSection] = []
+
+
+# A capitalized label such as "QUALITY STANDARDS:" or "BRAND VOICE: ..." names the block it starts
+_HEADING = re.compile(r"^([A-Z][A-Z /&-]+):")
+
+def prompt_sections(prompt: str) -> List[Tuple[str, str]]:
+    """Split a prompt into (name, text) blocks at blank lines.
+
+    Blocks starting with a capitalized label are named after it; an
+    unlabelled first block is "intro" and other unlabelled blocks are
+    "request".
+    """
+    sections: List[Tuple[str, str]] = []
+    for block in re.split(r"\n\s*\n", prompt):
+        if not block.strip():
+            continue
+        heading = _HEADING.match(block.strip().split("\n", 1)[0])
+        if heading:
+            name = heading.group(1).lower()
+        else:
+            name = "intro" if not sections else "request"
+        sections.append((name, block))
+    return sections
@@ -0,0 +1,12 @@
+"""Localhost stand-ins for Gemini, Ollama and Notion, for offline tests and benchmarks.
+
+Run them from the command line with ``python -m src.standins``.
+"""
+from .gemini import GeminiStandIn
+from .notion import NotionStandIn
+from .ollama import OllamaStandIn
+from .profiles import PROFILES, LatencyProfile, get_profile
+from .server import StandInServer
+
+__all__ = ["GeminiStandIn", "LatencyProfile", "NotionStandIn", "OllamaStandIn", "PROFILES",
+           "StandInServer", "get_profile"]
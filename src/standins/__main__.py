@@ -0,0 +1,62 @@
+"""Serve the Gemini, Ollama and Notion stand-ins until interrupted.
+
+Run with: python -m src.standins --profile laptop
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+
+from config.config import settings
+from src.standins import GeminiStandIn, NotionStandIn, OllamaStandIn, PROFILES, get_profile
+
+console = Console()
+app = typer.Typer()
+
+@app.command()
+def main(profile: str = typer.Option("laptop", help=f"Latency profile: {', '.join(PROFILES)}"),
+         error_rate: float = typer.Option(None, help="Override the profile's injected error rate"),
+         requests_per_minute: int = typer.Option(None, help="Override the profile's rate limit"),
+         seed: int = typer.Option(None, help="Seed for reproducible latencies and failures"),
+         ollama_port: int = typer.Option(11435),
+         gemini_port: int = typer.Option(8081),
+         notion_port: int = typer.Option(8082),
+         response_words: int = typer.Option(300, help="Words per generated response"),
+         load_seconds: float = typer.Option(2.0, help="Ollama model load time"),
+         prompt_eval_ms: float = typer.Option(0.0, help="Ollama prompt evaluation time per uncached token")):
+    """Start all three stand-ins and print the settings that point the app at them."""
+    latency = get_profile(profile)
+    overrides = {"error_rate": error_rate, "requests_per_minute": requests_per_minute, "seed": seed}
+    latency = latency.model_copy(update={key: value for key, value in overrides.items() if value is not None})
+
+    servers = [
+        OllamaStandIn(latency, models=[settings.ollama_model], response_words=response_words,
+                      load_seconds=load_seconds, prompt_eval_seconds_per_token=prompt_eval_ms / 1000,
+                      port=ollama_port),
+        GeminiStandIn(latency, response_words=response_words, port=gemini_port),
+        NotionStandIn(latency, port=notion_port),
+    ]
+    for server in servers:
+        server.start()
+    ollama, gemini, notion = servers
+
+    console.print(f"Stand-ins running with the [bold]{profile}[/bold] profile. Add to .env:")
+    console.print(f"OLLAMA_BASE_URL={ollama.url}")
+    console.print(f"GEMINI_API_ENDPOINT={gemini.url}")
+    console.print("GEMINI_API_KEY=standin  # any non-empty key is accepted")
+    console.print(f"NOTION_BASE_URL={notion.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
+
+if __name__ == "__main__":
+    app()
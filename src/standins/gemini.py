@@ -0,0 +1,106 @@
+import json
+from typing import Dict, Optional
+from src.standins.profiles import LatencyProfile
+from src.standins.server import StandInRequest, StandInServer, Stream, filler_text
+
+_STATUS_NAMES = {
+    400: "INVALID_ARGUMENT",
+    403: "PERMISSION_DENIED",
+    404: "NOT_FOUND",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+}
+# Words per streamed chunk; Gemini streams a sentence or so at a time
+STREAM_CHUNK_WORDS = 8
+
+class GeminiStandIn(StandInServer):
+    """Speaks the Gemini REST API's ``generateContent`` and ``streamGenerateContent``.
+
+    Point the SDK at it with ``GEMINI_API_ENDPOINT``. Streams are sent as a
+    JSON array, the way the SDK's REST transport asks for them, or as
+    server-sent events with ``alt=sse``. Requests need an API key but any
+    key is accepted. ``maxOutputTokens`` below ``response_words`` (one token
+    per word) ends the response with finishReason MAX_TOKENS.
+    """
+    name = "gemini"
+    routes = [
+        ("POST", r"/v1beta/models/(?P<model>[^/:]+):generateContent", "_generate"),
+        ("POST", r"/v1beta/models/(?P<model>[^/:]+):streamGenerateContent", "_stream"),
+    ]
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, response_words: int = 300, **kwargs):
+        super().__init__(profile, **kwargs)
+        self.response_words = response_words
+
+    def error_body(self, status: int, message: str) -> Dict:
+        return {"error": {"code": status, "message": message, "status": _STATUS_NAMES.get(status, "UNKNOWN")}}
+
+    def rate_limit_body(self, retry_after: float) -> Dict:
+        return self.error_body(429, "Resource has been exhausted (e.g. check quota). "
+                                    f"Please retry in {retry_after:.1f}s.")
+
+    def _plan(self, request: StandInRequest):
+        """Validate the request; returns (words, finish reason, prompt tokens) or an error response."""
+        if not (request.query.get("key") or request.headers.get("x-goog-api-key")):
+            return 403, self.error_body(403, "Method doesn't allow unregistered callers. Please use an API key.")
+        body = request.body or {}
+        text = "".join(part.get("text", "")
+                       for content in body.get("contents", [])
+                       for part in content.get("parts", []))
+        if not text:
+            return 400, self.error_body(400, "* GenerateContentRequest.contents: contents is not specified")
+
+        config = body.get("generationConfig") or body.get("generation_config") or {}
+        max_tokens = config.get("maxOutputTokens") or config.get("max_output_tokens")
+        if max_tokens and max_tokens < self.response_words:
+            return max_tokens, "MAX_TOKENS", max(1, len(text) // 4)
+        return self.response_words, "STOP", max(1, len(text) // 4)
+
+    @staticmethod
+    def _response(model: str, text: str, finish_reason: Optional[str], prompt_tokens: int, output_tokens: int) -> Dict:
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if finish_reason:
+            candidate["finishReason"] = finish_reason
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens
+            },
+            "modelVersion": model
+        }
+
+    def _generate(self, request: StandInRequest, match):
+        plan = self._plan(request)
+        if len(plan) == 2:
+            return plan
+        words, finish_reason, prompt_tokens = plan
+        self.token_delay(words)
+        return self._response(match["model"], filler_text(words).rstrip(), finish_reason, prompt_tokens, words)
+
+    def _stream(self, request: StandInRequest, match):
+        plan = self._plan(request)
+        if len(plan) == 2:
+            return plan
+        words, finish_reason, prompt_tokens = plan
+        sse = request.query.get("alt") == "sse"
+
+        def chunks():
+            if not sse:
+                yield b"["
+            for start in range(0, words, STREAM_CHUNK_WORDS):
+                count = min(STREAM_CHUNK_WORDS, words - start)
+                self.token_delay(count)
+                last = start + count >= words
+                body = self._response(match["model"], filler_text(count, start),
+                                      finish_reason if last else None, prompt_tokens, start + count)
+                if sse:
+                    yield f"data: {json.dumps(body)}\r\n\r\n".encode()
+                else:
+                    yield (("" if start == 0 else ",\r\n") + json.dumps(body)).encode()
+            if not sse:
+                yield b"]"
+
+        return Stream("text/event-stream" if sse else "application/json", chunks())
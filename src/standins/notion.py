@@ -0,0 +1,113 @@
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from src.standins.profiles import LatencyProfile
+from src.standins.server import StandInRequest, StandInServer
+
+# Notion rejects rich text objects longer than this
+RICH_TEXT_LIMIT = 2000
+
+_ERROR_CODES = {
+    400: "validation_error",
+    401: "unauthorized",
+    404: "object_not_found",
+    429: "rate_limited",
+    500: "internal_server_error",
+    503: "service_unavailable",
+}
+
+class NotionStandIn(StandInServer):
+    """Speaks the Notion endpoints ``NotionHandler`` uses, backed by an in-memory database.
+
+    Point ``NOTION_BASE_URL`` at it. Handles database retrieval, database
+    (and data source) queries and page creation. Any bearer token and any
+    database id are accepted; created pages are kept in ``pages``, newest first.
+    """
+    name = "notion"
+    routes = [
+        ("GET", r"/v1/databases/(?P<id>[^/]+)", "_retrieve_database"),
+        ("POST", r"/v1/databases/(?P<id>[^/]+)/query", "_query"),
+        ("POST", r"/v1/data_sources/(?P<id>[^/]+)/query", "_query"),
+        ("POST", r"/v1/pages", "_create_page"),
+    ]
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, title: str = "Content", **kwargs):
+        super().__init__(profile, **kwargs)
+        self.title = title
+        self.pages: List[Dict] = []
+        self._pages_lock = threading.Lock()
+
+    def error_body(self, status: int, message: str) -> Dict:
+        return {"object": "error", "status": status, "code": _ERROR_CODES.get(status, "internal_server_error"),
+                "message": message}
+
+    def rate_limit_body(self, retry_after: float) -> Dict:
+        return self.error_body(429, "You have been rate limited. Please try again in a few minutes.")
+
+    def _authorized(self, request: StandInRequest) -> bool:
+        return (request.headers.get("Authorization") or "").startswith("Bearer ")
+
+    def _retrieve_database(self, request: StandInRequest, match):
+        if not self._authorized(request):
+            return 401, self.error_body(401, "API token is invalid.")
+        return {
+            "object": "database",
+            "id": match["id"],
+            "title": [{"type": "text", "plain_text": self.title, "text": {"content": self.title}}],
+            "properties": {
+                "Title": {"type": "title", "title": {}},
+                "Content": {"type": "rich_text", "rich_text": {}},
+                "Type": {"type": "select", "select": {"options": []}},
+                "Status": {"type": "select", "select": {"options": []}},
+                "AI Model Used": {"type": "rich_text", "rich_text": {}},
+                "Word Count": {"type": "number", "number": {"format": "number"}},
+                "Tags": {"type": "multi_select", "multi_select": {"options": []}}
+            }
+        }
+
+    def _query(self, request: StandInRequest, match):
+        if not self._authorized(request):
+            return 401, self.error_body(401, "API token is invalid.")
+        body = request.body or {}
+        page_size = min(int(body.get("page_size", 100)), 100)
+        start = int(body.get("start_cursor") or 0)
+        with self._pages_lock:
+            pages = list(self.pages)
+        results = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+        return {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None
+        }
+
+    def _create_page(self, request: StandInRequest, match):
+        if not self._authorized(request):
+            return 401, self.error_body(401, "API token is invalid.")
+        body = request.body or {}
+        parent = body.get("parent") or {}
+        if not (parent.get("database_id") or parent.get("data_source_id") or parent.get("page_id")):
+            return 400, self.error_body(400, "body failed validation: body.parent should be defined.")
+
+        properties = body.get("properties") or {}
+        for name, value in properties.items():
+            for item in value.get("rich_text", []) + value.get("title", []):
+                if len(item.get("text", {}).get("content", "")) > RICH_TEXT_LIMIT:
+                    return 400, self.error_body(
+                        400, f"body failed validation: body.properties.{name} text.content.length "
+                             f"should be ≤ `{RICH_TEXT_LIMIT}`.")
+
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "parent": parent,
+            "properties": properties,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}"
+        }
+        with self._pages_lock:
+            self.pages.insert(0, page)
+        return page
@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.standins.profiles import LatencyProfile
+from src.standins.server import StandInRequest, StandInServer, Stream, filler_text
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+# Ollama's default when a request does not say how long to keep the model
+DEFAULT_KEEP_ALIVE_SECONDS = 300.0
+
+def keep_alive_seconds(value) -> float:
+    """Seconds for an Ollama keep_alive value: a number of seconds or "30m"; negative means forever."""
+    if value is None or value == "":
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        parts = _DURATION.findall(str(value))
+        if not parts:
+            return DEFAULT_KEEP_ALIVE_SECONDS
+        seconds = sum(float(amount) * _UNITS[unit] for amount, unit in parts)
+    return float("inf") if seconds < 0 else seconds
+
+
+class OllamaStandIn(StandInServer):
+    """Speaks Ollama's ``/api/tags`` and ``/api/generate``.
+
+    Models start unloaded: the first request for a model, a request after
+    its keep_alive expired, or one with a different ``num_ctx`` sleeps for
+    ``load_seconds`` and reports it as ``load_duration``, like a real reload.
+    Responses are ``response_words`` words long (one token per word) unless
+    ``num_predict`` cuts them short, which ends them with done_reason "length".
+
+    Prompts count one token per four characters. Like Ollama's runner, each
+    loaded model keeps ``cache_slots`` recent prompts; a prompt sharing a
+    prefix with one of them only evaluates the rest, at
+    ``prompt_eval_seconds_per_token``, and reports just those tokens as
+    ``prompt_eval_count``.
+    """
+    name = "ollama"
+    routes = [
+        ("GET", r"/api/tags", "_tags"),
+        ("POST", r"/api/generate", "_generate"),
+    ]
+
+    def __init__(self,
+                 profile: Optional[LatencyProfile] = None,
+                 models: Sequence[str] = ("llama3.1",),
+                 response_words: int = 300,
+                 load_seconds: float = 0.0,
+                 prompt_eval_seconds_per_token: float = 0.0,
+                 cache_slots: int = 4,
+                 **kwargs):
+        super().__init__(profile, **kwargs)
+        self.models = list(models)
+        self.response_words = response_words
+        self.load_seconds = load_seconds
+        self.prompt_eval_seconds_per_token = prompt_eval_seconds_per_token
+        self.cache_slots = cache_slots
+        self._loaded_lock = threading.Lock()
+        # model -> (num_ctx, unload deadline)
+        self._loaded: Dict[str, Tuple[Optional[int], float]] = {}
+        # model -> recently evaluated prompts, most recent last
+        self._slots: Dict[str, List[str]] = {}
+        self.loads = 0
+
+    def _tags(self, request: StandInRequest, match) -> Dict:
+        return {"models": [{"name": model, "model": model, "size": 4_700_000_000} for model in self.models]}
+
+    def _load(self, model: str, num_ctx: Optional[int], keep_alive) -> float:
+        """Make sure the model is resident; returns the seconds spent loading it."""
+        now = time.monotonic()
+        with self._loaded_lock:
+            loaded = self._loaded.get(model)
+            cold = loaded is None or loaded[1] < now or (num_ctx is not None and loaded[0] != num_ctx)
+            self._loaded[model] = (num_ctx if cold else loaded[0], now + keep_alive_seconds(keep_alive))
+            if cold:
+                self.loads += 1
+                # Reloading the model drops its cached prompts
+                self._slots.pop(model, None)
+        load = self.load_seconds if cold else 0.002
+        time.sleep(load)
+        return load
+
+    def _evaluate_prompt(self, model: str, prompt: str) -> Tuple[int, float]:
+        """Tokens evaluated for ``prompt`` after reusing the best cached prefix, and the seconds spent."""
+        with self._loaded_lock:
+            slots = self._slots.setdefault(model, [])
+            best = max(slots, key=lambda cached: len(os.path.commonprefix((cached, prompt))), default=None)
+            cached_chars = len(os.path.commonprefix((best, prompt))) if best is not None else 0
+            # A slot holding only a prefix of this prompt is extended; otherwise the
+            # shared part is copied into the least recently used slot
+            if best is not None and cached_chars == len(best):
+                slots.remove(best)
+            slots.append(prompt)
+            del slots[:-self.cache_slots or None]
+        tokens = max(1, (len(prompt) - cached_chars) // 4)
+        seconds = tokens * self.prompt_eval_seconds_per_token
+        time.sleep(seconds)
+        return tokens, seconds
+
+    def _generate(self, request: StandInRequest, match):
+        body = request.body or {}
+        model = body.get("model", "")
+        if model not in self.models:
+            return 404, {"error": f"model '{model}' not found, try pulling it first"}
+
+        started_at = time.monotonic()
+        options = body.get("options") or {}
+        load = self._load(model, options.get("num_ctx"), body.get("keep_alive"))
+        prompt = body.get("prompt", "")
+        if not prompt:
+            # An empty prompt only loads the model
+            return self._final(model, "", "load", load, started_at, 0, 0)
+
+        words = self.response_words
+        num_predict = options.get("num_predict")
+        if num_predict is not None and 0 <= num_predict < words:
+            words, done_reason = num_predict, "length"
+        else:
+            done_reason = "stop"
+        prompt_tokens, prompt_seconds = self._evaluate_prompt(model, prompt)
+
+        if not body.get("stream", True):
+            self.token_delay(words)
+            return self._final(model, filler_text(words), done_reason, load, started_at, prompt_tokens, words,
+                               prompt_seconds)
+
+        def chunks():
+            for index in range(words):
+                self.token_delay(1)
+                yield _ndjson({"model": model, "response": filler_text(1, index), "done": False})
+            yield _ndjson(self._final(model, "", done_reason, load, started_at, prompt_tokens, words, prompt_seconds))
+
+        return Stream("application/x-ndjson", chunks())
+
+    @staticmethod
+    def _final(model: str, response: str, done_reason: str, load: float, started_at: float,
+               prompt_tokens: int, eval_tokens: int, prompt_seconds: float = 0.0) -> Dict:
+        total = time.monotonic() - started_at
+        return {
+            "model": model,
+            "response": response,
+            "done": True,
+            "done_reason": done_reason,
+            "total_duration": int(total * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int(max(0.0, total - load - prompt_seconds) * 1e9)
+        }
+
+def _ndjson(body: Dict) -> bytes:
+    return (json.dumps(body) + "\n").encode()
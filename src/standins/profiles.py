@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Literal, Optional
+from pydantic import BaseModel
+
+class LatencyProfile(BaseModel):
+    """How a stand-in server behaves: latency, throughput, failures and limits.
+
+    ``latency_seconds`` is the time to the first byte. ``jitter_seconds`` is
+    the spread of the distribution: the half-width for "uniform", the
+    standard deviation for "normal" and the sigma of the underlying normal for
+    "lognormal" (where ``latency_seconds`` is the median). Streaming
+    responses add ``per_token_seconds`` for every generated token.
+    """
+    distribution: Literal["fixed", "uniform", "normal", "lognormal"] = "fixed"
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    per_token_seconds: float = 0.0
+    #Fraction of requests answered with ``error_status`` instead
+    error_rate: float = 0.0
+    error_status: int = 500
+    #Requests per rolling minute before answering 429 (0 disables the limit)
+    requests_per_minute: int = 0
+    seed: Optional[int] = None
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            value = rng.uniform(self.latency_seconds - self.jitter_seconds,
+                                self.latency_seconds + self.jitter_seconds)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.latency_seconds, self.jitter_seconds)
+        elif self.distribution == "lognormal" and self.latency_seconds > 0:
+            value = self.latency_seconds * rng.lognormvariate(0, self.jitter_seconds)
+        else:
+            value = self.latency_seconds
+        return max(0.0, value)
+
+# Named profiles for the command line and benchmarks
+PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile(),
+    "laptop": LatencyProfile(distribution="lognormal", latency_seconds=0.3, jitter_seconds=0.3,
+                             per_token_seconds=0.02),
+    "cloud": LatencyProfile(distribution="lognormal", latency_seconds=0.8, jitter_seconds=0.5,
+                            per_token_seconds=0.005),
+    "flaky": LatencyProfile(distribution="lognormal", latency_seconds=0.8, jitter_seconds=0.8,
+                            per_token_seconds=0.005, error_rate=0.2, error_status=503),
+    "free-tier": LatencyProfile(distribution="lognormal", latency_seconds=0.8, jitter_seconds=0.5,
+                                per_token_seconds=0.005, requests_per_minute=15),
+}
+
+def get_profile(name: str) -> LatencyProfile:
+    try:
+        return PROFILES[name].model_copy()
+    except KeyError:
+        raise ValueError(f"Unknown latency profile '{name}'. Choose from: {', '.join(PROFILES)}") from None
+
+
+class RollingWindowLimit:
+    """Allows ``limit`` requests in any rolling 60-second window."""
+
+    def __init__(self, limit: int, window_seconds: float = 60.0):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._times = deque()
+
+    def acquire(self) -> Optional[float]:
+        """Take a slot, or return the seconds until one frees up."""
+        if self.limit <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            while self._times and now - self._times[0] >= self.window_seconds:
+                self._times.popleft()
+            if len(self._times) >= self.limit:
+                return self.window_seconds - (now - self._times[0])
+            self._times.append(now)
+            return None
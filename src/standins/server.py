@@ -0,0 +1,202 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from src.standins.profiles import LatencyProfile, RollingWindowLimit
+
+_FILLER = ("content teams ship faster when drafts arrive early and reviews stay short so every "
+           "writer can focus on the ideas that matter most to their readers").split()
+
+def filler_text(words: int, start: int = 0) -> str:
+    """Deterministic placeholder prose, with a paragraph break every 60 words."""
+    text = []
+    for index in range(start, start + words):
+        text.append(_FILLER[index % len(_FILLER)])
+        text.append("\n\n" if (index + 1) % 60 == 0 else " ")
+    return "".join(text)
+
+
+class StandInRequest:
+    """The parts of an HTTP request a stand-in route needs."""
+
+    def __init__(self, method: str, path: str, query: Dict[str, str], headers, body: Any):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class Stream:
+    """A streamed response: ``chunks`` are written and flushed one by one."""
+
+    def __init__(self, content_type: str, chunks: Iterable[bytes]):
+        self.content_type = content_type
+        self.chunks = chunks
+
+
+class StandInServer:
+    """A localhost HTTP server that imitates a provider API for offline testing.
+
+    Subclasses list ``routes`` as (method, path pattern, method name) tuples;
+    route methods take a ``StandInRequest`` and the path match and return a
+    JSON body, a (status, JSON body) tuple or a ``Stream``. Every request
+    first goes through the profile's rate limit, error injection and latency.
+    Use it as a context manager, or call ``start`` and ``stop``.
+    """
+    name = "standin"
+    routes: List[Tuple[str, str, str]] = []
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or LatencyProfile()
+        self.host = host
+        self.port = port
+        self._rng = random.Random(self.profile.seed)
+        self._rng_lock = threading.Lock()
+        self._limit = RollingWindowLimit(self.profile.requests_per_minute)
+        self._routes = [(method, re.compile(pattern), getattr(self, handler))
+                        for method, pattern, handler in self.routes]
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError(f"{self.name} stand-in is not running.")
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self) -> "StandInServer":
+        handler = type(f"{type(self).__name__}Handler", (_RequestHandler,), {"standin": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"{self.name}-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counters per route: requests, errors (injected), rate_limited and disconnects."""
+        with self._stats_lock:
+            return {route: dict(counts) for route, counts in self._stats.items()}
+
+    def _count(self, route: str, counter: str):
+        with self._stats_lock:
+            counts = self._stats.setdefault(route, {"requests": 0, "errors": 0, "rate_limited": 0, "disconnects": 0})
+            counts[counter] += 1
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def token_delay(self, tokens: int):
+        """Sleep for the time the profile takes to generate ``tokens`` tokens."""
+        if self.profile.per_token_seconds > 0 and tokens > 0:
+            time.sleep(self.profile.per_token_seconds * tokens)
+
+    def error_body(self, status: int, message: str) -> Dict:
+        return {"error": message}
+
+    def rate_limit_body(self, retry_after: float) -> Dict:
+        return self.error_body(429, f"Rate limit exceeded. Retry in {retry_after:.1f}s.")
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler):
+        url = urlsplit(handler.path)
+        for method, pattern, route in self._routes:
+            match = pattern.fullmatch(url.path)
+            if method == handler.command and match:
+                break
+        else:
+            handler.send_json(404, self.error_body(404, f"No route for {handler.command} {url.path}"))
+            return
+
+        name = route.__name__.lstrip("_")
+        self._count(name, "requests")
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+
+        retry_after = self._limit.acquire()
+        if retry_after is not None:
+            self._count(name, "rate_limited")
+            handler.send_json(429, self.rate_limit_body(retry_after),
+                              {"Retry-After": str(max(1, round(retry_after)))})
+            return
+
+        with self._rng_lock:
+            latency = self.profile.sample_latency(self._rng)
+            failed = self._rng.random() < self.profile.error_rate
+        time.sleep(latency)
+        if failed:
+            self._count(name, "errors")
+            handler.send_json(self.profile.error_status,
+                              self.error_body(self.profile.error_status, "Injected failure"))
+            return
+
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            handler.send_json(400, self.error_body(400, "Request body is not valid JSON"))
+            return
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        result = route(StandInRequest(handler.command, url.path, query, handler.headers, body), match)
+        if isinstance(result, Stream):
+            if not handler.send_stream(result):
+                self._count(name, "disconnects")
+        elif isinstance(result, tuple):
+            handler.send_json(*result)
+        else:
+            handler.send_json(200, result)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    standin: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.standin._dispatch(self)
+
+    do_POST = do_GET
+    do_PATCH = do_GET
+    do_DELETE = do_GET
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, stream: Stream) -> bool:
+        """Write a streamed response; returns False if the client went away."""
+        # HTTP/1.0 responses end when the connection closes, so no chunked encoding is needed
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", stream.content_type)
+        self.end_headers()
+        try:
+            for chunk in stream.chunks:
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+        return True
@@ -0,0 +1,110 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from config.config import settings
+from src.utils import llm_cache, providers, tracing
+from src.utils.llm_handler import LLMHandler
+from src.utils.providers import LLMProvider, ProviderCapabilities
+
+class StubProvider(LLMProvider):
+    """In-process provider shared by the tests.
+
+    Answers with ``reply(prompt)`` after ``delay(prompt)`` seconds and raises
+    for prompts containing ``fail_on``. With ``chunks``, ``astream`` repeats
+    them until the consumer stops listening, then sets ``closed``.
+    """
+
+    def __init__(self,
+                 name: str = "stub",
+                 reply: Callable[[str], str] = lambda prompt: prompt,
+                 delay: Callable[[str], float] = lambda prompt: 0.0,
+                 fail_on: Optional[str] = None,
+                 chunks: Sequence[str] = (),
+                 capabilities: ProviderCapabilities = ProviderCapabilities()):
+        self.name = name
+        self.reply = reply
+        self.delay = delay
+        self.fail_on = fail_on
+        self.chunks = tuple(chunks)
+        self.capabilities = capabilities
+        self.running = 0
+        self.max_running = 0
+        self.closed = threading.Event()
+
+    @property
+    def model(self) -> str:
+        return "stub"
+
+    async def agenerate(self, prompt: str, caps=None) -> str:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay(prompt))
+        finally:
+            self.running -= 1
+        if self.fail_on is not None and self.fail_on in prompt:
+            raise RuntimeError(f"{self.name} cannot answer {prompt}")
+        return self.reply(prompt)
+
+    async def astream(self, prompt: str, caps=None):
+        if not self.chunks:
+            async for chunk in super().astream(prompt, caps):
+                yield chunk
+            return
+        try:
+            for _ in range(1000):
+                for chunk in self.chunks:
+                    await asyncio.sleep(0)
+                    yield chunk
+        finally:
+            self.closed.set()
+
+def handler_for(*stubs: LLMProvider) -> LLMHandler:
+    """A handler that only knows ``stubs``, without the response cache."""
+    for stub in stubs:
+        providers.register_provider(stub, replace=True)
+    handler = LLMHandler(probe=False)
+    handler.providers = {stub.name: handler.providers[stub.name] for stub in stubs}
+    handler.cache = None
+    for stub in stubs:
+        handler.breakers[stub.name].reset()
+    return handler
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_files(tmp_path_factory):
+    """Send traces, cached responses and profiles to a temporary directory instead of the repo's .cache."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    saved = (settings.tracing_jsonl_path, settings.llm_cache_path, settings.profiling_output_dir)
+    settings.tracing_jsonl_path = str(cache_dir / "traces.jsonl")
+    settings.llm_cache_path = str(cache_dir / "llm_responses.sqlite3")
+    settings.profiling_output_dir = str(cache_dir / "profiles")
+    # Both are opened on first use; drop any opened with the real paths
+    previous = tracing.set_tracer(tracing.Tracer.from_settings())
+    if previous is not None:
+        previous.close()
+    llm_cache._cache = None
+    yield cache_dir
+    tracing.set_tracer(None).close()
+    llm_cache._cache = None
+    settings.tracing_jsonl_path, settings.llm_cache_path, settings.profiling_output_dir = saved
+
+@pytest.fixture(autouse=True)
+def restore_provider_registry():
+    """Undo whatever a test registers, so no test sees another one's stub providers."""
+    saved = providers.get_registered_providers()
+    yield
+    current = providers.get_registered_providers()
+    for name in current.keys() - saved.keys():
+        providers.unregister_provider(name)
+    for name, provider in saved.items():
+        if current.get(name) is not provider:
+            providers.register_provider(provider, replace=True)
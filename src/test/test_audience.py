@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmark.audiences import legacy_categorize, synthetic_audiences
+from src.prompt.audience import AudienceClassifier, audience_classifier, categorize_audiences
+from src.prompt.prompt_engine import PromptEngine
+
+def test_categories_follow_precedence():
+    assert audience_classifier.categories("Senior Engineers and their Managers") == ["executives", "technical"]
+    assert audience_classifier.categorize("Senior Engineers and their Managers") == "executives"
+    assert audience_classifier.categorize("expert beginners") == "beginners"
+    assert audience_classifier.categorize("Retired teachers") == "general"
+    assert audience_classifier.categories("Retired teachers") == []
+    # Substring matches, as before
+    assert audience_classifier.categorize("Newsletter subscribers") == "beginners"
+
+def test_batch_matches_single_and_legacy():
+    audiences = synthetic_audiences(2000, seed=7) + ["", "CEO\nnewcomers", "specialistarter", "İstanbul developers"]
+    expected = [legacy_categorize(audience) for audience in audiences]
+    assert categorize_audiences(audiences) == expected
+    assert [audience_classifier.categorize(audience) for audience in audiences] == expected
+    assert PromptEngine().categorize_audiences(audiences[:10]) == expected[:10]
+    assert categorize_audiences([]) == []
+
+def test_custom_keywords():
+    classifier = AudienceClassifier({"clinical": ["Nurse", "doctor"], "students": ["student"]}, default="other")
+    assert classifier.categorize("nursing students") == "students"
+    assert classifier.categories("Nurses and medical students") == ["clinical", "students"]
+    assert classifier.categorize_many(["doctors", "parents"]) == ["clinical", "other"]
+
+if __name__ == "__main__":
+    test_categories_follow_precedence()
+    test_batch_matches_single_and_legacy()
+    test_custom_keywords()
+    print("✅ Audience tests passed")
@@ -0,0 +1,82 @@
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from typer.testing import CliRunner
+
+from src.prompt.batch import RenderedPrompt, RowError, app, render_many
+from src.prompt.prompt_engine import ContentRequest, ContentType, LengthType, PromptEngine, ToneType
+
+def test_render_many_is_lazy_and_keeps_going():
+    pulled = []
+
+    def rows():
+        for index in range(1000):
+            pulled.append(index)
+            if index == 1:
+                yield {"topic": "Broken", "content_type": "podcast", "tone": "casual", "length": "short"}
+            else:
+                yield {"topic": f"Topic {index}", "content_type": "Blog", "tone": "casual", "length": "extra long"}
+
+    results = render_many(rows())
+    first = next(results)
+    assert len(pulled) == 1
+    assert isinstance(first, RenderedPrompt) and first.line == 1
+
+    error = next(results)
+    assert isinstance(error, RowError) and error.line == 2
+    assert error.error.startswith("content_type:")
+    assert isinstance(next(results), RenderedPrompt)
+
+def test_rendered_prompt_matches_the_engine():
+    request = ContentRequest(topic="Pricing", content_type=ContentType.MARKETING, tone=ToneType.FORMAL,
+                             length=LengthType.LONG, keywords=["saas"])
+    [result] = render_many([request])
+    assert result.prompt == PromptEngine().create_enhanced_prompt(request)
+    assert result.prompt_chars == len(result.prompt)
+    assert result.content_type == "marketing"
+
+def test_cli_splits_prompts_and_errors(tmp_path):
+    source = tmp_path / "campaign.jsonl"
+    source.write_text("\n".join([
+        json.dumps({"id": 7, "topic": "Launch", "content_type": "email", "tone": "friendly", "length": "short",
+                    "keywords": ["beta", "waitlist"]}),
+        "",
+        "{not json",
+        json.dumps(["not", "an", "object"]),
+    ]) + "\n")
+
+    result = CliRunner().invoke(app, [str(source)])
+    assert result.exit_code == 0, result.output
+
+    [prompt] = [json.loads(line) for line in (tmp_path / "campaign.prompts.jsonl").read_text().splitlines()]
+    assert prompt["id"] == "7" and prompt["line"] == 1
+    errors = [json.loads(line) for line in (tmp_path / "campaign.errors.jsonl").read_text().splitlines()]
+    assert [error["line"] for error in errors] == [3, 4]
+    assert errors[0]["error"].startswith("Invalid JSON")
+
+def test_cli_reads_csv(tmp_path):
+    source = tmp_path / "campaign.csv"
+    source.write_text("topic,content_type,tone,length,keywords,seo_focused\n"
+                      "Onboarding,blog,casual,medium,\"remote; onboarding\",yes\n")
+
+    result = CliRunner().invoke(app, [str(source), "--output", str(tmp_path / "out.jsonl")])
+    assert result.exit_code == 0, result.output
+
+    [prompt] = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert "KEYWORDS TO INCLUDE: remote, onboarding" in prompt["prompt"]
+    assert not (tmp_path / "campaign.errors.jsonl").exists()
+
+if __name__ == "__main__":
+    import tempfile
+    test_render_many_is_lazy_and_keeps_going()
+    test_rendered_prompt_matches_the_engine()
+    with tempfile.TemporaryDirectory() as directory:
+        test_cli_splits_prompts_and_errors(Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_cli_reads_csv(Path(directory))
+    print("✅ Batch prompt tests passed")
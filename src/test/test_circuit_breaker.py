@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.circuit_breaker import CircuitBreaker, CircuitState
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker("test", min_requests=4, error_rate_threshold=0.5, open_seconds=60)
+
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["rejected"] == 1
+
+def test_breaker_half_open_trial():
+    breaker = CircuitBreaker("test", open_seconds=0)
+    breaker.trip("probe failed")
+
+    # open_seconds elapsed: exactly one trial request is admitted
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success(0.2)
+    assert breaker.state == CircuitState.CLOSED
+
+def test_breaker_reopens_when_trial_fails():
+    breaker = CircuitBreaker("test", open_seconds=60)
+    breaker.trip("probe failed")
+    breaker._opened_at -= 60
+
+    assert breaker.allow_request()
+    breaker.record_failure(0.5, "timeout")
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.snapshot()["last_error"] == "timeout"
+
+if __name__ == "__main__":
+    test_breaker_opens_on_error_rate()
+    test_breaker_half_open_trial()
+    test_breaker_reopens_when_trial_fails()
+    print("✅ Circuit breaker tests passed")
@@ -0,0 +1,77 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.prompt.prompt_engine import ContentRequest, ContentType, LengthType, PromptEngine, ToneType
+from src.utils.generation_caps import GenerationCaps, cap_stats
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_handler import LLMHandler
+from src.utils.providers import OllamaProvider, register_provider
+
+class _TruncatingOllama(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _TruncatingOllama.requests.append(body)
+        payload = json.dumps({"response": "cut short", "done": True, "done_reason": "length"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def test_caps_follow_word_count_range():
+    engine = PromptEngine()
+    request = ContentRequest(topic="Launch", content_type=ContentType.SOCIAL,
+                             tone=ToneType.CASUAL, length=LengthType.SHORT)
+    assert engine.get_word_count_range(request) == (50, 100)
+
+    caps = GenerationCaps.for_word_count(100, "x" * 400, headroom=1.0)
+    assert caps.max_output_tokens == 135 + 64
+    assert caps.context_tokens == 4096
+
+    # Long prompts move up to the next power-of-two context size
+    assert GenerationCaps.for_word_count(2500, "x" * 20000).context_tokens == 16384
+
+def test_cache_keys_include_caps():
+    cache = LLMCache(":memory:")
+    short = GenerationCaps(max_output_tokens=200, context_tokens=4096).cache_tag()
+
+    cache.set("ollama", "llama3.1", "prompt", "short answer", short)
+    assert cache.get("ollama", "llama3.1", "prompt", short) == "short answer"
+    assert cache.get("ollama", "llama3.1", "prompt") is None
+
+def test_ollama_caps_and_truncation_counter():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TruncatingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        register_provider(OllamaProvider(name="ollama-caps-test",
+                                         base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                                         model="stub"), replace=True)
+        handler = LLMHandler(probe=False)
+        caps = GenerationCaps(max_output_tokens=200, context_tokens=4096, label="social/short")
+        result = handler.generate("caps test prompt", "ollama-caps-test", use_cache=False, caps=caps)
+    finally:
+        server.shutdown()
+
+    assert result.content == "cut short"
+    assert _TruncatingOllama.requests[-1]["options"] == {"num_predict": 200, "num_ctx": 4096}
+    row = next(row for row in cap_stats.stats() if row["provider"] == "ollama-caps-test")
+    assert row["label"] == "social/short"
+    assert row["truncated"] == row["requests"] == 1
+
+if __name__ == "__main__":
+    test_caps_follow_word_count_range()
+    test_cache_keys_include_caps()
+    test_ollama_caps_and_truncation_counter()
+    print("✅ Generation caps tests passed")
@@ -0,0 +1,43 @@
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+import requests
+
+from config.config import settings
+from src.utils.http_pool import get_ollama_session
+from src.utils.providers import OllamaProvider
+
+def test_sessions_retry_connection_failures_only():
+    retry = get_ollama_session("http://ollama.invalid:11434").get_adapter("http://ollama.invalid:11434").max_retries
+    assert (retry.connect, retry.read, retry.status) == (settings.ollama_http_retries, 0, 0)
+    probe_retry = get_ollama_session("http://ollama.invalid:11434", retries=False).get_adapter("http://").max_retries
+    assert probe_retry.total == 0
+
+def test_a_timed_out_probe_gives_up_within_the_probe_timeout():
+    # Accepts connections but never answers, like a hung Ollama
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    saved = settings.provider_probe_timeout_seconds
+    settings.provider_probe_timeout_seconds = 0.5
+    provider = OllamaProvider(base_url=f"http://127.0.0.1:{listener.getsockname()[1]}")
+    try:
+        started_at = time.perf_counter()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            provider.probe()
+        assert time.perf_counter() - started_at < 1.0
+    finally:
+        settings.provider_probe_timeout_seconds = saved
+        listener.close()
+
+if __name__ == "__main__":
+    test_sessions_retry_connection_failures_only()
+    test_a_timed_out_probe_gives_up_within_the_probe_timeout()
+    print("✅ HTTP pool tests passed")
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.llm_cache import LLMCache
+
+def test_cache_hit_and_miss():
+    cache = LLMCache(":memory:")
+
+    assert cache.get("gemini", "gemini-2.0-flash", "prompt") is None
+    cache.set("gemini", "gemini-2.0-flash", "prompt", "response")
+    assert cache.get("gemini", "gemini-2.0-flash", "prompt") == "response"
+
+    # Same prompt on another provider or model is a different entry
+    assert cache.get("ollama", "llama3.1", "prompt") is None
+    assert cache.get("gemini", "gemini-1.5-pro", "prompt") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["entries"] == 1
+
+def test_cache_ttl_expiry():
+    cache = LLMCache(":memory:", ttl_seconds=1)
+    cache.set("ollama", "llama3.1", "prompt", "response")
+    cache._conn.execute("UPDATE responses SET created_at = ?", (time.time() - 5,))
+
+    assert cache.get("ollama", "llama3.1", "prompt") is None
+    assert cache.stats()["entries"] == 0
+
+def test_cache_lru_eviction():
+    cache = LLMCache(":memory:", max_entries=2)
+    cache.set("ollama", "llama3.1", "a", "A")
+    time.sleep(0.01)
+    cache.set("ollama", "llama3.1", "b", "B")
+    time.sleep(0.01)
+
+    # Touch "a" so "b" becomes the least recently used entry
+    assert cache.get("ollama", "llama3.1", "a") == "A"
+    time.sleep(0.01)
+    cache.set("ollama", "llama3.1", "c", "C")
+
+    assert cache.get("ollama", "llama3.1", "b") is None
+    assert cache.get("ollama", "llama3.1", "a") == "A"
+    assert cache.get("ollama", "llama3.1", "c") == "C"
+
+def test_hits_buffer_last_access_until_flushed():
+    cache = LLMCache(":memory:", flush_every=2)
+    cache.set("ollama", "llama3.1", "a", "A")
+    cache.set("ollama", "llama3.1", "b", "B")
+    stored = dict(cache._conn.execute("SELECT key, last_access FROM responses").fetchall())
+    key = LLMCache.make_key("ollama", "llama3.1", "a")
+
+    time.sleep(0.01)
+    assert asyncio.run(cache.aget("ollama", "llama3.1", "a")) == "A"
+    assert cache._conn.execute("SELECT last_access FROM responses WHERE key = ?", (key,)).fetchone()[0] == stored[key]
+
+    # The second pending hit reaches flush_every and writes both
+    assert cache.get("ollama", "llama3.1", "b") == "B"
+    assert cache._conn.execute("SELECT last_access FROM responses WHERE key = ?", (key,)).fetchone()[0] > stored[key]
+
+    asyncio.run(cache.aset("ollama", "llama3.1", "c", "C"))
+    assert cache.get("ollama", "llama3.1", "c") == "C"
+
+if __name__ == "__main__":
+    test_cache_hit_and_miss()
+    test_cache_ttl_expiry()
+    test_cache_lru_eviction()
+    test_hits_buffer_last_access_until_flushed()
+    print("✅ LLM cache tests passed")
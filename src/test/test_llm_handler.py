@@ -0,0 +1,145 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from conftest import StubProvider, handler_for
+from config.config import settings
+from src.standins import LatencyProfile, OllamaStandIn
+from src.utils import tracing
+from src.utils.async_runner import run_sync
+from src.utils.llm_handler import LLMHandler
+from src.utils.providers import OllamaProvider
+from src.utils.rate_limiter import ProviderLimiter
+from src.utils.tracing import SpanSink, Tracer
+
+class _ListSink(SpanSink):
+    def __init__(self):
+        self.spans = []
+
+    def on_end(self, span):
+        self.spans.append(span)
+
+def _ollama(name: str, server: OllamaStandIn) -> OllamaProvider:
+    return OllamaProvider(name=name, base_url=server.url, model="standin")
+
+def _race(handler: LLMHandler, hedge_delay: float, stream: bool = False):
+    saved = settings.llm_hedge_delay_seconds
+    settings.llm_hedge_delay_seconds = hedge_delay
+    try:
+        started_at = time.perf_counter()
+        if stream:
+            generation = handler.stream_content("race prompt", "race", use_cache=False)
+            result = ("".join(generation), generation.provider)
+        else:
+            result = handler.generate("race prompt", "race", use_cache=False)
+        return result, time.perf_counter() - started_at
+    finally:
+        settings.llm_hedge_delay_seconds = saved
+
+def test_async_generations_overlap_on_the_shared_loop():
+    with OllamaStandIn(LatencyProfile(latency_seconds=0.4), models=["standin"], response_words=5) as server, \
+            OllamaStandIn(LatencyProfile(error_rate=1.0, error_status=500), models=["standin"]) as broken:
+        handler = handler_for(_ollama("async-standin", server), _ollama("async-broken", broken))
+
+        async def generate_four():
+            return await asyncio.gather(*(handler.agenerate_content(f"prompt {index}", "async-standin", use_cache=False)
+                                          for index in range(4)))
+
+        started_at = time.perf_counter()
+        contents = run_sync(generate_four())
+        elapsed = time.perf_counter() - started_at
+        failed = run_sync(handler.agenerate_with("async-broken", "prompt"))
+
+    assert [len(content.split()) for content in contents] == [5, 5, 5, 5]
+    # Four 0.4s requests in flight together, not one after another
+    assert elapsed < 1.2
+    assert server.stats()["generate"]["requests"] == 4
+    assert failed is None
+
+def test_race_skips_the_secondary_when_the_primary_answers_within_the_hedge_delay():
+    with OllamaStandIn(models=["standin"], response_words=5) as primary, \
+            OllamaStandIn(models=["standin"], response_words=5) as secondary:
+        handler = handler_for(_ollama("hedge-primary", primary), _ollama("hedge-secondary", secondary))
+        result, _ = _race(handler, hedge_delay=5.0)
+        (text, provider), _ = _race(handler, hedge_delay=5.0, stream=True)
+
+    assert result.provider == "hedge-primary"
+    assert provider == "hedge-primary" and len(text.split()) == 5
+    assert primary.stats()["generate"]["requests"] == 2
+    assert "generate" not in secondary.stats()
+
+def test_race_cancels_the_loser():
+    sink = _ListSink()
+    previous = tracing.set_tracer(Tracer([sink]))
+    try:
+        with OllamaStandIn(LatencyProfile(latency_seconds=3.0), models=["standin"], response_words=5) as slow, \
+                OllamaStandIn(models=["standin"], response_words=5) as fast:
+            handler = handler_for(_ollama("cancel-slow", slow), _ollama("cancel-fast", fast))
+            result, elapsed = _race(handler, hedge_delay=0.0)
+    finally:
+        tracing.set_tracer(previous)
+
+    assert result.provider == "cancel-fast"
+    assert elapsed < 2.0
+    calls = {span.attributes["provider"]: span for span in sink.spans if span.name == "llm.call"}
+    assert calls["cancel-slow"].status == "cancelled"
+    assert calls["cancel-fast"].status == "ok"
+    assert handler.limiters["cancel-slow"].in_flight == 0
+
+def test_race_falls_back_as_soon_as_the_primary_errors():
+    with OllamaStandIn(LatencyProfile(error_rate=1.0, error_status=500), models=["standin"]) as broken, \
+            OllamaStandIn(models=["standin"], response_words=5) as healthy:
+        handler = handler_for(_ollama("fallback-broken", broken), _ollama("fallback-healthy", healthy))
+        result, elapsed = _race(handler, hedge_delay=5.0)
+        (text, provider), stream_elapsed = _race(handler, hedge_delay=5.0, stream=True)
+
+    assert result.provider == "fallback-healthy"
+    assert provider == "fallback-healthy" and len(text.split()) == 5
+    # The secondary started on the primary's failure, not after the hedge delay
+    assert elapsed < 2.0 and stream_elapsed < 2.0
+    assert broken.stats()["generate"]["errors"] == 2
+
+def test_batch_keeps_input_order_under_provider_limits():
+    # Earlier prompts take longer, so they finish last
+    provider = StubProvider("echo", reply=lambda prompt: f"echo: {prompt}",
+                            delay=lambda prompt: 0.05 * (8 - int(prompt.split()[-1])))
+    handler = handler_for(provider)
+    handler.limiters["echo"] = ProviderLimiter("echo", max_parallel=2)
+    prompts = [f"prompt {index}" for index in range(8)]
+
+    items = handler.generate_batch(prompts, "echo", max_concurrency=8, use_cache=False)
+
+    assert [item.index for item in items] == list(range(8))
+    assert [item.content for item in items] == [f"echo: {prompt}" for prompt in prompts]
+    assert all(item.ok and item.provider == "echo" for item in items)
+    assert provider.max_running == 2
+
+def test_batch_reports_failures_per_item_and_progress_once_per_item():
+    handler = handler_for(StubProvider("echo", reply=lambda prompt: f"echo: {prompt}", delay=lambda prompt: 0.01,
+                                       fail_on="fail"))
+    prompts = ["first", "please fail", "third", "fail again", "fifth"]
+    progress = []
+
+    items = handler.generate_batch(prompts, "echo", max_concurrency=2, use_cache=False,
+                                   progress_callback=lambda done, total, item: progress.append((done, total, item.index)))
+
+    assert [item.ok for item in items] == [True, False, True, False, True]
+    assert items[1].content is None and "echo" in items[1].error
+    assert items[4].content == "echo: fifth" and items[4].error is None
+    assert [done for done, _, _ in progress] == [1, 2, 3, 4, 5]
+    assert {total for _, total, _ in progress} == {5}
+    assert sorted(index for _, _, index in progress) == list(range(5))
+
+if __name__ == "__main__":
+    test_async_generations_overlap_on_the_shared_loop()
+    test_race_skips_the_secondary_when_the_primary_answers_within_the_hedge_delay()
+    test_race_cancels_the_loser()
+    test_race_falls_back_as_soon_as_the_primary_errors()
+    test_batch_keeps_input_order_under_provider_limits()
+    test_batch_reports_failures_per_item_and_progress_once_per_item()
+    print("✅ LLM handler tests passed")
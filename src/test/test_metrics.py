@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import pytest
+
+from conftest import StubProvider, handler_for
+from config.config import settings
+from src.utils import llm_cache, tracing
+from src.utils.metrics import (
+    NOTION_WRITE_DURATION,
+    PROVIDER_FAILURES,
+    PROVIDER_FALLBACKS,
+    PROVIDER_REQUESTS,
+    STAGE_DURATION,
+    MetricsRegistry,
+    MetricsSpanSink,
+    metrics,
+    start_metrics_server,
+)
+from src.utils.tracing import Tracer
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests", ["provider"])
+    latency = registry.histogram("demo_latency_seconds", "Latency", buckets=[0.1, 1])
+    requests.inc(provider='say "hi"')
+    requests.inc(2, provider='say "hi"')
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{provider="say \\"hi\\""} 3.0' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'demo_latency_seconds_bucket{le="1.0"} 2.0' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 2.0' in text
+    assert "demo_latency_seconds_count 2.0" in text
+
+    with pytest.raises(ValueError):
+        registry.gauge("demo_requests_total", "Requests", ["provider"])
+    with pytest.raises(ValueError):
+        requests.inc(model="x")
+
+def test_spans_feed_stage_and_provider_metrics():
+    previous = tracing.set_tracer(Tracer([MetricsSpanSink()]))
+    before = (STAGE_DURATION.count(stage="llm.call", status="error"),
+              PROVIDER_REQUESTS.value(provider="metrics-span"),
+              PROVIDER_FAILURES.value(provider="metrics-span"),
+              NOTION_WRITE_DURATION.count(status="ok"))
+    try:
+        with pytest.raises(RuntimeError):
+            with tracing.span("llm.call", provider="metrics-span"):
+                raise RuntimeError("boom")
+        with tracing.span("notion.create_page"):
+            pass
+    finally:
+        tracing.set_tracer(previous)
+
+    after = (STAGE_DURATION.count(stage="llm.call", status="error"),
+             PROVIDER_REQUESTS.value(provider="metrics-span"),
+             PROVIDER_FAILURES.value(provider="metrics-span"),
+             NOTION_WRITE_DURATION.count(status="ok"))
+    assert [a - b for a, b in zip(after, before)] == [1, 1, 1, 1]
+
+def test_fallbacks_are_counted():
+    handler = handler_for(StubProvider("metrics-failing", fail_on=""), StubProvider("metrics-working"))
+
+    # Not a provider name or routing policy: every provider is tried in registration order
+    result = handler.generate("fallback prompt", "any", use_cache=False)
+
+    assert result.provider == "metrics-working"
+    assert PROVIDER_FALLBACKS.value(provider="metrics-failing") == 1
+
+def test_endpoint_serves_metrics():
+    server = start_metrics_server(port=0)
+    assert server is not None
+    assert start_metrics_server() is server
+
+    response = httpx.get(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE content_stage_duration_seconds histogram" in response.text
+    assert "# TYPE llm_queue_depth gauge" in response.text
+
+def test_scrapes_do_not_create_the_response_cache(tmp_path):
+    saved = (settings.llm_cache_path, llm_cache._cache)
+    settings.llm_cache_path = str(tmp_path / "responses.sqlite3")
+    llm_cache._cache = None
+    try:
+        assert "llm_cache_entries" not in metrics.render()
+        assert not (tmp_path / "responses.sqlite3").exists()
+
+        llm_cache.get_llm_cache()
+        assert "llm_cache_entries 0" in metrics.render()
+    finally:
+        settings.llm_cache_path, llm_cache._cache = saved
+
+if __name__ == "__main__":
+    test_registry_renders_prometheus_text()
+    test_spans_feed_stage_and_provider_metrics()
+    test_fallbacks_are_counted()
+    test_endpoint_serves_metrics()
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_scrapes_do_not_create_the_response_cache(Path(directory))
+    print("✅ Metrics tests passed")
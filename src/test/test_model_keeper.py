@@ -0,0 +1,110 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.config import settings
+from src.utils.metrics import MODEL_LATENCY
+from src.utils.model_keeper import LoadLatencyStats, ModelKeeper
+from src.utils.providers import OllamaProvider
+
+class _OllamaStub(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _OllamaStub.requests.append(body)
+        payload = json.dumps({"response": "", "done": True, "done_reason": "load",
+                              "load_duration": int(2e9)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def test_load_stats_split_cold_and_warm():
+    stats = LoadLatencyStats()
+    stats.record(load_seconds=4.0, total_seconds=6.0)
+    stats.record(load_seconds=0.01, total_seconds=1.0)
+    stats.record(load_seconds=0.02, total_seconds=2.0)
+
+    snapshot = stats.stats()
+    assert snapshot["cold_requests"] == 1
+    assert snapshot["cold_p50_latency"] == 6.0
+    assert snapshot["warm_requests"] == 2
+    assert snapshot["warm_p50_latency"] in (1.0, 2.0)
+
+def test_keeper_rewarms_after_idle():
+    stats = LoadLatencyStats()
+    warmed = threading.Event()
+    keeper = ModelKeeper("test", lambda: (stats.record_warmup(0.0), warmed.set()), stats, idle_seconds=1)
+
+    keeper.start()
+    try:
+        assert warmed.wait(3)
+        assert stats.warmups == 1
+    finally:
+        keeper.stop()
+
+def test_keeper_backs_off_after_failures_and_stops_when_unused():
+    stats = LoadLatencyStats()
+    attempts = []
+
+    def warm():
+        attempts.append(time.monotonic())
+        raise ConnectionError("Ollama is down")
+
+    keeper = ModelKeeper("test", warm, stats, idle_seconds=60, max_idle_seconds=3600, backoff_seconds=5)
+    stats.last_used -= 120
+    delays = []
+    for _ in range(6):
+        keeper._tick()
+        delays.append(keeper._next_delay())
+    assert len(attempts) == 6
+    assert delays == [5, 10, 20, 40, 60, 60]
+
+    # A generation long ago, and only warm-ups since: let the model unload
+    stats.last_request -= 7200
+    keeper._tick()
+    assert len(attempts) == 6
+    assert keeper.failures == 0 and keeper._next_delay() == 60
+
+    # The next generation resumes re-warming
+    stats.record(load_seconds=0.0, total_seconds=1.0)
+    stats.last_used -= 120
+    keeper._tick()
+    assert len(attempts) == 7
+
+def test_ollama_warm_up_sends_keep_alive():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OllamaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    keep_alive, rewarm = settings.ollama_keep_alive, settings.ollama_rewarm_idle_seconds
+    settings.ollama_keep_alive, settings.ollama_rewarm_idle_seconds = "-1", 0
+    try:
+        provider = OllamaProvider(base_url=f"http://127.0.0.1:{server.server_address[1]}", model="stub")
+        provider.warm_up()
+    finally:
+        settings.ollama_keep_alive, settings.ollama_rewarm_idle_seconds = keep_alive, rewarm
+        server.shutdown()
+
+    assert _OllamaStub.requests[-1]["model"] == "stub"
+    assert _OllamaStub.requests[-1]["keep_alive"] == -1
+    assert provider.stats()["warmups"] == 1
+    assert not provider.stats()["keeper_running"]
+    assert MODEL_LATENCY.count(provider="ollama", phase="cold", kind="warmup") >= 1
+
+if __name__ == "__main__":
+    test_load_stats_split_cold_and_warm()
+    test_keeper_rewarms_after_idle()
+    test_keeper_backs_off_after_failures_and_stops_when_unused()
+    test_ollama_warm_up_sends_keep_alive()
+    print("✅ Model keeper tests passed")
@@ -0,0 +1,69 @@
+import pstats
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from conftest import StubProvider
+from config.config import settings
+from src.core.content_agent import ContentAgent
+from src.utils import profiling
+from src.utils.providers import register_provider
+
+def _busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+def test_profile_saves_artifact_and_top_functions(tmp_path):
+    with profiling.profile("busy work", enabled=True, output_dir=str(tmp_path)) as profile:
+        _busy(200_000)
+        # An inner block in the same thread is covered by the outer profile
+        with profiling.profile("inner", enabled=True) as inner:
+            assert inner is None
+
+    report = profile.report
+    assert report.label == "busy work"
+    assert report.total_seconds > 0
+    assert Path(report.path).parent == tmp_path
+    assert "-busy_work-" in Path(report.path).name
+    assert "_busy" in {name for (_, _, name) in pstats.Stats(report.path).stats}
+    assert "<genexpr>" in {row.function for row in report.functions}
+    own = [row.own_ms for row in report.functions]
+    assert own == sorted(own, reverse=True)
+
+def test_profile_is_off_by_default():
+    saved = settings.profiling_enabled
+    settings.profiling_enabled = False
+    try:
+        with profiling.profile("disabled") as profile:
+            _busy(10)
+        assert profile is None
+    finally:
+        settings.profiling_enabled = saved
+
+def test_generation_carries_its_profile(tmp_path):
+    register_provider(StubProvider("profiling-echo", reply=lambda prompt: "# Profiled\n\n" + prompt))
+    saved = (settings.profiling_enabled, settings.profiling_output_dir)
+    settings.profiling_enabled, settings.profiling_output_dir = True, str(tmp_path)
+    try:
+        agent = ContentAgent()
+        result = agent.generate_content_with_advanced_prompts("Profiling", ai_provider="profiling-echo",
+                                                              use_cache=False)
+    finally:
+        settings.profiling_enabled, settings.profiling_output_dir = saved
+
+    report = result["profile"]
+    assert report.request_id == result["request_id"]
+    assert Path(report.path).exists()
+    functions = {name for (_, _, name) in pstats.Stats(report.path).stats}
+    assert "create_enhanced_prompt" in functions
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_profile_saves_artifact_and_top_functions(Path(directory))
+    test_profile_is_off_by_default()
+    with tempfile.TemporaryDirectory() as directory:
+        test_generation_carries_its_profile(Path(directory))
+    print("✅ Profiling tests passed")
@@ -0,0 +1,143 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from src.benchmark.prompts import legacy_render
+from src.prompt.prompt_cache import PromptCache, get_prompt_cache, request_fingerprint
+from src.prompt.prompt_engine import (
+    TEMPLATES,
+    CompiledTemplate,
+    ContentRequest,
+    ContentType,
+    LengthType,
+    PromptEngine,
+    ToneType,
+)
+
+PREFIX_STABLE = "prefix_stable"
+
+def test_compiled_template_matches_str_format():
+    template = CompiledTemplate('Write about "{topic}" in a {tone} tone.\n{topic}!')
+    assert template.fields == {"topic", "tone"}
+    assert template.render({"topic": "Tea {x}", "tone": "calm"}) == template.source.format(topic="Tea {x}", tone="calm")
+
+    with pytest.raises(ValueError):
+        CompiledTemplate("{topic!r}")
+    with pytest.raises(ValueError):
+        CompiledTemplate("{request.topic}")
+
+def test_templates_are_shared_and_read_only():
+    assert PromptEngine().templates is PromptEngine().templates
+    with pytest.raises(TypeError):
+        TEMPLATES["blog"] = CompiledTemplate("")
+    assert "platform" in TEMPLATES["social"].fields
+    assert "platform" not in TEMPLATES["blog"].fields
+
+def test_prompts_match_the_previous_rendering():
+    engine = PromptEngine()
+    for content_type in ContentType:
+        for request in (
+            ContentRequest(topic="Launch", content_type=content_type, tone=ToneType.CASUAL, length=LengthType.SHORT),
+            ContentRequest(topic="Pricing {tiers}", content_type=content_type, tone=ToneType.FORMAL,
+                           length=LengthType.EXTRA_LONG, target_audience="CTOs", keywords=["saas", "pricing"],
+                           call_to_action="Book a demo", brand_voice="Direct", industry="software",
+                           custom_instructions="Mention {annual} plans", include_examples=True, seo_focused=True),
+        ):
+            assert engine._render_prompt(request) == legacy_render(engine, request)
+
+def test_fingerprint_ignores_keyword_order():
+    request = ContentRequest(topic="Launch", content_type=ContentType.BLOG, tone=ToneType.CASUAL,
+                             length=LengthType.SHORT, keywords=["saas", "pricing"])
+    reordered = request.model_copy(update={"keywords": [" pricing", "saas", "saas"]})
+    assert request_fingerprint(request) == request_fingerprint(reordered)
+    assert request_fingerprint(request) != request_fingerprint(request.model_copy(update={"seo_focused": True}))
+    assert len(request_fingerprint(request)) == 64
+    # No keywords, however spelled
+    assert request_fingerprint(request.model_copy(update={"keywords": []})) == \
+        request_fingerprint(request.model_copy(update={"keywords": None}))
+
+def test_prompt_cache_is_a_bounded_lru():
+    cache = PromptCache(max_entries=2)
+    assert cache.get_or_render("a", lambda: "A") == "A"
+    assert cache.get_or_render("b", lambda: "B") == "B"
+    assert cache.get_or_render("a", lambda: "stale") == "A"
+    cache.get_or_render("c", lambda: "C")
+    # "b" was least recently used
+    assert cache.get_or_render("b", lambda: "B2") == "B2"
+    assert cache.stats() == {"hits": 1, "misses": 4, "hit_rate": 0.2, "entries": 2, "max_entries": 2}
+
+def test_repeated_requests_are_served_from_the_cache():
+    engine = PromptEngine()
+    request = ContentRequest(topic="Cached launch", content_type=ContentType.EMAIL, tone=ToneType.FRIENDLY,
+                             length=LengthType.MEDIUM, keywords=["beta", "waitlist"])
+    before = get_prompt_cache().stats()
+    prompt = engine.create_enhanced_prompt(request)
+    again = engine.create_enhanced_prompt(request.model_copy())
+    # Keyword order shows in the prompt, so it is a different entry
+    reordered = engine.create_enhanced_prompt(request.model_copy(update={"keywords": ["waitlist", "beta"]}))
+    after = engine.get_cache_stats()
+
+    assert again is prompt
+    assert "KEYWORDS TO INCLUDE: beta, waitlist" in prompt
+    assert "KEYWORDS TO INCLUDE: waitlist, beta" in reordered
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 2)
+
+def test_prefix_stable_layout_shares_a_prefix_per_content_type():
+    classic, stable = PromptEngine("classic"), PromptEngine(PREFIX_STABLE)
+    for content_type in ContentType:
+        first = ContentRequest(topic="Launch", content_type=content_type, tone=ToneType.CASUAL,
+                               length=LengthType.SHORT, keywords=["beta"])
+        second = ContentRequest(topic="Pricing", content_type=content_type, tone=ToneType.FORMAL,
+                                length=LengthType.LONG, target_audience="CTOs", brand_voice="Direct")
+        prefix = stable.static_prefix(content_type)
+        for request in (first, second):
+            prompt = stable.create_enhanced_prompt(request)
+            assert prompt.startswith(prefix)
+            if content_type.value in TEMPLATES:
+                assert request.topic in prompt[len(prefix):]
+            # Same instructions, only reordered
+            assert sorted(filter(None, prompt.splitlines())) == \
+                sorted(filter(None, classic.create_enhanced_prompt(request).splitlines()))
+
+    assert "QUALITY STANDARDS:" in stable.static_prefix(ContentType.BLOG)
+    assert "general social media" in stable.static_prefix(ContentType.SOCIAL)
+
+def test_layouts_separate_sections_with_one_blank_line():
+    # The classic full-size prompt is left out: it matches the previous rendering byte for byte
+    engines = [PromptEngine("classic", compact="always"), PromptEngine(PREFIX_STABLE, compact="never"),
+               PromptEngine(PREFIX_STABLE, compact="always")]
+    for content_type in ContentType:
+        for extra in ({}, {"brand_voice": "Direct", "include_examples": True}):
+            request = ContentRequest(topic="Spacing", content_type=content_type, tone=ToneType.CASUAL,
+                                     length=LengthType.SHORT, keywords=["remote", "async"], **extra)
+            for engine in engines:
+                prompt = engine.create_enhanced_prompt(request)
+                assert "\n\n\n" not in prompt
+                before_keywords = prompt[:prompt.index("KEYWORDS TO INCLUDE")]
+                if before_keywords.strip():
+                    assert before_keywords.endswith("\n\n")
+
+def test_layouts_are_cached_separately():
+    request = ContentRequest(topic="Layouts", content_type=ContentType.ARTICLE, tone=ToneType.FORMAL,
+                             length=LengthType.MEDIUM)
+    assert PromptEngine("classic").create_enhanced_prompt(request) != \
+        PromptEngine(PREFIX_STABLE).create_enhanced_prompt(request)
+    with pytest.raises(ValueError):
+        PromptEngine("alphabetical")
+
+if __name__ == "__main__":
+    test_compiled_template_matches_str_format()
+    test_templates_are_shared_and_read_only()
+    test_prompts_match_the_previous_rendering()
+    test_fingerprint_ignores_keyword_order()
+    test_prompt_cache_is_a_bounded_lru()
+    test_prefix_stable_layout_shares_a_prefix_per_content_type()
+    test_layouts_separate_sections_with_one_blank_line()
+    test_layouts_are_cached_separately()
+    test_repeated_requests_are_served_from_the_cache()
+    print("✅ Prompt engine tests passed")
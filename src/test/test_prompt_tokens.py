@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from src.prompt.prompt_engine import (COMPACT_GUIDELINES, QUALITY_GUIDELINES, ContentRequest, ContentType, LengthType,
+                                      PromptEngine, ToneType)
+from src.prompt.tokens import Tokenizer, get_tokenizer, prompt_sections, register_tokenizer
+
+def _request(content_type: ContentType = ContentType.BLOG) -> ContentRequest:
+    return ContentRequest(topic="Sourdough basics", content_type=content_type, tone=ToneType.CASUAL,
+                          length=LengthType.SHORT, keywords=["starter", "hydration"])
+
+def test_builtin_and_registered_tokenizers():
+    assert get_tokenizer("chars").count("x" * 40) == 10
+    assert get_tokenizer("chars").count("") == 0
+    assert get_tokenizer("words").count("Don't panic: 1500 words, internationalization!") == 12
+    assert get_tokenizer("words") is get_tokenizer("words")
+    with pytest.raises(ValueError):
+        get_tokenizer("sentencepiece")
+
+    class SpaceTokenizer(Tokenizer):
+        name = "spaces"
+
+        def count(self, text):
+            return len(text.split())
+
+    register_tokenizer("spaces", SpaceTokenizer, replace=True)
+    assert get_tokenizer("spaces").count("three little words") == 3
+    with pytest.raises(ValueError):
+        register_tokenizer("spaces", SpaceTokenizer)
+
+def test_tokenizers_must_implement_count():
+    class Uncounting(Tokenizer):
+        name = "uncounting"
+
+    with pytest.raises(TypeError, match="count"):
+        Uncounting()
+    with pytest.raises(TypeError):
+        Tokenizer()
+
+def test_prompt_sections_follow_the_headings():
+    prompt = PromptEngine("classic", compact="never").create_enhanced_prompt(_request())
+    names = [name for name, _ in prompt_sections(prompt)]
+    assert names[:3] == ["intro", "request", "requirements"]
+    assert names[-3:] == ["keywords to include", "quality standards", "output format"]
+
+def test_compact_prompts_drop_only_covered_guidelines():
+    for content_type in ContentType:
+        full = PromptEngine("classic", compact="never").create_enhanced_prompt(_request(content_type))
+        compact = PromptEngine("classic", compact="always").create_enhanced_prompt(_request(content_type))
+        assert len(compact) <= len(full)
+        assert set(filter(None, compact.splitlines())) <= set(line.rstrip() for line in full.splitlines())
+
+    # The blog STRUCTURE already asks for a headline and key takeaways
+    assert "- Include suggested title options" in QUALITY_GUIDELINES
+    assert "- Include suggested title options" not in COMPACT_GUIDELINES["blog"]
+    assert "- End with clear next steps" not in COMPACT_GUIDELINES["blog"]
+    assert "- Proofread for grammar and spelling" in COMPACT_GUIDELINES["blog"]
+
+def test_budget_report_compacts_prompts_over_budget():
+    tokenizer = get_tokenizer("chars")
+    full_tokens = tokenizer.count(PromptEngine(compact="never", tokenizer=tokenizer).create_enhanced_prompt(_request()))
+
+    within = PromptEngine(compact="over_budget", token_budget=full_tokens, tokenizer=tokenizer).budget_report(_request())
+    assert (within.tokens, within.compacted, within.over_budget) == (full_tokens, False, False)
+
+    engine = PromptEngine(compact="over_budget", token_budget=full_tokens - 1, tokenizer=tokenizer)
+    report = engine.budget_report(_request())
+    assert report.compacted and not report.over_budget
+    assert report.tokens == full_tokens - report.tokens_saved
+    assert report.tokens == engine.count_tokens(engine.create_enhanced_prompt(_request()))
+    assert sum(section.chars for section in report.sections) < len(engine.create_enhanced_prompt(_request()))
+
+    with pytest.raises(ValueError):
+        PromptEngine(compact="sometimes")
+
+def test_compact_prefix_stable_prompts_keep_a_shared_prefix():
+    engine = PromptEngine("prefix_stable", compact="always")
+    prefix = engine.static_prefix(ContentType.TUTORIAL)
+    compact_prompt = engine.create_enhanced_prompt(_request(ContentType.TUTORIAL))
+    other = engine.create_enhanced_prompt(_request(ContentType.TUTORIAL).model_copy(update={"topic": "Kombucha"}))
+    assert compact_prompt.startswith(prefix) and other.startswith(prefix)
+    assert COMPACT_GUIDELINES["tutorial"] in prefix
+    assert len(prefix) < len(PromptEngine("prefix_stable", compact="never").static_prefix(ContentType.TUTORIAL))
+
+if __name__ == "__main__":
+    test_builtin_and_registered_tokenizers()
+    test_tokenizers_must_implement_count()
+    test_prompt_sections_follow_the_headings()
+    test_compact_prompts_drop_only_covered_guidelines()
+    test_budget_report_compacts_prompts_over_budget()
+    test_compact_prefix_stable_prompts_keep_a_shared_prefix()
+    print("✅ Prompt token tests passed")
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.rate_limiter import (
+    AdaptiveRateController,
+    ProviderLimiter,
+    TokenBucket,
+    is_rate_limit_error,
+    parse_retry_after
+)
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate_per_second=20, capacity=1)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    started_at = time.monotonic()
+    asyncio.run(take(5))
+    # First token is free, the remaining four wait 50 ms each
+    assert time.monotonic() - started_at >= 0.18
+
+def test_provider_limiter_caps_parallelism():
+    async def run():
+        limiter = ProviderLimiter("test", max_parallel=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak, limiter.stats()
+
+    peak, stats = asyncio.run(run())
+    assert peak == 2
+    assert stats["in_flight"] == 0
+    assert stats["waiting"] == 0
+
+def test_rate_limit_error_parsing():
+    error = Exception("429 Resource has been exhausted. retry_delay {\n  seconds: 12\n}")
+    assert is_rate_limit_error(error)
+    assert parse_retry_after(error) == 12
+
+    assert parse_retry_after(Exception("Quota exceeded. Please retry in 3.5s")) == 3.5
+    assert not is_rate_limit_error(ValueError("Google Gemini API key is not set."))
+
+def test_adaptive_controller_aimd():
+    bucket = TokenBucket(rate_per_second=1)
+    controller = AdaptiveRateController(bucket, min_rpm=1, max_rpm=60, increase_per_success=2)
+
+    controller.on_rate_limited(Exception("429 retry in 0.5s"))
+    assert controller.current_rpm == 30
+    assert bucket.try_acquire() > 0  # paused
+
+    controller.on_success()
+    assert controller.current_rpm == 32
+
+    for _ in range(50):
+        controller.on_success()
+    assert controller.current_rpm == 60
+
+if __name__ == "__main__":
+    test_token_bucket_spaces_requests()
+    test_provider_limiter_caps_parallelism()
+    test_rate_limit_error_parsing()
+    test_adaptive_controller_aimd()
+    print("✅ Rate limiter tests passed")
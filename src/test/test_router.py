@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from conftest import StubProvider
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.llm_handler import LLMHandler
+from src.utils.providers import (
+    LLMProvider,
+    ProviderCapabilities,
+    get_registered_providers,
+    register_provider,
+    unregister_provider,
+)
+from src.utils.router import ProviderRouter, RoutingPolicy
+
+def static(name: str, latency: float, cost: float, max_context_tokens: int = 8192) -> StubProvider:
+    return StubProvider(name, capabilities=ProviderCapabilities(
+        expected_latency_seconds=latency,
+        cost_per_1k_output_tokens=cost,
+        max_context_tokens=max_context_tokens
+    ))
+
+def make_router(*providers):
+    return ProviderRouter(
+        {provider.name: provider for provider in providers},
+        {provider.name: CircuitBreaker(provider.name) for provider in providers}
+    )
+
+def test_policy_parsing():
+    assert RoutingPolicy.parse("fastest") == RoutingPolicy(objective="fastest")
+    assert RoutingPolicy.parse("Cheapest under 5 s").max_latency_seconds == 5
+    assert RoutingPolicy.parse("cheapest under 2.5seconds").max_latency_seconds == 2.5
+    assert RoutingPolicy.parse("gemini") is None
+
+def test_router_policies():
+    router = make_router(static("cloud", latency=2, cost=0.5), static("local", latency=8, cost=0))
+
+    assert router.rank(RoutingPolicy.parse("fastest"), "prompt") == ["cloud", "local"]
+    assert router.rank(RoutingPolicy.parse("cheapest"), "prompt") == ["local", "cloud"]
+    # local is cheaper but too slow for the budget
+    assert router.rank(RoutingPolicy.parse("cheapest under 5s"), "prompt") == ["cloud", "local"]
+    assert router.rank(RoutingPolicy.parse("cheapest under 10s"), "prompt") == ["local", "cloud"]
+
+def test_router_uses_live_metrics_and_context():
+    router = make_router(static("cloud", latency=2, cost=0.5),
+                         static("local", latency=8, cost=0, max_context_tokens=2048))
+
+    # Observed latencies override the declared ones
+    for _ in range(5):
+        router.breakers["cloud"].record_success(9)
+        router.breakers["local"].record_success(1)
+    assert router.rank(RoutingPolicy.parse("fastest"), "prompt") == ["local", "cloud"]
+
+    # A prompt that doesn't fit local's context window leaves it out
+    assert router.rank(RoutingPolicy.parse("fastest"), "x" * 8000) == ["cloud"]
+
+    router.breakers["local"].trip("down")
+    assert router.rank(RoutingPolicy.parse("fastest"), "prompt") == ["cloud", "local"]
+
+def test_registered_provider_is_used_by_handler():
+    # A local backend plugs in without touching LLMHandler
+    register_provider(StubProvider("echo-test", reply=str.upper, capabilities=ProviderCapabilities(
+        streaming=False, expected_latency_seconds=0.1, local=True)))
+    handler = LLMHandler(probe=False)
+
+    result = handler.generate("hello registry", "echo-test", use_cache=False)
+    assert result.content == "HELLO REGISTRY"
+    assert result.provider == "echo-test"
+
+    stream = handler.stream_content("hello stream", "echo-test", use_cache=False)
+    assert "".join(stream) == "HELLO STREAM"
+
+def test_unregistered_provider_is_not_offered_to_new_handlers():
+    stub = StubProvider("unregister-test")
+    register_provider(stub)
+    assert "unregister-test" in LLMHandler(probe=False).providers
+
+    assert unregister_provider("unregister-test") is stub
+    assert unregister_provider("unregister-test") is None
+    assert "unregister-test" not in get_registered_providers()
+    assert "unregister-test" not in LLMHandler(probe=False).providers
+
+def test_providers_must_implement_model_and_agenerate():
+    class Incomplete(LLMProvider):
+        name = "incomplete-test"
+
+        async def agenerate(self, prompt: str, caps=None) -> str:
+            return prompt
+
+    with pytest.raises(TypeError, match="model"):
+        Incomplete()
+    with pytest.raises(TypeError):
+        LLMProvider()
+
+if __name__ == "__main__":
+    test_policy_parsing()
+    test_router_policies()
+    test_router_uses_live_metrics_and_context()
+    test_registered_provider_is_used_by_handler()
+    test_unregistered_provider_is_not_offered_to_new_handlers()
+    test_providers_must_implement_model_and_agenerate()
+    print("✅ Router tests passed")
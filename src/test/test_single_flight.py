@@ -0,0 +1,73 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.single_flight import SingleFlight
+
+def test_identical_calls_share_one_call():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "content"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", generate) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["content"] * 5
+    assert calls == 1
+    stats = flights.stats()
+    assert stats["calls"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flights = SingleFlight("test")
+
+    async def generate():
+        await asyncio.sleep(0.02)
+        return "content"
+
+    async def run():
+        leader = asyncio.create_task(flights.do("key", generate))
+        follower = asyncio.create_task(flights.do("key", generate))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "content"
+
+def test_late_stream_subscriber_gets_every_chunk():
+    flights = SingleFlight("test")
+    started = 0
+
+    async def source():
+        nonlocal started
+        started += 1
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return "".join([chunk async for chunk in flights.stream("key", source)])
+
+    async def run():
+        return await asyncio.gather(consume(0), consume(0.015))
+
+    assert asyncio.run(run()) == ["abc", "abc"]
+    assert started == 1
+    assert flights.stats()["coalesced"] == 1
+
+if __name__ == "__main__":
+    test_identical_calls_share_one_call()
+    test_cancelled_caller_does_not_cancel_shared_call()
+    test_late_stream_subscriber_gets_every_chunk()
+    print("✅ Single-flight tests passed")
@@ -0,0 +1,130 @@
+import random
+import sys
+import threading
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from config.config import settings
+from src.standins import GeminiStandIn, LatencyProfile, NotionStandIn, OllamaStandIn
+from src.utils.async_runner import iterate_sync, run_sync
+from src.utils.generation_caps import GenerationCaps
+from src.utils.llm_handler import LLMHandler
+from src.utils.metrics import MODEL_LATENCY
+from src.utils.notion_handler import NotionHandler
+from src.utils.providers import GeminiProvider, OllamaProvider, register_provider
+
+def test_latency_profiles_are_reproducible():
+    profile = LatencyProfile(distribution="lognormal", latency_seconds=0.5, jitter_seconds=0.4)
+    first = [profile.sample_latency(random.Random(7)) for _ in range(3)]
+    assert first == [profile.sample_latency(random.Random(7)) for _ in range(3)]
+
+    samples = sorted(profile.sample_latency(random.Random(seed)) for seed in range(201))
+    assert 0.4 < samples[100] < 0.6
+    assert LatencyProfile(distribution="normal", latency_seconds=0.1, jitter_seconds=5).sample_latency(
+        random.Random(1)) >= 0
+
+def test_error_injection_and_rate_limit():
+    with OllamaStandIn(LatencyProfile(error_rate=1.0, error_status=503)) as server:
+        assert httpx.get(f"{server.url}/api/tags").status_code == 503
+        assert server.stats()["tags"]["errors"] == 1
+
+    with OllamaStandIn(LatencyProfile(requests_per_minute=2)) as server:
+        statuses = [httpx.get(f"{server.url}/api/tags") for _ in range(3)]
+        assert [response.status_code for response in statuses] == [200, 200, 429]
+        assert int(statuses[2].headers["Retry-After"]) > 0
+        assert server.stats()["tags"]["rate_limited"] == 1
+
+def test_ollama_standin_reports_loads_and_caps():
+    with OllamaStandIn(models=["standin"], response_words=50, load_seconds=0.6) as server:
+        provider = OllamaProvider(name="ollama-standin-test", base_url=server.url, model="standin")
+        register_provider(provider, replace=True)
+        handler = LLMHandler(probe=False)
+
+        caps = GenerationCaps(max_output_tokens=10, context_tokens=4096, label="test/standin")
+        result = handler.generate("first prompt", "ollama-standin-test", use_cache=False, caps=caps)
+        streamed = "".join(handler.stream_content("second prompt", "ollama-standin-test",
+                                                  use_cache=False, caps=caps))
+
+    assert len(result.content.split()) == 10
+    assert len(streamed.split()) == 10
+    # Only the first request had to load the model
+    assert server.loads == 1
+    load_stats = provider.load_stats.stats()
+    assert load_stats["cold_requests"] == 1 and load_stats["warm_requests"] == 1
+    labels = dict(provider="ollama-standin-test", kind="generation")
+    assert MODEL_LATENCY.count(phase="cold", **labels) == 1
+    assert MODEL_LATENCY.count(phase="warm", **labels) == 1
+
+def test_ollama_standin_reuses_cached_prompt_prefixes():
+    shared = "static instructions " * 20
+    with OllamaStandIn(models=["standin"], response_words=1, cache_slots=1) as server:
+        def evaluated(prompt):
+            return httpx.post(f"{server.url}/api/generate", json={
+                "model": "standin", "prompt": prompt, "stream": False}).json()["prompt_eval_count"]
+
+        assert evaluated(shared + "first request") == len(shared + "first request") // 4
+        assert evaluated(shared + "second request") == len("second request") // 4
+        # One slot: an unrelated prompt evicts the shared prefix
+        assert evaluated("unrelated") == 2
+        assert evaluated(shared + "third") == len(shared + "third") // 4
+
+def test_gemini_standin_through_sdk():
+    setup_threads = []
+
+    class RecordingGemini(GeminiProvider):
+        def setup(self):
+            setup_threads.append(threading.current_thread().name)
+            super().setup()
+
+    endpoint, api_key = settings.gemini_api_endpoint, settings.gemini_api_key
+    with GeminiStandIn(response_words=20) as server:
+        settings.gemini_api_endpoint, settings.gemini_api_key = server.url, "standin"
+        try:
+            provider = RecordingGemini()
+            text = run_sync(provider.agenerate("hello", GenerationCaps(max_output_tokens=5, label="test/gemini")))
+            chunks = list(iterate_sync(provider.astream("hello")))
+        finally:
+            settings.gemini_api_endpoint, settings.gemini_api_key = endpoint, api_key
+
+    assert len(text.split()) == 5
+    # The SDK is imported and configured off the shared event loop
+    assert len(setup_threads) == 1 and setup_threads[0] != "llm-event-loop"
+    assert len(chunks) == 3
+    assert len("".join(chunks).split()) == 20
+    assert server.stats()["stream"]["requests"] == 1
+
+def test_notion_standin_round_trip():
+    base_url, token, database_id = settings.notion_base_url, settings.notion_token, settings.notion_database_id
+    with NotionStandIn() as server:
+        settings.notion_base_url, settings.notion_token, settings.notion_database_id = server.url, "secret", "db"
+        try:
+            notion = NotionHandler()
+            connected = notion.test_connection()
+            structure = notion.get_database_structure()
+            page_id = notion.create_content_page("Stand-in", "Generated body", tags=["test"])
+        finally:
+            settings.notion_base_url, settings.notion_token, settings.notion_database_id = base_url, token, database_id
+
+        query = httpx.post(f"{server.url}/v1/databases/db/query", json={"page_size": 1},
+                           headers={"Authorization": "Bearer secret"}).json()
+
+    assert connected
+    assert structure["Word Count"]["type"] == "number"
+    assert {"Title", "Content", "Type", "Status", "Tags"} <= set(structure)
+    assert query["results"][0]["id"] == page_id
+    assert query["results"][0]["properties"]["Word Count"]["number"] == 2
+    assert server.stats()["create_page"]["requests"] == 1
+
+if __name__ == "__main__":
+    test_latency_profiles_are_reproducible()
+    test_error_injection_and_rate_limit()
+    test_ollama_standin_reports_loads_and_caps()
+    test_ollama_standin_reuses_cached_prompt_prefixes()
+    test_gemini_standin_through_sdk()
+    test_notion_standin_round_trip()
+    print("✅ Stand-in server tests passed")
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import pytest
+
+from src.utils.generation_caps import GenerationCaps, cap_stats
+from src.utils.llm_handler import GenerationStream
+from src.utils.providers import GeminiProvider, OllamaProvider
+from src.utils.rate_limiter import get_provider_limiter
+
+class _NdjsonOllama(OllamaProvider):
+    """Ollama whose /api/generate answers with ``body`` in ``piece_size``-byte pieces."""
+
+    def __init__(self, body: bytes, status: int = 200, piece_size: int = 7):
+        super().__init__(name="ndjson-ollama", base_url="http://ollama.test", model="standin")
+
+        async def pieces():
+            for start in range(0, len(body), piece_size):
+                yield body[start:start + piece_size]
+
+        self._mock_client = httpx.AsyncClient(base_url=self.base_url, transport=httpx.MockTransport(
+            lambda request: httpx.Response(status, content=pieces())))
+
+    def client(self) -> httpx.AsyncClient:
+        return self._mock_client
+
+class _Chunk:
+    """A streamed Gemini response chunk; ``text=None`` behaves like a chunk without text parts."""
+
+    def __init__(self, text, finish_reason="STOP"):
+        self._text = text
+        self.candidates = [SimpleNamespace(finish_reason=SimpleNamespace(name=finish_reason))]
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("The response has no text parts")
+        return self._text
+
+class _ScriptedGemini(GeminiProvider):
+    """Streams one script of chunks per call; exceptions in a script are raised when reached."""
+    name = "scripted-gemini"
+
+    def __init__(self, *scripts):
+        super().__init__()
+        self.scripts = list(scripts)
+        self.calls = 0
+
+    async def _call(self, prompt, caps=None, **kwargs):
+        chunks = self.scripts[self.calls]
+        self.calls += 1
+
+        async def stream():
+            for chunk in chunks:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        return stream()
+
+def _ndjson(*records) -> bytes:
+    # Blank lines between records, as keep-alive newlines would leave them
+    return "\n\n".join(json.dumps(record) for record in records).encode() + b"\n"
+
+def _collect(stream) -> list:
+    async def collect():
+        return [chunk async for chunk in stream]
+    return asyncio.run(collect())
+
+def _truncated(provider: str, label: str) -> int:
+    return sum(entry["truncated"] for entry in cap_stats.stats()
+               if entry["provider"] == provider and entry["label"] == label)
+
+def test_ollama_ndjson_chunks_are_parsed_across_reads():
+    provider = _NdjsonOllama(_ndjson(
+        {"response": "Hel", "done": False},
+        {"response": "", "done": False},
+        {"response": "lo", "done": False},
+        {"response": "", "done": True, "done_reason": "length", "total_duration": 2_000_000},
+        {"response": "after done", "done": False}
+    ))
+    caps = GenerationCaps(max_output_tokens=2, label="test/ndjson")
+
+    assert _collect(provider.astream("prompt", caps)) == ["Hel", "lo"]
+    assert _truncated("ndjson-ollama", "test/ndjson") == 1
+    assert provider.load_stats.stats()["warm_requests"] == 1
+
+def test_ollama_stream_errors_raise():
+    broken = _NdjsonOllama(_ndjson({"response": "partial", "done": False}, {"error": "model 'x' not found"}))
+    with pytest.raises(Exception, match="model 'x' not found"):
+        _collect(broken.astream("prompt"))
+
+    missing = _NdjsonOllama(b'{"error": "not found"}', status=404)
+    with pytest.raises(Exception, match="Ollama API error: 404"):
+        _collect(missing.astream("prompt"))
+
+def test_gemini_stream_adapter_skips_chunks_without_text():
+    provider = _ScriptedGemini([_Chunk("Hello"), _Chunk(None), _Chunk(""), _Chunk(" world", "MAX_TOKENS")])
+    caps = GenerationCaps(max_output_tokens=2, label="test/gemini-stream")
+
+    assert _collect(provider.astream("prompt", caps)) == ["Hello", " world"]
+    # The finish reason of the final chunk decides whether the cap was hit
+    assert _truncated("scripted-gemini", "test/gemini-stream") == 1
+
+    assert _collect(_ScriptedGemini([_Chunk("Done")]).astream("prompt", caps)) == ["Done"]
+    assert _truncated("scripted-gemini", "test/gemini-stream") == 1
+
+def test_gemini_stream_rate_limits_reach_the_controller():
+    rate_limited = RuntimeError("429 Resource has been exhausted, retry in 0.01s")
+    limiter = get_provider_limiter("rate-limited-gemini")
+    limiter.make_adaptive(min_rpm=1, max_rpm=600)
+
+    # Before the first chunk the stream backs off and starts again
+    provider = _ScriptedGemini([rate_limited], [_Chunk("Hello"), _Chunk(" world")])
+    provider.name = "rate-limited-gemini"
+    assert _collect(provider.astream("prompt")) == ["Hello", " world"]
+    assert provider.calls == 2
+    assert limiter.controller.rate_limited == 1
+    assert limiter.controller.current_rpm < 600
+
+    # After it the text can't be taken back, so the error is reported and raised
+    provider = _ScriptedGemini([_Chunk("Hello"), rate_limited], [_Chunk("unused")])
+    provider.name = "rate-limited-gemini"
+    with pytest.raises(RuntimeError, match="429"):
+        _collect(provider.astream("prompt"))
+    assert provider.calls == 1
+    assert limiter.controller.rate_limited == 2
+
+def test_generation_stream_measures_first_token_and_total_time():
+    def chunks(delays):
+        for index, delay in enumerate(delays):
+            time.sleep(delay)
+            yield f"chunk{index} "
+
+    stream = GenerationStream(chunks([0.1, 0.2]), "standin")
+    assert stream.text == "" and stream.first_token_seconds is None
+    assert list(stream) == ["chunk0 ", "chunk1 "]
+    assert 0.1 <= stream.first_token_seconds < 0.2
+    assert stream.total_seconds >= 0.3
+    assert stream.text == "chunk0 chunk1 "
+
+    # Closing early stops the clock and the underlying stream
+    source = chunks([0.0, 1.0])
+    early = GenerationStream(source, "standin")
+    iterator = iter(early)
+    assert next(iterator) == "chunk0 "
+    iterator.close()
+    assert early.total_seconds < 0.5
+    assert source.gi_frame is None
+
+if __name__ == "__main__":
+    test_ollama_ndjson_chunks_are_parsed_across_reads()
+    test_ollama_stream_errors_raise()
+    test_gemini_stream_adapter_skips_chunks_without_text()
+    test_gemini_stream_rate_limits_reach_the_controller()
+    test_generation_stream_measures_first_token_and_total_time()
+    print("✅ Streaming tests passed")
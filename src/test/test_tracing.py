@@ -0,0 +1,118 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from config.config import settings
+from src.core.content_agent import ContentAgent
+from src.standins import NotionStandIn, OllamaStandIn
+from src.utils import tracing
+from src.utils.async_runner import iterate_sync, run_sync
+from src.utils.circuit_breaker import get_all_circuit_breakers
+from src.utils.tracing import JsonlSpanSink, SpanSink, Tracer
+
+class _ListSink(SpanSink):
+    def __init__(self):
+        self.spans = []
+
+    def on_end(self, span):
+        self.spans.append(span)
+
+def _install(*sinks) -> Tracer:
+    return tracing.set_tracer(Tracer(list(sinks)))
+
+def test_nested_spans_share_request_and_write_jsonl(tmp_path):
+    sink = JsonlSpanSink(str(tmp_path / "traces.jsonl"))
+    previous = _install(sink)
+    try:
+        with tracing.span("outer", request_id="req-1") as outer:
+            with tracing.span("inner", provider="stub", unused=None):
+                pass
+            with pytest.raises(ValueError):
+                with tracing.span("broken"):
+                    raise ValueError("boom")
+        assert tracing.current_span() is None
+    finally:
+        tracing.set_tracer(previous)
+        sink.close()
+
+    records = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert [record["name"] for record in records] == ["inner", "broken", "outer"]
+    assert {record["request_id"] for record in records} == {"req-1"}
+    assert records[0]["parent_id"] == outer.span_id
+    assert records[0]["attributes"] == {"provider": "stub"}
+    assert records[1]["status"] == "error" and records[1]["error"] == "boom"
+    assert records[2]["duration_ms"] >= 0
+
+def test_jsonl_sink_rolls_over_and_keeps_the_newest_files(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    sink = JsonlSpanSink(str(path), max_bytes=1, backups=2)
+    previous = _install(sink)
+    try:
+        for name in ("first", "second", "third", "fourth"):
+            with tracing.span(name):
+                pass
+    finally:
+        tracing.set_tracer(previous)
+        sink.close()
+
+    # Every span fills a file, which is rolled over straight away
+    assert path.read_text() == ""
+    assert json.loads((tmp_path / "traces.jsonl.1").read_text())["name"] == "fourth"
+    assert json.loads((tmp_path / "traces.jsonl.2").read_text())["name"] == "third"
+    assert not (tmp_path / "traces.jsonl.3").exists()
+
+def test_context_reaches_the_shared_loop():
+    async def request_id():
+        await asyncio.sleep(0)
+        return tracing.current_request_id()
+
+    async def ids():
+        yield tracing.current_request_id()
+
+    with tracing.span("caller", request_id="req-2"):
+        assert run_sync(request_id()) == "req-2"
+        stream = iterate_sync(ids())
+    # The stream keeps the context it was created in
+    assert list(stream) == ["req-2"]
+
+def test_pipeline_spans_cover_every_stage():
+    # Probes in earlier tests may have opened the shared breakers
+    for breaker in get_all_circuit_breakers().values():
+        breaker.reset()
+    sink = _ListSink()
+    previous = _install(sink)
+    saved = (settings.ollama_base_url, settings.notion_base_url, settings.notion_token, settings.notion_database_id)
+    with OllamaStandIn(models=[settings.ollama_model], response_words=40) as ollama, NotionStandIn() as notion:
+        settings.ollama_base_url, settings.notion_base_url = ollama.url, notion.url
+        settings.notion_token, settings.notion_database_id = "secret", "db"
+        try:
+            result = ContentAgent().generate_and_save_content("Tracing", ai_provider="ollama", use_cache=False)
+        finally:
+            settings.ollama_base_url, settings.notion_base_url, settings.notion_token, settings.notion_database_id = saved
+            tracing.set_tracer(previous)
+
+    spans = {span.name: span for span in sink.spans if span.request_id == result["request_id"]}
+    assert {"content.pipeline", "content.generate", "prompt.render", "llm.generate", "llm.call",
+            "content.process", "content.save", "notion.create_page"} <= set(spans)
+    assert spans["llm.generate"].parent is spans["content.generate"]
+    assert spans["llm.call"].attributes["provider"] == "ollama"
+    assert spans["llm.call"].attributes["output_chars"] > 0
+    assert spans["prompt.render"].attributes["prompt_chars"] > 0
+    assert spans["notion.create_page"].attributes["page_id"] == result["notion_page_id"]
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_nested_spans_share_request_and_write_jsonl(Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_jsonl_sink_rolls_over_and_keeps_the_newest_files(Path(directory))
+    test_context_reaches_the_shared_loop()
+    test_pipeline_spans_cover_every_stage()
+    print("✅ Tracing tests passed")
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from conftest import StubProvider, handler_for
+from config.config import settings
+from src.utils.generation_caps import GenerationCaps, cap_stats
+from src.utils.providers import ProviderCapabilities
+from src.utils.word_budget import WordBudgetMonitor
+
+def test_monitor_cuts_at_paragraph_break():
+    monitor = WordBudgetMonitor(limit=4, grace=1.0)
+    text = ""
+    for chunk in ["one two three\n\nfour five", " six seven\n", "\neight nine\n\n"]:
+        text += monitor.feed(chunk)
+
+    assert monitor.stopped
+    assert text == "one two three\n\nfour five six seven\n\n"
+    assert monitor.feed("more") == ""
+
+def test_monitor_hard_stop_without_paragraph_break():
+    monitor = WordBudgetMonitor(limit=4, grace=0.5)
+    text = monitor.feed("one two three four five six seven eight nine ten")
+
+    assert monitor.stopped
+    assert text == "one two three four five six "
+
+def test_stream_stops_and_cancels_upstream():
+    # Three-word paragraphs, with the breaks split across chunks on purpose
+    rambling = StubProvider("rambling-test", chunks=("one two", " three\n", "\n"),
+                            capabilities=ProviderCapabilities(streaming=True, local=True))
+    handler = handler_for(rambling)
+    multiple = settings.llm_word_budget_multiple
+    settings.llm_word_budget_multiple = 2
+    try:
+        caps = GenerationCaps(max_words=10, label="test/short")
+        text = "".join(handler.stream_content("ramble", "rambling-test", use_cache=False, caps=caps))
+    finally:
+        settings.llm_word_budget_multiple = multiple
+
+    assert text.endswith("\n\n")
+    assert 20 < len(text.split()) <= 24
+    # Cancelling the upstream request happens on the event loop thread
+    assert rambling.closed.wait(1)
+    row = next(row for row in cap_stats.stats() if row["provider"] == "rambling-test")
+    assert row["budget_stops"] == 1
+
+if __name__ == "__main__":
+    test_monitor_cuts_at_paragraph_break()
+    test_monitor_hard_stop_without_paragraph_break()
+    test_stream_stops_and_cancels_upstream()
+    print("✅ Word budget tests passed")
@@ -0,0 +1,130 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Iterator, Optional, TypeVar
+from loguru import logger
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide background event loop, starting it on first use.
+
+    Every Streamlit session runs its script in its own thread, so the async
+    provider clients live on one long-lived loop that all sessions share.
+    """
+    global _loop, _loop_thread
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_loop.run_forever,
+                name="llm-event-loop",
+                daemon=True
+            )
+            _loop_thread.start()
+            logger.info("Started shared LLM event loop.")
+        return _loop
+
+
+def _on_shared_loop_thread() -> bool:
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def _submit(coro: Coroutine[Any, Any, T],
+            context: Optional[contextvars.Context] = None) -> "concurrent.futures.Future[T]":
+    """Schedule a coroutine on the shared loop inside the caller's context.
+
+    The task copies the context that is current when it is scheduled, so
+    context variables such as the active tracing span flow from the caller
+    into the coroutine.
+    """
+    context = context or contextvars.copy_context()
+    return context.run(asyncio.run_coroutine_threadsafe, coro, get_shared_loop())
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared loop and block until it finishes."""
+    if _on_shared_loop_thread():
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the shared event loop thread.")
+
+    future = _submit(coro)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def on_shared_loop(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Make a coroutine method always execute on the shared loop.
+
+    Callers awaiting from their own event loop are transparently hopped onto
+    the shared loop, so loop-bound resources (HTTP clients, gRPC channels)
+    are never touched from a foreign loop.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _on_shared_loop_thread():
+            return await func(*args, **kwargs)
+        future = _submit(func(*args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    return wrapper
+
+
+_STREAM_DONE = object()
+
+
+class _StreamError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iterate_sync(aiterator: AsyncIterator[T]) -> Iterator[T]:
+    """Consume an async iterator on the shared loop from a blocking caller.
+
+    Items are handed over through a queue as soon as they are produced.
+    Closing the returned generator early cancels the producer, which in turn
+    closes the upstream request. The producer runs in the caller's context
+    as of this call, even if iteration starts later.
+    """
+    return _iterate_sync(aiterator, contextvars.copy_context())
+
+
+def _iterate_sync(aiterator: AsyncIterator[T], context: contextvars.Context) -> Iterator[T]:
+    items: "queue.Queue[Any]" = queue.Queue()
+
+    async def _pump():
+        try:
+            async for item in aiterator:
+                items.put(item)
+            items.put(_STREAM_DONE)
+        except BaseException as e:
+            items.put(_StreamError(e))
+            raise
+        finally:
+            aclose = getattr(aiterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    future = _submit(_pump(), context)
+    try:
+        while True:
+            item = items.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, _StreamError):
+                raise item.error
+            yield item
+    finally:
+        future.cancel()
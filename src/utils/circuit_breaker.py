@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Optional
+from loguru import logger
+from config.config import settings
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+def percentile(values, pct: float) -> Optional[float]:
+    """Return the pct-th percentile (0-100) of values, or None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+class CircuitBreaker:
+    """Per-provider circuit breaker over a rolling window of call outcomes.
+
+    CLOSED lets traffic through and opens once the error rate over the last
+    ``window_size`` calls (within ``window_seconds``) reaches the threshold.
+    OPEN rejects calls for ``open_seconds``, then HALF_OPEN admits a single
+    trial call whose outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self,
+                 name: str,
+                 window_size: int = 20,
+                 window_seconds: float = 300,
+                 min_requests: int = 5,
+                 error_rate_threshold: float = 0.5,
+                 open_seconds: float = 30):
+        self.name = name
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)  # (timestamp, ok, latency)
+        self._state = CircuitState.CLOSED
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+        self._rejected = 0
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+            logger.info(f"Circuit for {self.name} is half-open, allowing a trial request.")
+        return self._state
+
+    def _open(self, now: float, reason: str):
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+        self._trial_in_flight = False
+        logger.warning(f"Circuit for {self.name} opened: {reason}")
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be dispatched to the provider."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def release(self):
+        """Give back an admitted call that was cancelled before it finished."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, True, latency))
+            if self._current_state(now) == CircuitState.HALF_OPEN:
+                self._state = CircuitState.CLOSED
+                self._trial_in_flight = False
+                self._outcomes.clear()
+                self._outcomes.append((now, True, latency))
+                logger.info(f"Circuit for {self.name} closed after a successful trial.")
+
+    def record_failure(self, latency: Optional[float] = None, error: Optional[str] = None):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, False, latency))
+            self._last_error = error
+            state = self._current_state(now)
+
+            if state == CircuitState.HALF_OPEN:
+                self._open(now, "trial request failed")
+                return
+            if state == CircuitState.CLOSED:
+                self._prune(now)
+                total = len(self._outcomes)
+                failures = sum(1 for _, ok, _ in self._outcomes if not ok)
+                if total >= self.min_requests and failures / total >= self.error_rate_threshold:
+                    self._open(now, f"{failures}/{total} recent requests failed")
+
+    def trip(self, reason: str):
+        """Open the circuit immediately, e.g. after a failed health probe."""
+        with self._lock:
+            self._last_error = reason
+            self._open(time.monotonic(), reason)
+
+    def reset(self):
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._opened_at = None
+            self._trial_in_flight = False
+            self._outcomes.clear()
+            self._rejected = 0
+
+    def snapshot(self) -> Dict:
+        """Return the breaker state and rolling window metrics."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            self._prune(now)
+            outcomes = list(self._outcomes)
+            retry_in = None
+            if state == CircuitState.OPEN:
+                retry_in = max(0.0, self.open_seconds - (now - self._opened_at))
+
+        latencies = [latency for _, _, latency in outcomes if latency is not None]
+        failures = sum(1 for _, ok, _ in outcomes if not ok)
+        return {
+            "provider": self.name,
+            "state": state.value,
+            "requests": len(outcomes),
+            "failures": failures,
+            "error_rate": failures / len(outcomes) if outcomes else 0.0,
+            "p50_latency": percentile(latencies, 50),
+            "p95_latency": percentile(latencies, 95),
+            "rejected": self._rejected,
+            "retry_in_seconds": retry_in,
+            "last_error": self._last_error
+        }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider, creating it on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                window_size=settings.circuit_breaker_window_size,
+                min_requests=settings.circuit_breaker_min_requests,
+                error_rate_threshold=settings.circuit_breaker_error_threshold,
+                open_seconds=settings.circuit_breaker_open_seconds
+            )
+        return _breakers[name]
+
+def get_all_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    with _breakers_lock:
+        return dict(_breakers)
@@ -0,0 +1,98 @@
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+
+# English prose averages about 1.3 tokens per word with current tokenizers
+TOKENS_PER_WORD = 1.35
+# Room for a title, headings and markdown on top of the body text
+FORMATTING_TOKENS = 64
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four characters per token for English text."""
+    return max(1, len(text) // 4)
+
+
+class GenerationCaps(BaseModel):
+    """Per-request output and context caps handed to providers.
+
+    ``max_words`` is the word count the prompt asks for at most; streams use
+    it for their word budget. It and ``label`` (e.g. "blog/short", which
+    groups statistics) are not part of ``cache_tag`` because they don't
+    change what the provider is asked to do.
+    """
+    max_output_tokens: Optional[int] = None
+    context_tokens: Optional[int] = None
+    max_words: Optional[int] = None
+    label: str = ""
+
+    @classmethod
+    def for_word_count(cls,
+                       max_words: int,
+                       prompt: str,
+                       headroom: float = 1.25,
+                       min_context_tokens: int = 4096,
+                       label: str = "") -> "GenerationCaps":
+        """Caps for a response of at most ``max_words`` words.
+
+        The context size is the smallest power-of-two multiple of
+        ``min_context_tokens`` that fits the prompt and the output, so only a
+        few distinct sizes are ever requested; Ollama reloads the model
+        whenever the context size changes.
+        """
+        max_output_tokens = math.ceil(max_words * TOKENS_PER_WORD * headroom) + FORMATTING_TOKENS
+        needed = estimate_tokens(prompt) + max_output_tokens
+        context_tokens = min_context_tokens
+        while context_tokens < needed:
+            context_tokens *= 2
+        return cls(max_output_tokens=max_output_tokens, context_tokens=context_tokens,
+                   max_words=max_words, label=label)
+
+    def cache_tag(self) -> str:
+        """Stable description of the caps for cache and coalescing keys."""
+        return f"max_output_tokens={self.max_output_tokens};context_tokens={self.context_tokens}"
+
+
+class CapStats:
+    """How often generations were cut short, per provider and label.
+
+    ``truncated`` counts generations that hit the output token cap and
+    ``budget_stops`` streams stopped early by their word budget.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], List[int]] = {}
+
+    def _add(self, provider: str, label: str, truncated: int, budget_stops: int):
+        with self._lock:
+            counts = self._counts.setdefault((provider, label), [0, 0, 0])
+            counts[0] += 1
+            counts[1] += truncated
+            counts[2] += budget_stops
+
+    def record(self, provider: str, label: str, truncated: bool):
+        self._add(provider, label, int(truncated), 0)
+
+    def record_budget_stop(self, provider: str, label: str):
+        # The stream was cancelled, so the provider never recorded it
+        self._add(provider, label, 0, 1)
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            items = sorted((key, list(counts)) for key, counts in self._counts.items())
+        return [
+            {
+                "provider": provider,
+                "label": label,
+                "requests": requests,
+                "truncated": truncated,
+                "truncation_rate": truncated / requests,
+                "budget_stops": budget_stops,
+                "budget_stop_rate": budget_stops / requests
+            }
+            for (provider, label), (requests, truncated, budget_stops) in items
+        ]
+
+# Shared by every provider in the process
+cap_stats = CapStats()
@@ -0,0 +1,61 @@
+import threading
+from typing import Dict, Tuple
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from loguru import logger
+from config.config import settings
+
+# One pool per Ollama base URL, shared by every LLMHandler and Streamlit
+# session in the process so connections stay warm between generations.
+_sessions: Dict[Tuple[str, bool], requests.Session] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_pool_lock = threading.Lock()
+
+def get_ollama_session(base_url: str, retries: bool = True) -> requests.Session:
+    """Return the shared keep-alive requests session for an Ollama host.
+
+    Only connection failures are retried, so a request Ollama has already
+    received is never sent twice and a read timeout is never multiplied.
+    Pass ``retries=False`` for calls that must give up within their own
+    timeout, such as health probes.
+    """
+    with _pool_lock:
+        session = _sessions.get((base_url, retries))
+        if session is None:
+            attempts = settings.ollama_http_retries if retries else 0
+            retry = Retry(total=attempts, connect=attempts, read=0, status=0, other=0, backoff_factor=0.3)
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.ollama_pool_size,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[(base_url, retries)] = session
+            logger.info(f"Created Ollama connection pool for {base_url} (size {settings.ollama_pool_size}).")
+        return session
+
+def get_ollama_async_client(base_url: str) -> httpx.AsyncClient:
+    """Return the shared keep-alive async client for an Ollama host.
+
+    The client must only be used from the shared event loop.
+    """
+    with _pool_lock:
+        client = _async_clients.get(base_url)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.ollama_pool_size,
+                max_keepalive_connections=settings.ollama_pool_size
+            )
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=60,
+                limits=limits,
+                # httpx retries connection failures only, never a sent request
+                transport=httpx.AsyncHTTPTransport(retries=settings.ollama_http_retries, limits=limits)
+            )
+            _async_clients[base_url] = client
+        return client
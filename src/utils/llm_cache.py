@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from config.config import settings
+
+class LLMCache:
+    """Disk-backed LLM response cache with TTL and LRU eviction.
+
+    Entries are keyed on a hash of provider, model name, the exact prompt and
+    any generation options that change the output (such as length caps).
+    The cache is safe to share between threads; one instance serves every
+    Streamlit session in the process. Async callers use ``aget``/``aset``,
+    which run the sqlite work in a worker thread.
+
+    Hits only read: their last-access times are buffered and written in one
+    transaction with the next ``set``, or once ``flush_every`` hits are
+    pending.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 604800, max_entries: int = 1000, flush_every: int = 64):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, options: str = "") -> str:
+        """Build the cache key for a provider/model/prompt/options combination."""
+        digest = hashlib.sha256()
+        parts = (provider.lower(), model, prompt, options) if options else (provider.lower(), model, prompt)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, provider: str, model: str, prompt: str, options: str = "") -> Optional[str]:
+        """Return a cached response, or None on a miss or expired entry."""
+        key = self.make_key(provider, model, prompt, options)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._pending_access.pop(key, None)
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.flush_every:
+                self._flush_access()
+                self._conn.commit()
+            self.hits += 1
+
+        logger.info(f"LLM cache hit for {provider}/{model}.")
+        return response
+
+    def set(self, provider: str, model: str, prompt: str, response: str, options: str = ""):
+        """Store a response and evict least recently used entries over the limit."""
+        key = self.make_key(provider, model, prompt, options)
+        now = time.time()
+
+        with self._lock:
+            # Pending hits count towards recency before anything is evicted
+            self._flush_access()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider.lower(), model, response, now, now)
+            )
+            if self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    async def aget(self, provider: str, model: str, prompt: str, options: str = "") -> Optional[str]:
+        """``get`` from a coroutine, without blocking the event loop."""
+        return await asyncio.to_thread(self.get, provider, model, prompt, options)
+
+    async def aset(self, provider: str, model: str, prompt: str, response: str, options: str = ""):
+        """``set`` from a coroutine, without blocking the event loop."""
+        await asyncio.to_thread(self.set, provider, model, prompt, response, options)
+
+    def flush(self):
+        """Write buffered last-access times to disk."""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def _flush_access(self):
+        """Write buffered last-access times; the caller holds the lock and commits."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def clear(self):
+        """Remove all cached responses and reset the counters."""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _cache
+
+    if not settings.llm_cache_enabled:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMCache(
+                    settings.llm_cache_path,
+                    ttl_seconds=settings.llm_cache_ttl_seconds,
+                    max_entries=settings.llm_cache_max_entries
+                )
+                logger.info(f"LLM response cache opened at {settings.llm_cache_path}.")
+            except Exception as e:
+                logger.error(f"Failed to open LLM response cache: {e}")
+                return None
+        return _cache
+
+def peek_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide response cache if it has been opened, without opening it."""
+    with _cache_lock:
+        return _cache
@@ -1,92 +1,692 @@
-import google.generativeai as genai
-import requests
-import json
-from typing import Optional, Dict, Any
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Dict, Any, Tuple
 from loguru import logger
+from pydantic import BaseModel
 from config.config import settings
+from src.utils.async_runner import iterate_sync, on_shared_loop, run_sync
+from src.utils.circuit_breaker import CircuitState, get_circuit_breaker
+from src.utils.generation_caps import GenerationCaps, cap_stats
+from src.utils.llm_cache import LLMCache, get_llm_cache
+from src.utils.metrics import PROVIDER_FALLBACKS
+from src.utils.providers import LLMProvider, get_registered_providers
+from src.utils.rate_limiter import get_provider_limiter
+from src.utils.router import DEFAULT_OUTPUT_TOKENS, ProviderRouter, RoutingPolicy
+from src.utils.single_flight import generation_flights
+from src.utils import tracing
+from src.utils.word_budget import WordBudgetMonitor
+
+
+class GenerationResult(BaseModel):
+    """Generated text together with the provider that produced it."""
+    content: str
+    provider: str
+    model: str
+    cached: bool = False
+    latency_seconds: float = 0.0
+
+
+class BatchItem(BaseModel):
+    """Outcome of one prompt in a batch, in input order."""
+    index: int
+    content: Optional[str] = None
+    provider: Optional[str] = None
+    cached: bool = False
+    latency_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.content is not None
+
+
+class GenerationStream:
+    """Blocking iterator over streamed text chunks with latency measurements.
+
+    ``first_token_seconds`` is the time-to-first-token as seen by the caller
+    and ``total_seconds`` the time until the stream was exhausted or closed.
+    """
+
+    def __init__(self, chunks: Iterator[str], provider: str):
+        self._chunks = chunks
+        self.provider = provider
+        # The request the stream belongs to, for tracing the stages that follow it
+        self.request_id = tracing.current_request_id()
+        self.chunks: list = []
+        self.started_at: Optional[float] = None
+        self.first_token_seconds: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def __iter__(self) -> Iterator[str]:
+        self.started_at = time.perf_counter()
+        try:
+            for chunk in self._chunks:
+                if self.first_token_seconds is None:
+                    self.first_token_seconds = time.perf_counter() - self.started_at
+                self.chunks.append(chunk)
+                yield chunk
+        finally:
+            self._chunks.close()
+            self.total_seconds = time.perf_counter() - self.started_at
+            first_token = f"{self.first_token_seconds:.2f}s" if self.first_token_seconds is not None else "n/a"
+            logger.info(
+                f"Streamed {len(self.text)} chars with {self.provider}: "
+                f"first token {first_token}, total {self.total_seconds:.2f}s"
+            )
+
 
 class LLMHandler:
-    def __init__(self):
-        self.setup_gemini()
-        self.setup_ollama()
-        
-    def setup_gemini(self):
-        """Setup Google Gemini API client."""
+    """LLM provider access with native asyncio generation paths.
+
+    Backends come from the provider registry (see ``src.utils.providers``),
+    so new ones plug in by registering themselves. The ``agenerate_*``
+    coroutines are the real implementations; the ``generate_*`` methods are
+    blocking wrappers kept for ``ContentAgent`` and the Streamlit pages.
+    """
+
+    def __init__(self, probe: bool = True):
+        self.providers = get_registered_providers()
+        self.provider_probes: List[threading.Thread] = []
+        self.cache = get_llm_cache()
+        self.breakers = {provider: get_circuit_breaker(provider) for provider in self.providers}
+        self.limiters = {provider: get_provider_limiter(provider) for provider in self.providers}
+        self.router = ProviderRouter(self.providers, self.breakers)
+        # Provider clients are created on first use; only the health probes
+        # start now, in the background, so construction never blocks.
+        if probe:
+            self.start_provider_probes()
+
+    def start_provider_probes(self) -> List[threading.Thread]:
+        """Probe every provider that has a health check in background threads."""
+        for name, provider in self.providers.items():
+            if type(provider).probe is LLMProvider.probe:
+                continue
+            thread = threading.Thread(target=self.probe_provider, args=(name,), name=f"{name}-probe", daemon=True)
+            thread.start()
+            self.provider_probes.append(thread)
+        return self.provider_probes
+
+    def wait_for_probes(self, timeout: Optional[float] = None):
+        """Block until the background provider probes have finished."""
+        for thread in self.provider_probes:
+            thread.join(timeout)
+
+    def probe_provider(self, name: str):
+        """Probe a provider, update its circuit breaker and warm it up when healthy."""
+        breaker = self.breakers[name]
         try:
-            if settings.gemini_api_key:
-                genai.configure(api_key=settings.gemini_api_key)
-                self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
-                logger.info("Google Gemini model initialized successfully.")
-            else:
-                logger.warning("Google Gemini API key is not set.")
+            healthy = self.providers[name].probe()
         except Exception as e:
-            logger.error(f"Failed to initialize Google Gemini client: {e}")
-    
-    def setup_ollama(self):
-        """Setup Ollama API client."""
+            breaker.trip(f"health probe failed: {e}")
+            logger.error(f"{name} not available: {e}")
+            return
+        if not healthy:
+            return
+
+        if breaker.state == CircuitState.OPEN:
+            # A successful probe is fresh evidence; don't wait out the open period
+            breaker.reset()
+        logger.info(f"{name} connection established.")
+
+        if settings.llm_warmup_on_start:
+            try:
+                self.providers[name].warm_up()
+            except Exception as e:
+                # A cold model is slow, not broken; leave the breaker alone
+                logger.warning(f"Warming up {name} failed: {e}")
+
+    def provider_available(self, name: str) -> bool:
+        """Whether a provider may currently receive traffic, per its circuit breaker."""
+        return self.breakers[name].state != CircuitState.OPEN
+
+    @property
+    def ollama_available(self) -> bool:
+        return self.provider_available("ollama")
+
+    @on_shared_loop
+    async def agenerate_with(self, provider: str, prompt: str, caps: Optional[GenerationCaps] = None) -> Optional[str]:
+        """Generate text with one provider, bypassing cache, breaker and limits."""
         try:
-            response = requests.get(f"{settings.ollama_base_url}/api/tags")
-            if response.status_code == 200:
-                self.ollama_available = True
-                logger.info("Ollama connection established.")
-            else:
-                self.ollama_available = False
-                logger.warning("Ollama not available.")
+            return await self.providers[provider].agenerate(prompt, caps)
         except Exception as e:
-            self.ollama_available = False
-            logger.error(f"Failed to initialize Ollama client: {e}")
-    
-    def generate_with_gemini(self, prompt: str) -> Optional[str]:
-        """Generate text using Google Gemini."""
-        
+            logger.error(f"Error generating text with {provider}: {e}")
+            return None
+
+    async def agenerate_with_gemini(self, prompt: str) -> Optional[str]:
+        """Generate text using Google Gemini without blocking the event loop."""
+        return await self.agenerate_with("gemini", prompt)
+
+    async def agenerate_with_ollama(self, prompt: str) -> Optional[str]:
+        """Generate text using Ollama without blocking the event loop."""
+        return await self.agenerate_with("ollama", prompt)
+
+    def _model_name(self, provider: str) -> str:
+        """Return the model name a provider generates with."""
+        return self.providers[provider].model
+
+    def _plan(self,
+              provider: str,
+              prompt: str,
+              caps: Optional[GenerationCaps] = None,
+              streaming: bool = False) -> Tuple[str, List[str]]:
+        """Turn a provider argument into a mode and the providers to try, in order.
+
+        ``provider`` is a registered provider name, "race", "auto" (the
+        configured ``llm_routing_policy``), a routing policy such as
+        "fastest" or "cheapest under 5s", or anything else for every
+        provider in registration order.
+        """
+        if provider in self.providers:
+            return "single", [provider]
+        if provider == "race":
+            return "race", list(self.providers)
+
+        policy = RoutingPolicy.parse(settings.llm_routing_policy if provider == "auto" else provider)
+        if policy is None:
+            return "fallback", list(self.providers)
+        output_tokens = caps.max_output_tokens if caps and caps.max_output_tokens else DEFAULT_OUTPUT_TOKENS
+        order = self.router.rank(policy, prompt, output_tokens=output_tokens, streaming=streaming)
+        logger.info(f"Routing policy '{policy}' chose {' > '.join(order) or 'no provider'}.")
+        return "fallback", order
+
+    async def _agenerate_cached(self,
+                                provider: str,
+                                prompt: str,
+                                use_cache: bool,
+                                caps: Optional[GenerationCaps] = None) -> Optional[GenerationResult]:
+        """Serve a provider call from the response cache when possible.
+
+        With ``use_cache=False`` the cached entry is ignored but the fresh
+        response still replaces it. Responses generated under different caps
+        are cached separately.
+        """
+        model = self._model_name(provider)
+        options = caps.cache_tag() if caps else ""
+        if use_cache and self.cache:
+            cached = await self.cache.aget(provider, model, prompt, options)
+            if cached is not None:
+                return GenerationResult(content=cached, provider=provider, model=model, cached=True)
+
+        # Identical calls already in flight, from any session, share one provider call
+        key = LLMCache.make_key(provider, model, prompt, options)
+        return await generation_flights.do(key, lambda: self._agenerate_uncached(provider, model, prompt, caps))
+
+    async def _agenerate_uncached(self,
+                                  provider: str,
+                                  model: str,
+                                  prompt: str,
+                                  caps: Optional[GenerationCaps] = None) -> Optional[GenerationResult]:
+        """Call a provider through its circuit breaker and limiter, then fill the cache."""
+        if not self.providers[provider].is_configured():
+            logger.warning(f"Skipping {provider}: not configured.")
+            return None
+
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            logger.warning(f"Skipping {provider}: circuit is open.")
+            return None
+
+        with tracing.span("llm.call", provider=provider, model=model, prompt_chars=len(prompt)) as span:
+            queued_at = time.perf_counter()
+            try:
+                async with self.limiters[provider]:
+                    started_at = time.perf_counter()
+                    span.set(queue_ms=round((started_at - queued_at) * 1000, 3))
+                    content = await self.agenerate_with(provider, prompt, caps)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+
+            latency = time.perf_counter() - started_at
+            if content is None:
+                span.fail("generation returned no content")
+                breaker.record_failure(latency, "generation returned no content")
+                return None
+            span.set(output_chars=len(content))
+        breaker.record_success(latency)
+        if self.cache:
+            await self.cache.aset(provider, model, prompt, content, caps.cache_tag() if caps else "")
+        return GenerationResult(
+            content=content,
+            provider=provider,
+            model=model,
+            latency_seconds=time.perf_counter() - started_at
+        )
+
+    async def _arace(self,
+                     prompt: str,
+                     use_cache: bool,
+                     candidates: List[str],
+                     caps: Optional[GenerationCaps] = None) -> Optional[GenerationResult]:
+        """Run the first two candidates concurrently and return the first successful result.
+
+        The secondary provider starts after ``llm_hedge_delay_seconds`` or as
+        soon as the primary fails, whichever comes first. Losers are cancelled.
+        """
+        primary, secondary = (candidates + [None])[:2]
+        tasks = {asyncio.create_task(self._agenerate_cached(primary, prompt, use_cache, caps)): primary}
+        hedge_delay = settings.llm_hedge_delay_seconds
+        secondary_started = False
+
         try:
-            if not settings.gemini_api_key:
-                raise ValueError("Google Gemini API key is not set.")
-        
-            response = self.gemini_model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            logger.error(f"Error generating text with Google Gemini: {e}")
+            while tasks:
+                timeout = None if secondary_started else hedge_delay
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    provider = tasks.pop(task)
+                    result = task.result()
+                    if result is not None:
+                        logger.info(f"Race won by {provider}.")
+                        return result
+                    logger.info(f"{provider} failed during race.")
+
+                if not secondary_started:
+                    secondary_started = True
+                    if secondary is not None:
+                        tasks[asyncio.create_task(self._agenerate_cached(secondary, prompt, use_cache, caps))] = secondary
             return None
-    
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    @on_shared_loop
+    async def agenerate(self,
+                        prompt: str,
+                        provider: str = "gemini",
+                        use_cache: bool = True,
+                        caps: Optional[GenerationCaps] = None) -> Optional[GenerationResult]:
+        """Generate content and report which provider produced it.
+
+        ``provider`` is a provider name, "race" (first two providers
+        concurrently, first success wins), "auto" or a routing policy (see
+        ``_plan``); with a policy or anything else each provider is tried in
+        turn until one succeeds. ``caps`` bounds the output length.
+        """
+        provider = provider.lower()
+        logger.info(f"Generating content with {provider} provider.")
+        with tracing.span("llm.generate", requested_provider=provider, prompt_chars=len(prompt),
+                          max_output_tokens=caps.max_output_tokens if caps else None) as span:
+            result = await self._agenerate_planned(prompt, provider, use_cache, caps)
+            if result is None:
+                span.fail("no provider returned content")
+            else:
+                span.set(provider=result.provider, model=result.model, cached=result.cached,
+                         output_chars=len(result.content))
+            return result
+
+    async def _agenerate_planned(self,
+                                 prompt: str,
+                                 provider: str,
+                                 use_cache: bool,
+                                 caps: Optional[GenerationCaps]) -> Optional[GenerationResult]:
+        """Generate with the provider(s) chosen by ``_plan``, racing or falling back."""
+        mode, candidates = self._plan(provider, prompt, caps)
+        if mode == "race":
+            return await self._arace(prompt, use_cache, candidates, caps)
+
+        for index, name in enumerate(candidates):
+            result = await self._agenerate_cached(name, prompt, use_cache, caps)
+            if result is not None:
+                return result
+            if index + 1 < len(candidates):
+                PROVIDER_FALLBACKS.inc(provider=name)
+                logger.info(f"{name} failed, trying {candidates[index + 1]}...")
+        return None
+
+    async def agenerate_content(self,
+                                prompt: str,
+                                provider: str = "gemini",
+                                use_cache: bool = True,
+                                caps: Optional[GenerationCaps] = None) -> Optional[str]:
+        """Generate content asynchronously using the specified provider."""
+        result = await self.agenerate(prompt, provider, use_cache, caps)
+        return result.content if result else None
+
+    @on_shared_loop
+    async def agenerate_batch(self,
+                              prompts: List[str],
+                              provider: str = "gemini",
+                              max_concurrency: int = 4,
+                              use_cache: bool = True,
+                              progress_callback: Optional[Callable[[int, int, BatchItem], None]] = None,
+                              caps: Optional[GenerationCaps] = None) -> List[BatchItem]:
+        """Generate content for many prompts with bounded concurrency.
+
+        Results come back in input order; failed prompts carry an ``error``
+        instead of content. Provider rate and parallelism limits still apply
+        on top of ``max_concurrency``. ``progress_callback(done, total, item)``
+        is called from the event loop thread as each prompt finishes.
+        ``caps`` applies to every prompt.
+        """
+        total = len(prompts)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        completed = 0
+
+        async def run_one(index: int, prompt: str) -> BatchItem:
+            nonlocal completed
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    result = await self.agenerate(prompt, provider, use_cache, caps)
+                    if result is None:
+                        item = BatchItem(index=index, error=f"No content returned by {provider}")
+                    else:
+                        item = BatchItem(
+                            index=index,
+                            content=result.content,
+                            provider=result.provider,
+                            cached=result.cached,
+                            latency_seconds=time.perf_counter() - started_at
+                        )
+                except Exception as e:
+                    item = BatchItem(index=index, error=str(e))
+
+            completed += 1
+            if progress_callback:
+                try:
+                    progress_callback(completed, total, item)
+                except Exception as e:
+                    logger.error(f"Batch progress callback failed: {e}")
+            return item
+
+        logger.info(f"Generating batch of {total} prompts with {provider} (concurrency {max_concurrency}).")
+        items = await asyncio.gather(*(run_one(index, prompt) for index, prompt in enumerate(prompts)))
+        failures = sum(1 for item in items if not item.ok)
+        logger.info(f"Batch finished: {total - failures}/{total} succeeded.")
+        return list(items)
+
+    async def _astream_cached(self,
+                              provider: str,
+                              prompt: str,
+                              use_cache: bool,
+                              caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        """Stream from a provider, replaying and filling the response cache.
+
+        A cached response is replayed as a single chunk, and only streams that
+        run to completion are written to the cache.
+        """
+        model = self._model_name(provider)
+        options = caps.cache_tag() if caps else ""
+        if use_cache and self.cache:
+            cached = await self.cache.aget(provider, model, prompt, options)
+            if cached is not None:
+                yield cached
+                return
+
+        key = LLMCache.make_key(provider, model, prompt, options)
+        async for chunk in generation_flights.stream(key, lambda: self._astream_uncached(provider, model, prompt, caps)):
+            yield chunk
+
+    async def _astream_uncached(self,
+                                provider: str,
+                                model: str,
+                                prompt: str,
+                                caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        """Stream from a provider through its circuit breaker and limiter, then fill the cache."""
+        if not self.providers[provider].is_configured():
+            raise RuntimeError(f"{provider} is not configured")
+
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            raise RuntimeError(f"{provider} circuit is open")
+
+        chunks = []
+        started_at = queued_at = time.perf_counter()
+        with tracing.span("llm.call", provider=provider, model=model, prompt_chars=len(prompt), stream=True) as span:
+            try:
+                async with self.limiters[provider]:
+                    started_at = time.perf_counter()
+                    span.set(queue_ms=round((started_at - queued_at) * 1000, 3))
+                    async for chunk in self.providers[provider].astream(prompt, caps):
+                        chunks.append(chunk)
+                        yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure(time.perf_counter() - started_at, str(e))
+                raise
+            finally:
+                span.set(output_chars=sum(len(chunk) for chunk in chunks))
+        breaker.record_success(time.perf_counter() - started_at)
+
+        if chunks and self.cache:
+            await self.cache.aset(provider, model, prompt, "".join(chunks), caps.cache_tag() if caps else "")
+
+    async def _arace_streams(self,
+                             prompt: str,
+                             use_cache: bool,
+                             candidates: List[str],
+                             caps: Optional[GenerationCaps] = None) -> AsyncIterator[Tuple[str, str]]:
+        """Race the first two candidates' streams and yield (provider, chunk) from the first to produce output."""
+        primary, secondary = (candidates + [None])[:2]
+        streams = {}
+
+        def start(provider: str):
+            stream = self._astream_cached(provider, prompt, use_cache, caps)
+            streams[asyncio.ensure_future(stream.__anext__())] = (provider, stream)
+
+        async def discard(task: asyncio.Future, stream: AsyncIterator[str]):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await stream.aclose()
+
+        start(primary)
+        secondary_started = False
+        winner = None
+        try:
+            while streams and winner is None:
+                timeout = None if secondary_started else settings.llm_hedge_delay_seconds
+                done, _ = await asyncio.wait(streams, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    provider, stream = streams.pop(task)
+                    if task.exception() is None:
+                        winner = (provider, stream, task.result())
+                        break
+                    if not isinstance(task.exception(), StopAsyncIteration):
+                        logger.error(f"Error streaming text with {provider}: {task.exception()}")
+                    await stream.aclose()
+
+                if winner is None and not secondary_started:
+                    secondary_started = True
+                    if secondary is not None:
+                        start(secondary)
+        finally:
+            for task, (_, stream) in list(streams.items()):
+                await discard(task, stream)
+
+        if winner is None:
+            return
+
+        provider, stream, first_chunk = winner
+        logger.info(f"Stream race won by {provider}.")
+        try:
+            yield provider, first_chunk
+            async for chunk in stream:
+                yield provider, chunk
+        finally:
+            await stream.aclose()
+
+    async def astream_content(self,
+                              prompt: str,
+                              provider: str = "gemini",
+                              use_cache: bool = True,
+                              on_provider: Optional[Callable[[str], None]] = None,
+                              caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        """Stream content chunks from the specified provider.
+
+        Errors are logged and end the stream. When several providers are
+        candidates, the next one is only tried when the current one fails
+        before producing any output. ``on_provider`` is called with the
+        provider that ends up serving the stream.
+
+        When ``caps`` carries ``max_words``, the stream ends at the first
+        paragraph break after ``llm_word_budget_multiple`` times that many
+        words and the upstream request is cancelled.
+        """
+        served = provider.lower()
+
+        def announce(name: str):
+            nonlocal served
+            served = name
+            if on_provider:
+                on_provider(name)
+
+        chunks = self._astream_planned(prompt, provider, use_cache, announce, caps)
+        monitor = None
+        if caps and caps.max_words and settings.llm_word_budget_multiple > 0:
+            monitor = WordBudgetMonitor(int(caps.max_words * settings.llm_word_budget_multiple))
+
+        output_chars = 0
+        started_at = time.perf_counter()
+        first_chunk_at = None
+        with tracing.span("llm.stream", requested_provider=served, prompt_chars=len(prompt),
+                          max_output_tokens=caps.max_output_tokens if caps else None) as span:
+            try:
+                async for chunk in chunks:
+                    text = chunk if monitor is None else monitor.feed(chunk)
+                    if text:
+                        if first_chunk_at is None:
+                            first_chunk_at = time.perf_counter()
+                        output_chars += len(text)
+                        yield text
+                    if monitor is not None and monitor.stopped:
+                        logger.info(f"Stopped {served} stream at {monitor.words} words (budget {monitor.limit}).")
+                        cap_stats.record_budget_stop(served, caps.label)
+                        span.set(budget_stopped=True)
+                        return
+            finally:
+                # Closing the chain cancels the provider request if it is still running
+                await chunks.aclose()
+                span.set(provider=served, output_chars=output_chars,
+                         first_chunk_ms=round((first_chunk_at - started_at) * 1000, 3) if first_chunk_at else None)
+                if not output_chars and span.status == "ok":
+                    span.fail("no provider returned content")
+
+    async def _astream_planned(self,
+                               prompt: str,
+                               provider: str,
+                               use_cache: bool,
+                               on_provider: Callable[[str], None],
+                               caps: Optional[GenerationCaps]) -> AsyncIterator[str]:
+        """Stream from the provider(s) chosen by ``_plan``, racing or falling back."""
+        provider = provider.lower()
+        logger.info(f"Streaming content with {provider} provider.")
+        mode, providers = self._plan(provider, prompt, caps, streaming=True)
+
+        if mode == "race":
+            announced = False
+            async for name, chunk in self._arace_streams(prompt, use_cache, providers, caps):
+                if not announced:
+                    on_provider(name)
+                    announced = True
+                yield chunk
+            return
+
+        for index, name in enumerate(providers):
+            produced = False
+            try:
+                async for chunk in self._astream_cached(name, prompt, use_cache, caps):
+                    if not produced:
+                        on_provider(name)
+                    produced = True
+                    yield chunk
+                return
+            except Exception as e:
+                logger.error(f"Error streaming text with {name}: {e}")
+                if produced:
+                    return
+                if index + 1 < len(providers):
+                    PROVIDER_FALLBACKS.inc(provider=name)
+                    logger.info(f"{name} failed, trying {providers[index + 1]}...")
+
+    def stream_content(self,
+                       prompt: str,
+                       provider: str = "gemini",
+                       use_cache: bool = True,
+                       caps: Optional[GenerationCaps] = None) -> GenerationStream:
+        """Stream content using the specified provider from blocking code."""
+        def on_provider(name: str):
+            stream.provider = name
+
+        stream = GenerationStream(
+            iterate_sync(self.astream_content(prompt, provider, use_cache, on_provider, caps)),
+            provider.lower()
+        )
+        return stream
+
+    def get_provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """Return circuit breaker state and rolling metrics per provider."""
+        return {provider: breaker.snapshot() for provider, breaker in self.breakers.items()}
+
+    def get_limiter_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return rate limit settings and queue depth per provider."""
+        return {provider: limiter.stats() for provider, limiter in self.limiters.items()}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return response cache counters, or an empty dict when caching is disabled."""
+        return self.cache.stats() if self.cache else {}
+
+    def get_routing_report(self, prompt: str = "") -> List[Dict[str, Any]]:
+        """Return the router's latency, error and cost estimates per provider."""
+        return self.router.report(prompt)
+
+    def get_provider_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return backend-specific metrics, such as Ollama cold vs warm latency."""
+        stats = {name: provider.stats() for name, provider in self.providers.items()}
+        return {name: provider_stats for name, provider_stats in stats.items() if provider_stats}
+
+    def get_truncation_stats(self) -> List[Dict[str, Any]]:
+        """Return how often length caps cut generations short, per provider and label."""
+        return cap_stats.stats()
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Return how many identical in-flight requests shared a provider call."""
+        return generation_flights.stats()
+
+    def generate_with(self, provider: str, prompt: str, caps: Optional[GenerationCaps] = None) -> Optional[str]:
+        """Generate text with one provider, bypassing cache, breaker and limits."""
+        return run_sync(self.agenerate_with(provider, prompt, caps))
+
+    def generate_with_gemini(self, prompt: str) -> Optional[str]:
+        """Generate text using Google Gemini."""
+        return run_sync(self.agenerate_with_gemini(prompt))
+
     def generate_with_ollama(self, prompt: str) -> Optional[str]:
         """Generate text using Ollama."""
-        try:
-            if not self.ollama_available:
-                raise ValueError("Ollama not available.")
-            
-            payload = {
-                "model": settings.ollama_model,
-                "prompt": prompt,
-                "stream": False,
-            }
-            
-            response = requests.post(
-                f"{settings.ollama_base_url}/api/generate",
-                json=payload,
-                timeout=60
-            )
+        return run_sync(self.agenerate_with_ollama(prompt))
 
-            if response.status_code == 200:
-                return response.json()["response"]
-            else:
-                raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
-        except Exception as e:
-            logger.error(f"Error generating text with Ollama: {e}")
-            return None
-        
-    def generate_content(self, prompt: str, provider: str = "gemini") -> Optional[str]:
+    def generate(self,
+                 prompt: str,
+                 provider: str = "gemini",
+                 use_cache: bool = True,
+                 caps: Optional[GenerationCaps] = None) -> Optional[GenerationResult]:
+        """Generate content and report which provider produced it."""
+        return run_sync(self.agenerate(prompt, provider, use_cache, caps))
+
+    def generate_content(self,
+                         prompt: str,
+                         provider: str = "gemini",
+                         use_cache: bool = True,
+                         caps: Optional[GenerationCaps] = None) -> Optional[str]:
         """Generate content using the specified provider."""
-        
-        logger.info(f"Generating content with {provider} provider.")
-        if provider.lower() == "gemini":
-            return self.generate_with_gemini(prompt)
-        elif provider == "ollama":
-            return self.generate_with_ollama(prompt)
-        else:
-            #Try gemini first, fallback to Ollama ... 
-            content = self.generate_with_gemini(prompt)
-            if content is None:
-                logger.info("Gemini failed, trying Ollama...")
-                content = self.generate_with_ollama(prompt)
-            return content
\ No newline at end of file
+        return run_sync(self.agenerate_content(prompt, provider, use_cache, caps))
+
+    def generate_batch(self,
+                       prompts: List[str],
+                       provider: str = "gemini",
+                       max_concurrency: int = 4,
+                       use_cache: bool = True,
+                       progress_callback: Optional[Callable[[int, int, BatchItem], None]] = None,
+                       caps: Optional[GenerationCaps] = None) -> List[BatchItem]:
+        """Generate content for many prompts; see agenerate_batch."""
+        return run_sync(self.agenerate_batch(prompts, provider, max_concurrency, use_cache, progress_callback, caps))
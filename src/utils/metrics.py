@@ -0,0 +1,312 @@
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from loguru import logger
+from config.config import settings
+from src.prompt.prompt_cache import get_prompt_cache
+from src.utils.circuit_breaker import CircuitState, get_all_circuit_breakers
+from src.utils.generation_caps import cap_stats
+from src.utils.llm_cache import peek_llm_cache
+from src.utils.rate_limiter import get_all_provider_limiters
+from src.utils.single_flight import generation_flights
+from src.utils.tracing import Span, SpanSink
+
+# Seconds; covers cache hits and prompt rendering up to slow local generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metric:
+    """A named metric with a fixed set of label names, in the Prometheus data model."""
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}"
+                     for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts plus sum and count, per label set."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [count per bucket..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> float:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, count))
+            samples.append((f"{self.name}_sum", labels, series[-2]))
+            samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format.
+
+    Collectors are called on every render and return metrics built from
+    state that other components already keep, such as cache counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a different {metric.type}.")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Metric]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return metrics
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.collect():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Shared by every component in the process
+metrics = MetricsRegistry()
+
+STAGE_DURATION = metrics.histogram(
+    "content_stage_duration_seconds", "Duration of traced request stages (see src.utils.tracing)", ["stage", "status"])
+PROVIDER_REQUESTS = metrics.counter(
+    "llm_provider_requests_total", "Calls made to an LLM provider", ["provider"])
+PROVIDER_FAILURES = metrics.counter(
+    "llm_provider_failures_total", "LLM provider calls that failed or returned nothing", ["provider"])
+PROVIDER_FALLBACKS = metrics.counter(
+    "llm_fallbacks_total", "Times a failed provider handed the request to the next candidate", ["provider"])
+PROMPT_EVAL_DURATION = metrics.histogram(
+    "llm_prompt_eval_duration_seconds", "Time a provider spent evaluating the prompt, as reported by Ollama", ["provider"])
+PROMPT_EVAL_TOKENS = metrics.counter(
+    "llm_prompt_eval_tokens_total", "Prompt tokens a provider evaluated; cached prefix tokens are not counted", ["provider"])
+MODEL_LATENCY = metrics.histogram(
+    "llm_model_latency_seconds", "Ollama request latency by whether the model had to be loaded first",
+    ["provider", "phase", "kind"])
+NOTION_WRITE_DURATION = metrics.histogram(
+    "notion_write_duration_seconds", "Duration of Notion page creation", ["status"])
+
+
+class MetricsSpanSink(SpanSink):
+    """Turns finished tracing spans into stage latency histograms and provider counters."""
+
+    def on_end(self, span: Span):
+        if span.duration_seconds is None:
+            return
+        STAGE_DURATION.observe(span.duration_seconds, stage=span.name, status=span.status)
+        if span.name == "llm.call":
+            provider = span.attributes.get("provider", "unknown")
+            PROVIDER_REQUESTS.inc(provider=provider)
+            if span.status == "error":
+                PROVIDER_FAILURES.inc(provider=provider)
+            if "prompt_eval_ms" in span.attributes:
+                PROMPT_EVAL_DURATION.observe(span.attributes["prompt_eval_ms"] / 1000, provider=provider)
+                PROMPT_EVAL_TOKENS.inc(span.attributes["prompt_eval_tokens"], provider=provider)
+        elif span.name == "notion.create_page":
+            NOTION_WRITE_DURATION.observe(span.duration_seconds, status=span.status)
+
+
+def _collect_llm_state() -> List[Metric]:
+    """Cache, limiter, circuit breaker, coalescing and length cap state at scrape time."""
+    collected: List[Metric] = []
+
+    # Scrapes only report on a cache the app has opened; they never create the file
+    cache = peek_llm_cache()
+    if cache is not None:
+        stats = cache.stats()
+        hits = Counter("llm_cache_hits_total", "Response cache hits")
+        hits.inc(stats["hits"])
+        misses = Counter("llm_cache_misses_total", "Response cache misses")
+        misses.inc(stats["misses"])
+        hit_ratio = Gauge("llm_cache_hit_ratio", "Response cache hits per lookup since start")
+        hit_ratio.set(stats["hit_rate"])
+        entries = Gauge("llm_cache_entries", "Responses currently cached")
+        entries.set(stats["entries"])
+        collected += [hits, misses, hit_ratio, entries]
+
+    prompt_cache = get_prompt_cache()
+    if prompt_cache is not None:
+        stats = prompt_cache.stats()
+        prompt_hits = Counter("prompt_cache_hits_total", "Prompts served from the prompt cache")
+        prompt_hits.inc(stats["hits"])
+        prompt_misses = Counter("prompt_cache_misses_total", "Prompts rendered because they were not cached")
+        prompt_misses.inc(stats["misses"])
+        collected += [prompt_hits, prompt_misses]
+
+    queue_depth = Gauge("llm_queue_depth", "Requests waiting for a provider's rate or parallelism limit", ["provider"])
+    in_flight = Gauge("llm_in_flight", "Requests currently running against a provider", ["provider"])
+    for name, limiter in get_all_provider_limiters().items():
+        queue_depth.set(limiter.waiting, provider=name)
+        in_flight.set(limiter.in_flight, provider=name)
+    collected += [queue_depth, in_flight]
+
+    circuit_open = Gauge("llm_circuit_open", "1 while a provider's circuit breaker is open", ["provider"])
+    for name, breaker in get_all_circuit_breakers().items():
+        circuit_open.set(breaker.state == CircuitState.OPEN, provider=name)
+    collected.append(circuit_open)
+
+    flights = generation_flights.stats()
+    coalesced = Counter("llm_coalesced_requests_total", "Requests that shared an identical in-flight provider call")
+    coalesced.inc(flights["coalesced"])
+    collected.append(coalesced)
+
+    truncated = Counter("llm_truncated_total", "Generations cut off by their output token cap", ["provider", "label"])
+    budget_stops = Counter("llm_budget_stops_total", "Streams stopped early by their word budget", ["provider", "label"])
+    for row in cap_stats.stats():
+        truncated.inc(row["truncated"], provider=row["provider"], label=row["label"])
+        budget_stops.inc(row["budget_stops"], provider=row["provider"], label=row["label"])
+    collected += [truncated, budget_stops]
+    return collected
+
+metrics.register_collector(_collect_llm_state)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = metrics
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        payload = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """Serve ``/metrics`` from a background thread, once per process.
+
+    Streamlit re-runs ``main.py`` on every interaction, so later calls
+    return the running server (or None if it could not be started).
+    """
+    global _server, _server_attempted
+    with _server_lock:
+        if _server_attempted or not settings.metrics_enabled:
+            return _server
+        _server_attempted = True
+        host = host or settings.metrics_host
+        port = settings.metrics_port if port is None else port
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{_server.server_address[1]}/metrics")
+        return _server
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from loguru import logger
+from src.utils.circuit_breaker import percentile
+
+# Ollama reports a few milliseconds of load time even for a resident model;
+# anything above this means the model had to be loaded into memory.
+COLD_LOAD_THRESHOLD_SECONDS = 0.5
+
+def load_phase(load_seconds: float) -> str:
+    """"cold" when the model had to be loaded for the request, else "warm"."""
+    return "cold" if load_seconds >= COLD_LOAD_THRESHOLD_SECONDS else "warm"
+
+class LoadLatencyStats:
+    """Request latencies for one model, split by whether the model was cold.
+
+    Only the most recent ``window_size`` requests of each kind are kept.
+    """
+
+    def __init__(self, window_size: int = 100):
+        self._lock = threading.Lock()
+        self._cold = deque(maxlen=window_size)
+        self._warm = deque(maxlen=window_size)
+        self.warmups = 0
+        self.last_warmup_seconds: Optional[float] = None
+        # Generations and warm-ups keep the model loaded; only generations are real use
+        self.last_used = self.last_request = time.monotonic()
+
+    def record(self, load_seconds: float, total_seconds: float):
+        """Record a generation from the provider's reported load and total durations."""
+        with self._lock:
+            if load_phase(load_seconds) == "cold":
+                self._cold.append(total_seconds)
+            else:
+                self._warm.append(total_seconds)
+            self.last_used = self.last_request = time.monotonic()
+
+    def record_warmup(self, seconds: float):
+        with self._lock:
+            self.warmups += 1
+            self.last_warmup_seconds = seconds
+            self.last_used = time.monotonic()
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+    @property
+    def request_idle_seconds(self) -> float:
+        """Seconds since the last generation, ignoring warm-ups."""
+        return time.monotonic() - self.last_request
+
+    def stats(self) -> Dict:
+        with self._lock:
+            cold, warm = list(self._cold), list(self._warm)
+        return {
+            "cold_requests": len(cold),
+            "warm_requests": len(warm),
+            "cold_p50_latency": percentile(cold, 50),
+            "cold_p95_latency": percentile(cold, 95),
+            "warm_p50_latency": percentile(warm, 50),
+            "warm_p95_latency": percentile(warm, 95),
+            "warmups": self.warmups,
+            "last_warmup_seconds": self.last_warmup_seconds,
+            "idle_seconds": self.idle_seconds,
+            "request_idle_seconds": self.request_idle_seconds
+        }
+
+class ModelKeeper:
+    """Background thread that re-warms a model once it has sat idle.
+
+    ``warm`` is called whenever nothing has used the model for
+    ``idle_seconds``; keep that below the provider's keep-alive so the model
+    is reloaded before a user request would have to wait for it.
+
+    A failed warm-up is retried after ``backoff_seconds``, doubling with each
+    further failure up to ``idle_seconds``. Once no generation has used the
+    model for ``max_idle_seconds`` (0: never), the keeper lets it unload and
+    resumes after the next generation.
+    """
+
+    def __init__(self,
+                 name: str,
+                 warm: Callable[[], None],
+                 stats: LoadLatencyStats,
+                 idle_seconds: float,
+                 max_idle_seconds: float = 0,
+                 backoff_seconds: float = 5.0):
+        self.name = name
+        self.warm = warm
+        self.stats = stats
+        self.idle_seconds = idle_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.backoff_seconds = backoff_seconds
+        self.failures = 0
+        self._dormant = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-keeper", daemon=True)
+        self._thread.start()
+        logger.info(f"Started {self.name} model keeper (re-warm after {self.idle_seconds:.0f}s idle).")
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self._next_delay()):
+            self._tick()
+
+    def _next_delay(self) -> float:
+        if self.failures:
+            return min(self.idle_seconds, self.backoff_seconds * 2 ** (self.failures - 1))
+        if self._dormant:
+            return self.idle_seconds
+        return max(1.0, self.idle_seconds - self.stats.idle_seconds)
+
+    def _tick(self):
+        """Re-warm the model if it is due; called by the keeper thread after each wait."""
+        if self.max_idle_seconds and self.stats.request_idle_seconds >= self.max_idle_seconds:
+            if not self._dormant:
+                logger.info(f"{self.name} unused for {self.stats.request_idle_seconds:.0f}s; no longer re-warming.")
+            self._dormant, self.failures = True, 0
+            return
+        self._dormant = False
+        if self.stats.idle_seconds < self.idle_seconds:
+            return
+        try:
+            self.warm()
+            self.failures = 0
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Re-warming {self.name} failed: {e}; retrying in {self._next_delay():.0f}s")
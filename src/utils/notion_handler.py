@@ -2,24 +2,49 @@ from notion_client import Client
 from typing import Optional, Dict, List, Any
 from loguru import logger
 from config.config import settings
+from src.utils import tracing
 import re
+import threading
 
 class NotionHandler:
     def __init__(self):
         if not settings.notion_token:
             raise ValueError("Notion token is not set.")
         
-        self.client = Client(auth=settings.notion_token)
+        self.client = self._create_client(settings.notion_timeout_seconds)
         self.database_id = settings.notion_database_id
+        self.connected: Optional[bool] = None
+        self.connection_probe: Optional[threading.Thread] = None
         logger.info("Notion client initialized successfully.")
+
+    @staticmethod
+    def _create_client(timeout_seconds: float) -> Client:
+        return Client(
+            auth=settings.notion_token,
+            base_url=settings.notion_base_url,
+            timeout_ms=int(timeout_seconds * 1000)
+        )
+
+    def start_connection_probe(self) -> threading.Thread:
+        """Run test_connection in a background thread and store the result in ``connected``
+
+        The probe uses its own client, so it gives up after the provider probe
+        timeout rather than the (longer) Notion request timeout.
+        """
+        def _probe():
+            self.connected = self.test_connection(self._create_client(settings.provider_probe_timeout_seconds))
+
+        self.connection_probe = threading.Thread(target=_probe, name="notion-probe", daemon=True)
+        self.connection_probe.start()
+        return self.connection_probe
         
-    def test_connection(self) -> bool:
-        """Test Notion API connection"""
+    def test_connection(self, client: Optional[Client] = None) -> bool:
+        """Test Notion API connection, with ``client`` if given"""
         try:
             # Test by retrieving database (remove the token logging)
             logger.info(f"Testing connection to database: {self.database_id}")
             
-            db = self.client.databases.retrieve(database_id=self.database_id)
+            db = (client or self.client).databases.retrieve(database_id=self.database_id)
             logger.info("Notion connection successful")
             logger.info(f"Database title: {db.get('title', [{}])[0].get('plain_text', 'No title')}")
             return True
@@ -102,12 +127,14 @@ class NotionHandler:
                 }
 
             # Create the page
-            response = self.client.pages.create(
-                parent={"database_id": self.database_id},
-                properties=properties
-            )
+            with tracing.span("notion.create_page", content_chars=len(content), word_count=word_count) as span:
+                response = self.client.pages.create(
+                    parent={"database_id": self.database_id},
+                    properties=properties
+                )
+                page_id = response["id"]
+                span.set(page_id=page_id)
 
-            page_id = response["id"]
             logger.info(f"Created Notion page: {page_id}")
             return page_id
 
@@ -127,10 +154,12 @@ class NotionHandler:
     def list_recent_pages(self, limit: int = 5) -> List[Dict]:
         """Get recent pages from database"""
         try:
-            response = self.client.databases.query(
-                database_id=self.database_id,
-                page_size=limit
-            )
+            with tracing.span("notion.query", page_size=limit) as span:
+                response = self.client.databases.query(
+                    database_id=self.database_id,
+                    page_size=limit
+                )
+                span.set(results=len(response.get("results", [])))
             logger.info(f"Retrieved {len(response.get('results', []))} pages from database")
             results = response.get("results", [])
             
@@ -0,0 +1,133 @@
+import cProfile
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+from loguru import logger
+from pydantic import BaseModel
+from config.config import settings
+
+project_root = Path(__file__).resolve().parent.parent.parent
+
+class FunctionStats(BaseModel):
+    """Time spent in one function while profiling."""
+    function: str
+    location: str
+    calls: int
+    own_ms: float
+    cumulative_ms: float
+
+
+class ProfileReport(BaseModel):
+    """Where a profiled block spent its time, and the saved ``.prof`` file."""
+    label: str
+    request_id: Optional[str] = None
+    path: Optional[str] = None
+    total_seconds: float
+    functions: List[FunctionStats] = []
+
+
+def _location(filename: str, line: int) -> str:
+    if filename.startswith("<") or filename == "~":
+        return filename
+    path = Path(filename)
+    try:
+        path = path.relative_to(project_root)
+    except ValueError:
+        # Library code: keep the path from the package directory on
+        parts = path.parts
+        if "site-packages" in parts:
+            path = Path(*parts[parts.index("site-packages") + 1:])
+    return f"{path}:{line}"
+
+def top_functions(stats: pstats.Stats, limit: int = 25, sort: str = "own") -> List[FunctionStats]:
+    """The ``limit`` functions with the most ``own`` (excluding callees) or ``cumulative`` time."""
+    if sort not in ("own", "cumulative"):
+        raise ValueError(f"Unknown sort '{sort}'. Use 'own' or 'cumulative'.")
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append(FunctionStats(function=name, location=_location(filename, line), calls=calls,
+                                  own_ms=own * 1000, cumulative_ms=cumulative * 1000))
+    key = (lambda row: row.own_ms) if sort == "own" else (lambda row: row.cumulative_ms)
+    return sorted(rows, key=key, reverse=True)[:limit]
+
+
+class Profile:
+    """A cProfile run of one block, saved to ``output_dir`` when stopped.
+
+    cProfile is deterministic and only sees the thread that started it:
+    work on the shared event loop (provider calls) shows up as the time
+    spent waiting for it, while prompt building, post-processing and page
+    rendering are broken down function by function.
+    """
+
+    def __init__(self, label: str, output_dir: Optional[str] = None, top: Optional[int] = None,
+                 request_id: Optional[str] = None):
+        self.label = label
+        self.output_dir = output_dir if output_dir is not None else settings.profiling_output_dir
+        self.top = top or settings.profiling_top_functions
+        self.request_id = request_id
+        self.report: Optional[ProfileReport] = None
+        self._profiler = cProfile.Profile()
+        self._started_at = 0.0
+
+    def start(self) -> "Profile":
+        self._started_at = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def stop(self) -> ProfileReport:
+        """Stop profiling and save the artifact; later calls return the same report."""
+        if self.report is not None:
+            return self.report
+        self._profiler.disable()
+        total_seconds = time.perf_counter() - self._started_at
+        stats = pstats.Stats(self._profiler)
+        self.report = ProfileReport(label=self.label, request_id=self.request_id, total_seconds=total_seconds,
+                                    functions=top_functions(stats, self.top), path=self._save(stats))
+        logger.info(f"Profiled {self.label} ({total_seconds:.2f}s), saved to {self.report.path}")
+        return self.report
+
+    def _save(self, stats: pstats.Stats) -> Optional[str]:
+        if not self.output_dir:
+            return None
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.label)
+        path = Path(self.output_dir) / f"{datetime.now():%Y%m%d-%H%M%S}-{name}-{uuid.uuid4().hex[:6]}.prof"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(str(path))
+        except OSError as e:
+            logger.error(f"Cannot save profile to {path}: {e}")
+            return None
+        return str(path)
+
+
+_active = threading.local()
+
+@contextmanager
+def profile(label: str, enabled: Optional[bool] = None, **options) -> Iterator[Optional[Profile]]:
+    """Profile the block when profiling is enabled (``settings.profiling_enabled`` by default).
+
+    Yields the running Profile, whose ``report`` is set when the block
+    exits, or None when profiling is off or an outer block in the same
+    thread is already profiling (its report covers this block).
+    """
+    if enabled is None:
+        enabled = settings.profiling_enabled
+    if not enabled or getattr(_active, "profile", None) is not None:
+        yield None
+        return
+
+    current = Profile(label, **options)
+    _active.profile = current
+    current.start()
+    try:
+        yield current
+    finally:
+        _active.profile = None
+        current.stop()
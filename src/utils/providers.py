@@ -0,0 +1,451 @@
+import abc
+import asyncio
+import importlib
+import json
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional, Union
+import httpx
+from loguru import logger
+from pydantic import BaseModel
+from config.config import settings
+from src.utils.generation_caps import GenerationCaps, cap_stats
+from src.utils.http_pool import get_ollama_async_client, get_ollama_session
+from src.utils.metrics import MODEL_LATENCY
+from src.utils.model_keeper import LoadLatencyStats, ModelKeeper, load_phase
+from src.utils.rate_limiter import get_provider_limiter, is_rate_limit_error
+from src.utils import tracing
+
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+
+
+class ProviderCapabilities(BaseModel):
+    """What a backend supports and what it costs, as declared by the backend."""
+    streaming: bool = True
+    max_context_tokens: int = 8192
+    cost_per_1k_input_tokens: float = 0.0
+    cost_per_1k_output_tokens: float = 0.0
+    expected_latency_seconds: float = 5.0
+    local: bool = False
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.cost_per_1k_input_tokens
+                + output_tokens * self.cost_per_1k_output_tokens) / 1000
+
+
+class LLMProvider(abc.ABC):
+    """A text generation backend.
+
+    Subclasses set ``name`` and ``capabilities`` and implement ``model`` and
+    ``agenerate``;
+    ``astream`` defaults to yielding the whole response as one chunk. Both
+    raise on failure, run on the shared event loop and should honour the
+    optional ``GenerationCaps``. Register an instance with
+    ``register_provider`` to make it available to ``LLMHandler``.
+    """
+    name: str = ""
+    capabilities: ProviderCapabilities = ProviderCapabilities()
+
+    @property
+    @abc.abstractmethod
+    def model(self) -> str:
+        """The model name generations are attributed to (and cached under)."""
+
+    def is_configured(self) -> bool:
+        """Whether the backend has the settings it needs to be called."""
+        return True
+
+    def probe(self) -> Optional[bool]:
+        """Check that the backend is reachable.
+
+        Returns True when healthy, None when the backend has no health check,
+        and raises with the reason when it is unreachable.
+        """
+        return None
+
+    def warm_up(self):
+        """Prepare the backend for its first request; called after a healthy probe."""
+
+    def stats(self) -> Dict:
+        """Return backend-specific metrics, if any."""
+        return {}
+
+    @abc.abstractmethod
+    async def agenerate(self, prompt: str, caps: Optional[GenerationCaps] = None) -> str:
+        """Generate the whole response for ``prompt``."""
+
+    async def astream(self, prompt: str, caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        yield await self.agenerate(prompt, caps)
+
+    def _record_cap_outcome(self, caps: Optional[GenerationCaps], truncated: bool):
+        if caps is not None and caps.max_output_tokens:
+            cap_stats.record(self.name, caps.label, truncated)
+            if truncated:
+                logger.warning(f"{self.name} output hit the {caps.max_output_tokens}-token cap ({caps.label}).")
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the google-generativeai SDK."""
+    name = "gemini"
+    capabilities = ProviderCapabilities(
+        streaming=True,
+        max_context_tokens=1_048_576,
+        cost_per_1k_input_tokens=0.0001,
+        cost_per_1k_output_tokens=0.0004,
+        expected_latency_seconds=4.0
+    )
+
+    def __init__(self, model_name: str = GEMINI_MODEL_NAME):
+        self.model_name = model_name
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        return self.model_name
+
+    def is_configured(self) -> bool:
+        return bool(settings.gemini_api_key)
+
+    def setup(self):
+        """Setup Google Gemini API client."""
+        try:
+            if settings.gemini_api_key:
+                # Imported here because the SDK import alone takes most of a second
+                import google.generativeai as genai
+                options = {}
+                if settings.gemini_api_endpoint:
+                    # Custom endpoints such as the local stand-ins only speak REST
+                    options = {"transport": "rest",
+                               "client_options": {"api_endpoint": settings.gemini_api_endpoint}}
+                genai.configure(api_key=settings.gemini_api_key, **options)
+                self._client = genai.GenerativeModel(self.model_name)
+                logger.info("Google Gemini model initialized successfully.")
+            else:
+                logger.warning("Google Gemini API key is not set.")
+        except Exception as e:
+            logger.error(f"Failed to initialize Google Gemini client: {e}")
+
+    @property
+    def client(self):
+        """Gemini model client, set up on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self.setup()
+        return self._client
+
+    async def _aclient(self):
+        """The client, set up in a worker thread so the SDK import never blocks the event loop."""
+        if self._client is not None:
+            return self._client
+        return await asyncio.to_thread(lambda: self.client)
+
+    async def _call(self, prompt: str, caps: Optional[GenerationCaps] = None, **kwargs):
+        """Call Gemini, backing off and retrying when rate limited.
+
+        Rate limit and success feedback goes to the process-wide adaptive
+        controller, so every caller slows down and recovers together.
+        """
+        if not settings.gemini_api_key:
+            raise ValueError("Google Gemini API key is not set.")
+        if caps is not None and caps.max_output_tokens:
+            kwargs["generation_config"] = {"max_output_tokens": caps.max_output_tokens}
+
+        limiter = get_provider_limiter(self.name)
+        retries = settings.gemini_rate_limit_retries if limiter.controller else 0
+        for attempt in range(retries + 1):
+            try:
+                response = await self._send(prompt, **kwargs)
+            except Exception as e:
+                if attempt == retries or not is_rate_limit_error(e):
+                    raise
+                limiter.controller.on_rate_limited(e)
+                await limiter.wait_for_token()
+                continue
+
+            if limiter.controller:
+                limiter.controller.on_success()
+            return response
+
+    async def _send(self, prompt: str, **kwargs):
+        client = await self._aclient()
+        if not settings.gemini_api_endpoint:
+            return await client.generate_content_async(prompt, **kwargs)
+        # The SDK's async client cannot use the REST transport, so run the blocking one in a thread
+        response = await asyncio.to_thread(client.generate_content, prompt, **kwargs)
+        return _iterate_in_thread(response) if kwargs.get("stream") else response
+
+    @staticmethod
+    def _hit_token_cap(response) -> bool:
+        candidates = getattr(response, "candidates", None)
+        if not candidates:
+            return False
+        reason = candidates[0].finish_reason
+        return getattr(reason, "name", str(reason)) == "MAX_TOKENS"
+
+    async def agenerate(self, prompt: str, caps: Optional[GenerationCaps] = None) -> str:
+        response = await self._call(prompt, caps)
+        self._record_cap_outcome(caps, self._hit_token_cap(response))
+        return response.text
+
+    async def astream(self, prompt: str, caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        """Stream Gemini's response, retrying rate limits hit before the first chunk.
+
+        A rate limit can also arrive while iterating the stream. It is always
+        reported to the adaptive controller, but once text has been yielded
+        the stream can't be restarted, so it is raised.
+        """
+        limiter = get_provider_limiter(self.name)
+        retries = settings.gemini_rate_limit_retries if limiter.controller else 0
+        for attempt in range(retries + 1):
+            response = await self._call(prompt, caps, stream=True)
+            last_chunk = None
+            yielded = False
+            try:
+                async for chunk in response:
+                    last_chunk = chunk
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety metadata) carry nothing to render
+                        continue
+                    if text:
+                        yielded = True
+                        yield text
+            except Exception as e:
+                if limiter.controller is None or not is_rate_limit_error(e):
+                    raise
+                limiter.controller.on_rate_limited(e)
+                if yielded or attempt == retries:
+                    raise
+                await limiter.wait_for_token()
+                continue
+
+            # The finish reason arrives with the final chunk
+            self._record_cap_outcome(caps, last_chunk is not None and self._hit_token_cap(last_chunk))
+            return
+
+
+async def _iterate_in_thread(iterable) -> AsyncIterator:
+    """Iterate a blocking iterator without blocking the event loop."""
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def _keep_alive_value(value: str) -> Union[int, str]:
+    """Ollama takes a duration string ("30m") or seconds as a number (-1 = forever)."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class OllamaProvider(LLMProvider):
+    """A model served by Ollama.
+
+    ``base_url`` and ``model`` default to the current settings, so the
+    built-in instance follows changes made on the Settings page. Extra
+    instances can register other hosts or models under their own names.
+    """
+    capabilities = ProviderCapabilities(
+        streaming=True,
+        max_context_tokens=8192,
+        expected_latency_seconds=10.0,
+        local=True
+    )
+
+    def __init__(self,
+                 name: str = "ollama",
+                 base_url: Optional[str] = None,
+                 model: Optional[str] = None,
+                 capabilities: Optional[ProviderCapabilities] = None):
+        self.name = name
+        self._base_url = base_url
+        self._model = model
+        if capabilities is not None:
+            self.capabilities = capabilities
+        self.load_stats = LoadLatencyStats()
+        self.keeper: Optional[ModelKeeper] = None
+        self._keeper_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url or settings.ollama_base_url
+
+    @property
+    def model(self) -> str:
+        return self._model or settings.ollama_model
+
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled async HTTP client for this host."""
+        return get_ollama_async_client(self.base_url)
+
+    def probe(self) -> Optional[bool]:
+        response = get_ollama_session(self.base_url, retries=False).get(
+            f"{self.base_url}/api/tags",
+            timeout=settings.provider_probe_timeout_seconds
+        )
+        if response.status_code != 200:
+            raise Exception(f"health probe returned {response.status_code}")
+        return True
+
+    def warm_up(self):
+        """Load the model into memory, then keep it loaded while idle.
+
+        A generate request without a prompt makes Ollama load the model and
+        reset its keep-alive timer without producing any text.
+        """
+        payload = {"model": self.model, "keep_alive": _keep_alive_value(settings.ollama_keep_alive)}
+        if settings.llm_length_caps_enabled:
+            # Load with the context size most capped requests use, or the
+            # first of them would reload the model
+            payload["options"] = {"num_ctx": min(settings.llm_min_context_tokens, self.capabilities.max_context_tokens)}
+
+        started_at = time.perf_counter()
+        response = get_ollama_session(self.base_url).post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=settings.ollama_warmup_timeout_seconds
+        )
+        if response.status_code != 200:
+            raise Exception(f"Ollama warm-up failed: {response.status_code} - {response.text}")
+
+        elapsed = time.perf_counter() - started_at
+        self.load_stats.record_warmup(elapsed)
+        load_seconds = response.json().get("load_duration", 0) / 1e9
+        MODEL_LATENCY.observe(elapsed, provider=self.name, phase=load_phase(load_seconds), kind="warmup")
+        logger.info(f"Warmed up Ollama model {self.model} in {elapsed:.2f}s.")
+        self.start_keeper()
+
+    def start_keeper(self):
+        """Start the process-wide background re-warmer for this model."""
+        if settings.ollama_rewarm_idle_seconds <= 0:
+            return
+        with self._keeper_lock:
+            if self.keeper is None:
+                self.keeper = ModelKeeper(self.name, self.warm_up, self.load_stats,
+                                          settings.ollama_rewarm_idle_seconds,
+                                          max_idle_seconds=settings.ollama_rewarm_max_idle_seconds)
+            self.keeper.start()
+
+    def stats(self) -> Dict:
+        stats = self.load_stats.stats()
+        stats["keep_alive"] = settings.ollama_keep_alive
+        stats["keeper_running"] = self.keeper is not None and self.keeper.running
+        return stats
+
+    def _record_durations(self, data: Dict):
+        # Durations in Ollama's final response are nanoseconds
+        if data.get("total_duration"):
+            load_seconds, total_seconds = data.get("load_duration", 0) / 1e9, data["total_duration"] / 1e9
+            self.load_stats.record(load_seconds, total_seconds)
+            MODEL_LATENCY.observe(total_seconds, provider=self.name, phase=load_phase(load_seconds), kind="generation")
+
+    def _payload(self, prompt: str, stream: bool, caps: Optional[GenerationCaps]) -> Dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": _keep_alive_value(settings.ollama_keep_alive),
+        }
+        options = {}
+        if caps is not None and caps.max_output_tokens:
+            options["num_predict"] = caps.max_output_tokens
+        if caps is not None and caps.context_tokens:
+            options["num_ctx"] = min(caps.context_tokens, self.capabilities.max_context_tokens)
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _finish(self, data: Dict, caps: Optional[GenerationCaps]):
+        self._record_durations(data)
+        # Ollama only counts the prompt tokens it had to evaluate; a prefix
+        # still in its cache (see PROMPT_LAYOUT) is skipped
+        span = tracing.current_span()
+        if span is not None and "prompt_eval_count" in data:
+            span.set(prompt_eval_tokens=data["prompt_eval_count"],
+                     prompt_eval_ms=round(data.get("prompt_eval_duration", 0) / 1e6, 3))
+        self._record_cap_outcome(caps, data.get("done_reason") == "length")
+
+    async def agenerate(self, prompt: str, caps: Optional[GenerationCaps] = None) -> str:
+        payload = self._payload(prompt, False, caps)
+
+        response = await self.client().post("/api/generate", json=payload)
+        if response.status_code != 200:
+            raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+        data = response.json()
+        self._finish(data, caps)
+        return data["response"]
+
+    async def astream(self, prompt: str, caps: Optional[GenerationCaps] = None) -> AsyncIterator[str]:
+        """Yield text chunks from Ollama's NDJSON streaming response."""
+        payload = self._payload(prompt, True, caps)
+
+        async with self.client().stream("POST", "/api/generate", json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"Ollama API error: {response.status_code} - {body.decode(errors='replace')}")
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise Exception(f"Ollama API error: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    self._finish(data, caps)
+                    break
+
+
+# Providers in registration order, which is also the default fallback order
+_registry: Dict[str, LLMProvider] = {}
+_registry_lock = threading.RLock()
+_builtins_loaded = False
+
+def _load_builtin_providers():
+    global _builtins_loaded
+    if _builtins_loaded:
+        return
+    _builtins_loaded = True
+    register_provider(GeminiProvider())
+    register_provider(OllamaProvider())
+    # Plugin modules register their own providers when imported
+    for module in filter(None, (name.strip() for name in settings.llm_provider_modules.split(","))):
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.error(f"Failed to load LLM provider module {module}: {e}")
+
+def register_provider(provider: LLMProvider, replace: bool = False):
+    """Make a provider available to every LLMHandler created afterwards."""
+    if not provider.name:
+        raise ValueError("LLM providers need a name.")
+    with _registry_lock:
+        _load_builtin_providers()
+        if provider.name in _registry and not replace:
+            raise ValueError(f"LLM provider {provider.name} is already registered.")
+        _registry[provider.name] = provider
+    logger.info(f"Registered LLM provider {provider.name}.")
+
+def unregister_provider(name: str) -> Optional[LLMProvider]:
+    """Stop offering a provider to LLMHandlers created afterwards; returns it, or None if unknown."""
+    with _registry_lock:
+        _load_builtin_providers()
+        provider = _registry.pop(name, None)
+    if provider is not None:
+        logger.info(f"Unregistered LLM provider {name}.")
+    return provider
+
+def get_registered_providers() -> Dict[str, LLMProvider]:
+    """Return the registered providers in registration order."""
+    with _registry_lock:
+        _load_builtin_providers()
+        return dict(_registry)
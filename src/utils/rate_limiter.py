@@ -0,0 +1,243 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+from config.config import settings
+
+class TokenBucket:
+    """Token bucket that async callers wait on before sending a request.
+
+    State is guarded by a thread lock and waiting uses ``asyncio.sleep``, so
+    one bucket can be shared by every caller in the process.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def set_rate(self, rate_per_second: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate_per_second = rate_per_second
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next ``seconds`` and drop the saved burst."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated_at = self._paused_until
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            if self.rate_per_second <= 0:
+                return 1.0
+            return (tokens - self._tokens) / self.rate_per_second
+
+    async def acquire(self, tokens: float = 1.0):
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+_RETRY_PATTERNS = [
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s*nanos:\s*(\d+))?", re.IGNORECASE),
+    re.compile(r"retry in\s*([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*([\d.]+)", re.IGNORECASE),
+]
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Recognize 429 / RESOURCE_EXHAUSTED errors from provider SDKs and HTTP clients."""
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "resource_exhausted" in message or "resource exhausted" in message
+
+def parse_retry_after(error: BaseException) -> Optional[float]:
+    """Extract a retry-after hint in seconds from a rate limit error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers and headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+
+    text = str(error)
+    for detail in getattr(error, "details", None) or []:
+        text += f"\n{detail}"
+    for pattern in _RETRY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            seconds = float(match.group(1))
+            if match.lastindex and match.lastindex > 1 and match.group(2):
+                seconds += int(match.group(2)) / 1e9
+            return seconds
+    return None
+
+class AdaptiveRateController:
+    """AIMD controller that tunes a token bucket from rate limit feedback.
+
+    Each success raises the allowed rate by ``increase_per_success`` requests
+    per minute up to ``max_rpm``; each rate limit error multiplies it by
+    ``decrease_factor`` (down to ``min_rpm``) and pauses the bucket for the
+    provider's retry-after hint, or ``default_backoff_seconds`` without one.
+    """
+
+    def __init__(self,
+                 bucket: TokenBucket,
+                 min_rpm: float,
+                 max_rpm: float,
+                 increase_per_success: float = 0.5,
+                 decrease_factor: float = 0.5,
+                 default_backoff_seconds: float = 5.0):
+        self.bucket = bucket
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm
+        self.increase_per_success = increase_per_success
+        self.decrease_factor = decrease_factor
+        self.default_backoff_seconds = default_backoff_seconds
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_rpm(self) -> float:
+        return self.bucket.rate_per_second * 60
+
+    def on_success(self):
+        with self._lock:
+            rpm = min(self.max_rpm, self.current_rpm + self.increase_per_success)
+            self.bucket.set_rate(rpm / 60)
+
+    def on_rate_limited(self, error: BaseException) -> float:
+        """Back off after a rate limit error; returns the pause in seconds."""
+        retry_after = parse_retry_after(error)
+        delay = retry_after if retry_after is not None else self.default_backoff_seconds
+        with self._lock:
+            self.rate_limited += 1
+            rpm = max(self.min_rpm, self.current_rpm * self.decrease_factor)
+            self.bucket.set_rate(rpm / 60)
+            self.bucket.pause(delay)
+        logger.warning(f"Rate limited; allowed rate now {rpm:.1f} req/min, pausing {delay:.1f}s.")
+        return delay
+
+    def stats(self) -> Dict:
+        return {
+            "current_rpm": self.current_rpm,
+            "max_rpm": self.max_rpm,
+            "rate_limited": self.rate_limited,
+            "paused_for_seconds": self.bucket.paused_for
+        }
+
+class ProviderLimiter:
+    """Request-rate and concurrency limits for one provider.
+
+    Use as ``async with limiter:`` around a provider call. The concurrency
+    semaphore binds to the shared event loop, where all provider calls run.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, max_parallel: int = 0):
+        self.name = name
+        self.bucket = TokenBucket(requests_per_minute / 60) if requests_per_minute > 0 else None
+        self.max_parallel = max_parallel
+        self._semaphore = asyncio.Semaphore(max_parallel) if max_parallel > 0 else None
+        self.controller: Optional[AdaptiveRateController] = None
+        self.waiting = 0
+        self.in_flight = 0
+
+    async def __aenter__(self):
+        self.waiting += 1
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+            try:
+                if self.bucket is not None:
+                    await self.bucket.acquire()
+            except BaseException:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+        return False
+
+    def make_adaptive(self, min_rpm: float, max_rpm: float):
+        """Let an AIMD controller tune this limiter's request rate."""
+        if self.bucket is None:
+            self.bucket = TokenBucket(max_rpm / 60)
+        self.controller = AdaptiveRateController(self.bucket, min_rpm=min_rpm, max_rpm=max_rpm)
+
+    async def wait_for_token(self):
+        """Take another request token, e.g. before retrying a rate limited call."""
+        if self.bucket is not None:
+            await self.bucket.acquire()
+
+    def stats(self) -> Dict:
+        stats = {
+            "provider": self.name,
+            "requests_per_minute": self.bucket.rate_per_second * 60 if self.bucket else None,
+            "max_parallel": self.max_parallel or None,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting
+        }
+        if self.controller is not None:
+            stats.update(self.controller.stats())
+        return stats
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_provider_limiter(name: str) -> ProviderLimiter:
+    """Return the process-wide limiter for a provider."""
+    with _limiters_lock:
+        if name not in _limiters:
+            if name == "gemini":
+                limiter = ProviderLimiter(name, requests_per_minute=settings.gemini_requests_per_minute)
+                if settings.gemini_requests_per_minute > 0:
+                    limiter.make_adaptive(
+                        min_rpm=settings.gemini_min_requests_per_minute,
+                        max_rpm=settings.gemini_requests_per_minute
+                    )
+                _limiters[name] = limiter
+            elif name == "ollama":
+                _limiters[name] = ProviderLimiter(name, max_parallel=settings.ollama_parallel_requests)
+            else:
+                _limiters[name] = ProviderLimiter(name)
+        return _limiters[name]
+
+def get_all_provider_limiters() -> Dict[str, ProviderLimiter]:
+    with _limiters_lock:
+        return dict(_limiters)
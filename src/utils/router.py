@@ -0,0 +1,120 @@
+import re
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from src.utils.circuit_breaker import CircuitBreaker, CircuitState
+from src.utils.generation_caps import estimate_tokens
+from src.utils.providers import LLMProvider
+
+# Until we know better, assume a response of about this many tokens
+DEFAULT_OUTPUT_TOKENS = 1024
+
+_POLICY_PATTERN = re.compile(
+    r"^\s*(fastest|cheapest)(?:\s+under\s+([\d.]+)\s*(?:s|sec|secs|seconds?))?\s*$",
+    re.IGNORECASE
+)
+
+class RoutingPolicy(BaseModel):
+    """How to rank providers: ``fastest``, ``cheapest``, or ``cheapest under N s``."""
+    objective: str
+    max_latency_seconds: Optional[float] = None
+
+    @classmethod
+    def parse(cls, text: str) -> Optional["RoutingPolicy"]:
+        """Parse a policy string, returning None when it is not a policy."""
+        match = _POLICY_PATTERN.match(text or "")
+        if not match:
+            return None
+        max_latency = float(match.group(2)) if match.group(2) else None
+        return cls(objective=match.group(1).lower(), max_latency_seconds=max_latency)
+
+    def __str__(self) -> str:
+        if self.max_latency_seconds is None:
+            return self.objective
+        return f"{self.objective} under {self.max_latency_seconds:g}s"
+
+
+class ProviderEstimate(BaseModel):
+    """What the router expects from one provider for one request."""
+    provider: str
+    p50_latency: float
+    p95_latency: float
+    error_rate: float
+    effective_latency: float
+    cost: float
+    observed: bool
+    available: bool
+    fits_context: bool
+
+
+class ProviderRouter:
+    """Rank providers for a request from live circuit breaker metrics.
+
+    Latency comes from each breaker's rolling p50/p95 once it has seen
+    ``min_samples`` calls, and from the provider's declared
+    ``expected_latency_seconds`` before that. Error rates inflate latency
+    (a failed call costs a fallback), open circuits and unconfigured
+    providers go last, and providers whose context window is too small for
+    the prompt are left out.
+    """
+
+    def __init__(self,
+                 providers: Dict[str, LLMProvider],
+                 breakers: Dict[str, CircuitBreaker],
+                 min_samples: int = 3):
+        self.providers = providers
+        self.breakers = breakers
+        self.min_samples = min_samples
+
+    def estimate(self, name: str, prompt: str, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> ProviderEstimate:
+        provider = self.providers[name]
+        capabilities = provider.capabilities
+        snapshot = self.breakers[name].snapshot()
+
+        observed = snapshot["requests"] >= self.min_samples and snapshot["p50_latency"] is not None
+        if observed:
+            p50, p95 = snapshot["p50_latency"], snapshot["p95_latency"]
+        else:
+            p50 = p95 = capabilities.expected_latency_seconds
+        error_rate = snapshot["error_rate"]
+
+        input_tokens = estimate_tokens(prompt)
+        return ProviderEstimate(
+            provider=name,
+            p50_latency=p50,
+            p95_latency=p95,
+            error_rate=error_rate,
+            effective_latency=p50 / max(0.05, 1 - error_rate),
+            cost=capabilities.estimate_cost(input_tokens, output_tokens),
+            observed=observed,
+            available=snapshot["state"] != CircuitState.OPEN.value and provider.is_configured(),
+            fits_context=input_tokens + output_tokens <= capabilities.max_context_tokens
+        )
+
+    def rank(self,
+             policy: RoutingPolicy,
+             prompt: str,
+             output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+             streaming: bool = False) -> List[str]:
+        """Return provider names, best first, for the caller to try in order."""
+        estimates = [self.estimate(name, prompt, output_tokens) for name in self.providers]
+        estimates = [estimate for estimate in estimates if estimate.fits_context]
+
+        def sort_key(estimate: ProviderEstimate):
+            provider = self.providers[estimate.provider]
+            missing_streaming = streaming and not provider.capabilities.streaming
+            if policy.objective == "fastest":
+                preference = (estimate.effective_latency, estimate.cost)
+            elif policy.max_latency_seconds is None:
+                preference = (estimate.cost, estimate.effective_latency)
+            elif estimate.p95_latency <= policy.max_latency_seconds:
+                preference = (0, estimate.cost, estimate.effective_latency)
+            else:
+                # Too slow for the budget: only as a fallback, fastest first
+                preference = (1, estimate.effective_latency, estimate.cost)
+            return (not estimate.available, missing_streaming, preference)
+
+        return [estimate.provider for estimate in sorted(estimates, key=sort_key)]
+
+    def report(self, prompt: str = "", output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> List[Dict]:
+        """Return the current estimates for every provider."""
+        return [self.estimate(name, prompt, output_tokens).model_dump() for name in self.providers]
@@ -0,0 +1,128 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+from loguru import logger
+
+T = TypeVar("T")
+
+class _Call:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class _SharedStream:
+    """One upstream stream fanned out to every subscriber, including late ones."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Future] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def pump(self, source: AsyncIterator[str]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+            await source.aclose()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                while position < len(self.chunks):
+                    yield self.chunks[position]
+                    position += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is listening any more; stop the upstream request
+                self.task.cancel()
+
+class SingleFlight:
+    """Coalesce identical in-flight calls into one.
+
+    Concurrent callers with the same key share a single underlying call and
+    all receive its result. The underlying call is only cancelled once every
+    caller waiting on it has gone away. All bookkeeping happens on the
+    shared event loop, so it coalesces across Streamlit sessions.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run ``factory()`` unless an identical call is already in flight."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(self._calls, key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalesced {self.name} request onto an in-flight call.")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Stream from ``factory()`` unless an identical stream is already in flight.
+
+        Subscribers that join late first receive the chunks already produced.
+        """
+        shared = self._streams.get(key)
+        if shared is None:
+            shared = _SharedStream()
+            shared.task = asyncio.ensure_future(shared.pump(factory()))
+            self._streams[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget(self._streams, key, shared))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalesced {self.name} stream onto an in-flight stream.")
+
+        async for chunk in shared.subscribe():
+            yield chunk
+
+    @staticmethod
+    def _forget(registry: Dict, key: str, entry):
+        if registry.get(key) is entry:
+            del registry[key]
+
+    def stats(self) -> Dict:
+        requests = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+            "in_flight": len(self._calls) + len(self._streams)
+        }
+
+# Shared by every LLMHandler in the process
+generation_flights = SingleFlight("generation")
@@ -0,0 +1,281 @@
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from loguru import logger
+from config.config import settings
+
+class Span:
+    """One timed stage of a request.
+
+    Spans of the same request share its ``request_id``; ``parent_id`` links a
+    span to the stage it ran in. Attributes describe the work, e.g. the
+    provider, model and prompt or output size.
+    """
+
+    def __init__(self, name: str, request_id: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.request_id = request_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes: Dict[str, Any] = {key: value for key, value in attributes.items() if value is not None}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.duration_seconds: Optional[float] = None
+        self._started_at = time.perf_counter()
+        # Set by exporters that keep their own span objects
+        self.exporter_state: Dict[str, Any] = {}
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent else None
+
+    def set(self, **attributes):
+        """Add or update attributes; None values are skipped."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def fail(self, error: Any):
+        """Mark the span as failed without raising, e.g. when the error was handled."""
+        self.status = "error"
+        self.error = str(error)
+
+    def end(self):
+        self.duration_seconds = time.perf_counter() - self._started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": datetime.fromtimestamp(self.start_time_ns / 1e9, timezone.utc).isoformat(),
+            "duration_ms": None if self.duration_seconds is None else round(self.duration_seconds * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class SpanSink:
+    """Receives spans as they start and end."""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonlSpanSink(SpanSink):
+    """Appends every finished span to a JSON lines file.
+
+    Once the file reaches ``max_bytes`` it is renamed to ``<path>.1`` (older
+    files shift to ``.2`` and so on) and a new file is started; only
+    ``backups`` old files are kept. ``max_bytes=0`` never rolls over.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def on_end(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._roll_over()
+
+    def _roll_over(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class OpenTelemetrySpanSink(SpanSink):
+    """Mirrors spans to OpenTelemetry, exported with ``exporter`` ("otlp" or "console").
+
+    Needs the ``opentelemetry-sdk`` package, plus
+    ``opentelemetry-exporter-otlp-proto-http`` for "otlp", which reads the
+    standard ``OTEL_EXPORTER_OTLP_*`` environment variables.
+    """
+
+    def __init__(self, exporter: str = "otlp", service_name: str = "ai-content-agent"):
+        # Imported here because OpenTelemetry is an optional dependency
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        if exporter == "console":
+            span_exporter = ConsoleSpanExporter()
+        elif exporter == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            span_exporter = OTLPSpanExporter()
+        else:
+            raise ValueError(f"Unknown OpenTelemetry exporter '{exporter}'. Use 'otlp' or 'console'.")
+
+        self._provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        self._provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        self._tracer = self._provider.get_tracer("src.utils.tracing")
+
+    def on_start(self, span: Span):
+        from opentelemetry import trace
+        from opentelemetry.context import Context
+
+        parent = span.parent.exporter_state.get("otel") if span.parent else None
+        context = trace.set_span_in_context(parent) if parent is not None else Context()
+        span.exporter_state["otel"] = self._tracer.start_span(span.name, context=context,
+                                                              start_time=span.start_time_ns)
+
+    def on_end(self, span: Span):
+        from opentelemetry.trace import Status, StatusCode
+
+        otel_span = span.exporter_state.pop("otel", None)
+        if otel_span is None:
+            return
+        otel_span.set_attribute("request_id", span.request_id)
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
+        if span.status == "error":
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=span.start_time_ns + int((span.duration_seconds or 0) * 1e9))
+
+    def close(self):
+        self._provider.shutdown()
+
+
+class Tracer:
+    """Hands finished spans to its sinks; a sink that fails is logged and skipped."""
+
+    def __init__(self, sinks: Optional[List[SpanSink]] = None, enabled: bool = True):
+        self.sinks = sinks or []
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls) -> "Tracer":
+        sinks: List[SpanSink] = []
+        if settings.tracing_enabled and settings.tracing_jsonl_path:
+            try:
+                sinks.append(JsonlSpanSink(settings.tracing_jsonl_path,
+                                           max_bytes=int(settings.tracing_jsonl_max_mb * 1024 * 1024),
+                                           backups=settings.tracing_jsonl_backups))
+            except OSError as e:
+                logger.error(f"Cannot write traces to {settings.tracing_jsonl_path}: {e}")
+        if settings.tracing_enabled and settings.tracing_otel_exporter:
+            try:
+                sinks.append(OpenTelemetrySpanSink(settings.tracing_otel_exporter))
+            except Exception as e:
+                logger.error(f"Failed to set up OpenTelemetry trace export: {e}")
+        if settings.metrics_enabled:
+            # Imported here because the metrics module builds on this one
+            from src.utils.metrics import MetricsSpanSink
+            sinks.append(MetricsSpanSink())
+        return cls(sinks, enabled=bool(sinks))
+
+    def _notify(self, method: str, span: Span):
+        for sink in self.sinks:
+            try:
+                getattr(sink, method)(span)
+            except Exception as e:
+                logger.warning(f"{type(sink).__name__} failed to record span {span.name}: {e}")
+
+    def start(self, span: Span):
+        if self.enabled:
+            self._notify("on_start", span)
+
+    def finish(self, span: Span):
+        if self.enabled:
+            self._notify("on_end", span)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from settings on first use."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer.from_settings()
+        return _tracer
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """Replace the process-wide tracer (e.g. after changing tracing settings); returns the old one."""
+    global _tracer
+    with _tracer_lock:
+        previous, _tracer = _tracer, tracer
+    return previous
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_request_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.request_id if span else None
+
+@contextmanager
+def span(name: str, request_id: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """Time a stage of the current request.
+
+    Inside another span this opens a child span of the same request.
+    Otherwise it starts a new request, with ``request_id`` or a fresh ID.
+    Exceptions mark the span as failed and propagate; cancellation marks it
+    as cancelled. The span is current
+    for the block, including coroutines started on the shared event loop.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        request_id = parent.request_id
+    current = Span(name, request_id or new_request_id(), parent, **attributes)
+    tracer = get_tracer()
+    tracer.start(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.fail(e)
+        raise
+    except BaseException:
+        # Cancelled tasks and streams closed early by their consumer
+        current.status = "cancelled"
+        raise
+    finally:
+        current.end()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator was resumed by another task; its context is gone already
+            pass
+        tracer.finish(current)
@@ -0,0 +1,40 @@
+class WordBudgetMonitor:
+    """Counts words across streamed chunks and decides where to cut the stream.
+
+    Once more than ``limit`` words have arrived, the stream is cut after the
+    next paragraph break (a blank line). If no paragraph break comes within
+    ``grace`` (a fraction of ``limit``) further words, it is cut at the next
+    whitespace instead. ``feed`` returns the part of each chunk to pass on
+    and sets ``stopped`` once the cut has been made.
+    """
+
+    def __init__(self, limit: int, grace: float = 0.25):
+        self.limit = limit
+        self.hard_limit = limit + max(1, int(limit * grace))
+        self.words = 0
+        self.stopped = False
+        self._in_word = False
+        self._last_char = ""
+
+    @property
+    def exceeded(self) -> bool:
+        return self.words > self.limit
+
+    def feed(self, chunk: str) -> str:
+        if self.stopped:
+            return ""
+
+        for index, char in enumerate(chunk):
+            if char == "\r":
+                continue
+            if char.isspace():
+                if self.exceeded and (
+                        (char == "\n" and self._last_char == "\n") or self.words >= self.hard_limit):
+                    self.stopped = True
+                    return chunk[:index + 1]
+                self._in_word = False
+            elif not self._in_word:
+                self._in_word = True
+                self.words += 1
+            self._last_char = char
+        return chunk